@@ -1,16 +1,26 @@
-from collections.abc import Generator
-from typing import Annotated
+from collections.abc import AsyncGenerator, Generator
+from typing import Annotated, Any
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.api.utils.response_cache import answer_conditional_get
+from app.api.utils.till_utils import DEFAULT_REGISTER
+from app.api.utils.user_cache import user_cache
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import (
+    async_engine,
+    async_read_engine,
+    engine,
+    read_engine,
+    release_connection,
+)
 from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -23,7 +33,30 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+def get_read_db() -> Generator[Session, None, None]:
+    """Session on the read replica when it is fresh enough, else the primary"""
+    with Session(read_engine()) as session:
+        yield session
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for async def routes; queries don't occupy a threadpool thread"""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """get_read_db() for async def routes"""
+    read_engine = await async_read_engine()
+    async with AsyncSession(read_engine, expire_on_commit=False) as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+# For read-only reports and lists; writes and read-after-write stay on SessionDep
+ReadSessionDep = Annotated[Session, Depends(get_read_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
@@ -38,7 +71,10 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+    # Served from the per-worker user cache, usually without a query
+    user = user_cache.get(session, str(token_data.sub))
+    # Don't hold a connection through handlers that never query after auth
+    release_connection(session)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -74,3 +110,76 @@ def get_current_auditor_or_superuser(
 
 
 AuditorOrAdminUser = Annotated[User, Depends(get_current_auditor_or_superuser)]
+
+
+def get_register(
+    x_register: Annotated[str, Header(min_length=1, max_length=50)] = DEFAULT_REGISTER,
+) -> str:
+    """Register (till terminal) the request comes from, sent as X-Register"""
+    return x_register
+
+
+RegisterDep = Annotated[str, Depends(get_register)]
+
+
+def conditional_get(
+    *tables: str, scoped: bool = False, public: bool = False, replica: bool = False
+) -> Any:
+    """
+    Route dependency answering If-None-Match with 304 when nothing changed.
+
+    ``tables`` must list every table the response is read from; the ETag is
+    built from their versions (plus path, query string and X-Register) without
+    running the endpoint's queries. With ``scoped`` it also covers the current
+    user and the user table, for responses that differ per user.
+    Use as ``dependencies=[conditional_get(...)]``.
+
+    The token is checked before any 304 is answered; only endpoints that
+    need no token at all may pass ``public``.
+
+    Versions are read from the primary, like the bodies of most endpoints; a
+    replica's versions could lag a write and match an old ETag. Endpoints
+    reading ReadSessionDep pass ``replica`` so versions come from the same
+    session as the body (read first, they can only be older than it).
+    """
+    VersionSession = ReadSessionDep if replica else SessionDep
+
+    if scoped:
+
+        def check_for_user(
+            request: Request,
+            response: Response,
+            session: VersionSession,  # type: ignore[valid-type]
+            current_user: CurrentUser,
+        ) -> None:
+            if settings.CONDITIONAL_GET_ENABLED:
+                answer_conditional_get(
+                    session,
+                    request,
+                    response,
+                    (*tables, "user"),
+                    f"user:{current_user.id}",
+                )
+
+        return Depends(check_for_user)
+
+    def check_public(
+        request: Request,
+        response: Response,
+        session: VersionSession,  # type: ignore[valid-type]
+    ) -> None:
+        if settings.CONDITIONAL_GET_ENABLED:
+            answer_conditional_get(session, request, response, tables, "all")
+
+    if public:
+        return Depends(check_public)
+
+    def check(
+        request: Request,
+        response: Response,
+        session: VersionSession,  # type: ignore[valid-type]
+        _current_user: CurrentUser,
+    ) -> None:
+        check_public(request, response, session)
+
+    return Depends(check)
@@ -5,6 +5,7 @@ from app.api.routes import (
     bulk_import,
     customers,
     debts,
+    events,
     expenses,
     grn,
     login,
@@ -46,6 +47,7 @@ api_router.include_router(
 api_router.include_router(reminders.router, prefix="/reminders", tags=["reminders"])
 api_router.include_router(media.router)
 api_router.include_router(till.router)
+api_router.include_router(events.router)
 
 
 if settings.ENVIRONMENT == "local":
@@ -4,16 +4,22 @@ from typing import Any
 
 from fastapi import APIRouter, Query
 from pydantic import BaseModel
-from sqlalchemy import Date, cast
-from sqlalchemy.sql import ColumnElement
 from sqlmodel import and_, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Debt, Expense, Product, Sale
+from app.api.deps import AsyncReadSessionDep, AsyncSessionDep, CurrentUser
+from app.api.utils.response_cache import cached_response_async
+from app.api.utils.sales_rollup import sales_rollup_source
+from app.models import Debt, Expense, PaymentMethod, Product, User
+from app.utils.date_ranges import business_today, date_range_conditions
 from app.utils.sqlalchemy_helpers import qload
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# Tables each report is derived from; writes to any of them invalidate the cache
+SALES_REPORT_TABLES = ("sale", "debt", "user", "payment_method")
+STOCK_REPORT_TABLES = ("product", "product_category", "product_status")
+
 
 # ==================== SALES ANALYTICS ====================
 
@@ -40,95 +46,101 @@ class SalesSummary(BaseModel):
 
 
 @router.get("/sales-summary", response_model=SalesSummary)
-def get_sales_summary(
-    session: SessionDep,
+async def get_sales_summary(
+    session: AsyncSessionDep,
+    read_session: AsyncReadSessionDep,
     current_user: CurrentUser,
     start_date: date | None = Query(None, description="Start date for summary"),
     end_date: date | None = Query(None, description="End date for summary"),
 ) -> Any:
     """
     Get sales summary with totals, averages, and breakdowns by payment method and cashier.
+
+    Sales still carrying an unpaid debt and voided sales are excluded from
+    revenue. Totals come from the daily rollup, so cost grows with the number
+    of days in range rather than the number of sales.
     """
-    conditions: list[ColumnElement[bool]] = []
+    return await cached_response_async(
+        session,
+        current_user,
+        route="analytics/sales-summary",
+        params={"start_date": start_date, "end_date": end_date},
+        tables=SALES_REPORT_TABLES,
+        compute=lambda: _build_sales_summary(
+            read_session, current_user, start_date, end_date
+        ),
+        read_session=read_session,
+    )
 
-    # Apply date filters
-    if start_date:
-        conditions.append(cast(Sale.sale_date, Date) >= start_date)  # type: ignore[arg-type]
-    if end_date:
-        conditions.append(cast(Sale.sale_date, Date) <= end_date)  # type: ignore[arg-type]
 
+async def _build_sales_summary(
+    session: AsyncSession,
+    current_user: CurrentUser,
+    start_date: date | None,
+    end_date: date | None,
+) -> SalesSummary:
+    """Compute the sales summary (uncached)"""
     # Cashiers only see their own sales
-    if not current_user.is_superuser:
-        conditions.append(Sale.created_by_id == current_user.id)  # type: ignore[arg-type]
-
-    # Base query for totals
-    base_query = select(Sale)
-    if conditions:
-        base_query = base_query.where(and_(*conditions))
-
-    # Get all sales
-    sales = session.exec(
-        base_query.options(
-            qload(Sale.payment_method),
-            qload(Sale.created_by),
-        )
-    ).all()
+    source = sales_rollup_source(
+        start_date=start_date,
+        end_date=end_date,
+        cashier_id=None if current_user.is_superuser else current_user.id,
+    )
 
-    # Get all debts to identify which sales have unpaid debts
-    all_debts = session.exec(select(Debt)).all()
-    # Create a set of sale IDs that have unpaid debts (using UUID objects for comparison)
-    unpaid_debt_sale_ids = {
-        debt.sale_id
-        for debt in all_debts
-        if debt.sale_id and debt.status != "paid" and debt.balance > 0
-    }
-
-    # Filter out sales with unpaid debts from revenue calculation
-    # Only count sales as income if they don't have unpaid debts, or if the debt is fully paid
-    paid_sales = [sale for sale in sales if sale.id not in unpaid_debt_sale_ids]
-
-    # Calculate totals (only from paid sales)
-    total_sales = len(paid_sales)
-    total_amount = sum(float(sale.total_amount or Decimal("0")) for sale in paid_sales)
-    total_items = sum(sale.quantity for sale in paid_sales)
+    totals_statement: Any = select(
+        func.coalesce(func.sum(source.c.sale_count), 0),
+        func.coalesce(func.sum(source.c.total_amount), 0),
+        func.coalesce(func.sum(source.c.item_count), 0),
+    )
+    total_sales, total_amount_raw, total_items = (
+        await session.exec(totals_statement)
+    ).one()
+    total_sales = int(total_sales)
+    total_items = int(total_items)
+    total_amount = float(total_amount_raw)
     average_sale = total_amount / total_sales if total_sales > 0 else 0.0
 
     # Payment method breakdown (only from paid sales)
-    payment_method_map: dict[str, dict[str, Any]] = {}
-    for sale in paid_sales:
-        method_name = sale.payment_method.name if sale.payment_method else "Unknown"
-        if method_name not in payment_method_map:
-            payment_method_map[method_name] = {"count": 0, "amount": 0.0}
-        payment_method_map[method_name]["count"] += 1
-        payment_method_map[method_name]["amount"] += float(
-            sale.total_amount or Decimal("0")
+    method_name = func.coalesce(PaymentMethod.name, "Unknown")
+    payment_method_statement: Any = (
+        select(
+            method_name,
+            func.sum(source.c.sale_count),
+            func.coalesce(func.sum(source.c.total_amount), 0),
         )
-
+        .select_from(source)
+        .outerjoin(PaymentMethod, source.c.payment_method_id == PaymentMethod.id)  # type: ignore[arg-type]
+        .group_by(method_name)
+        .having(func.sum(source.c.sale_count) > 0)
+        .order_by(method_name)
+    )
     payment_method_breakdown = [
         PaymentMethodBreakdown(
-            payment_method=method, count=data["count"], amount=data["amount"]
+            payment_method=name, count=int(count), amount=float(amount)
         )
-        for method, data in payment_method_map.items()
+        for name, count, amount in (await session.exec(payment_method_statement)).all()
     ]
 
     # Cashier breakdown (only from paid sales)
-    cashier_map: dict[str, dict[str, Any]] = {}
-    for sale in paid_sales:
-        cashier_name = (
-            sale.created_by.full_name
-            if sale.created_by and sale.created_by.full_name
-            else sale.created_by.username
-            if sale.created_by and sale.created_by.username
-            else "Unknown"
+    # Falls back from full name to username to "Unknown", skipping empty strings
+    cashier_name = func.coalesce(
+        func.nullif(User.full_name, ""), func.nullif(User.username, ""), "Unknown"
+    )
+    cashier_statement: Any = (
+        select(
+            cashier_name,
+            func.sum(source.c.sale_count),
+            func.coalesce(func.sum(source.c.total_amount), 0),
         )
-        if cashier_name not in cashier_map:
-            cashier_map[cashier_name] = {"count": 0, "amount": 0.0}
-        cashier_map[cashier_name]["count"] += 1
-        cashier_map[cashier_name]["amount"] += float(sale.total_amount or Decimal("0"))
-
+        .select_from(source)
+        .outerjoin(User, source.c.cashier_id == User.id)  # type: ignore[arg-type]
+        .group_by(cashier_name)
+        .having(func.sum(source.c.sale_count) > 0)
+        .order_by(cashier_name)
+    )
     cashier_breakdown = [
-        CashierBreakdown(cashier_name=name, count=data["count"], amount=data["amount"])
-        for name, data in cashier_map.items()
+        CashierBreakdown(cashier_name=name, count=int(count), amount=float(amount))
+        for name, count, amount in (await session.exec(cashier_statement)).all()
     ]
 
     return SalesSummary(
@@ -165,18 +177,35 @@ class StockSummary(BaseModel):
 
 
 @router.get("/stock-summary", response_model=StockSummary)
-def get_stock_summary(
-    session: SessionDep,
+async def get_stock_summary(
+    session: AsyncSessionDep,
+    read_session: AsyncReadSessionDep,
     current_user: CurrentUser,
 ) -> Any:
     """
     Get stock inventory summary with total value, low stock counts, and product details.
     """
+    return await cached_response_async(
+        session,
+        current_user,
+        route="analytics/stock-summary",
+        params={},
+        tables=STOCK_REPORT_TABLES,
+        compute=lambda: _build_stock_summary(read_session),
+        scoped=False,
+        read_session=read_session,
+    )
+
+
+async def _build_stock_summary(session: AsyncSession) -> StockSummary:
+    """Compute the stock summary (uncached)"""
     # Get all products with relationships
-    products = session.exec(
-        select(Product).options(
-            qload(Product.category),
-            qload(Product.status),
+    products = (
+        await session.exec(
+            select(Product).options(
+                qload(Product.category),
+                qload(Product.status),
+            )
         )
     ).all()
 
@@ -241,8 +270,9 @@ class BalanceSheet(BaseModel):
 
 
 @router.get("/balance-sheet", response_model=BalanceSheet)
-def get_balance_sheet(
-    session: SessionDep,
+async def get_balance_sheet(
+    session: AsyncSessionDep,
+    read_session: AsyncReadSessionDep,
     current_user: CurrentUser,
     start_date: date | None = Query(None, description="Start date for balance sheet"),
     end_date: date | None = Query(None, description="End date for balance sheet"),
@@ -250,26 +280,46 @@ def get_balance_sheet(
     """
     Get balance sheet with assets, liabilities, and equity calculations.
     """
+    return await cached_response_async(
+        session,
+        current_user,
+        route="analytics/balance-sheet",
+        params={"start_date": start_date, "end_date": end_date},
+        tables=(*SALES_REPORT_TABLES, *STOCK_REPORT_TABLES, "expense"),
+        compute=lambda: _build_balance_sheet(
+            read_session, current_user, start_date, end_date
+        ),
+        read_session=read_session,
+    )
+
+
+async def _build_balance_sheet(
+    session: AsyncSession,
+    current_user: CurrentUser,
+    start_date: date | None,
+    end_date: date | None,
+) -> BalanceSheet:
+    """Compute the balance sheet (uncached)"""
     # Get inventory value from stock summary
-    stock_summary = get_stock_summary(session, current_user)
+    stock_summary = await _build_stock_summary(session)
     inventory_value = stock_summary.total_inventory_value
 
     # Get sales total (cash and receivables)
-    sales_summary = get_sales_summary(session, current_user, start_date, end_date)
+    sales_summary = await _build_sales_summary(
+        session, current_user, start_date, end_date
+    )
     cash_and_receivables = sales_summary.total_amount
 
     # Get expenses total
-    expense_conditions: list[ColumnElement[bool]] = []
-    if start_date:
-        expense_conditions.append(cast(Expense.expense_date, Date) >= start_date)  # type: ignore[arg-type]
-    if end_date:
-        expense_conditions.append(cast(Expense.expense_date, Date) <= end_date)  # type: ignore[arg-type]
+    expense_conditions = date_range_conditions(
+        Expense.expense_date, start_date, end_date
+    )
 
     expense_query: Any = select(func.sum(Expense.amount))
     if expense_conditions:
         expense_query = expense_query.where(and_(*expense_conditions))
 
-    expense_total = session.exec(expense_query).one() or Decimal("0")
+    expense_total = (await session.exec(expense_query)).one() or Decimal("0")
     total_expenses = float(expense_total)
 
     # Calculate totals
@@ -310,15 +360,114 @@ class DashboardStats(BaseModel):
     unpaid_debts_count: int
 
 
+async def _dashboard_window_totals(
+    session: AsyncSession,
+    current_user: CurrentUser,
+    *,
+    today: date,
+    yesterday: date,
+    first_day_of_month: date,
+    first_day_of_last_month: date,
+    last_day_of_last_month: date,
+) -> dict[str, float]:
+    """
+    Compute every dashboard window in a single round trip.
+
+    Sales (from the daily rollup) and expenses are read once over the two-month
+    range and split into windows with conditional aggregates (SUM ... FILTER).
+    Unpaid debts are folded into the same statement, so the dashboard costs one
+    query whatever the data volume.
+    """
+    # Cashiers only see their own sales
+    source = sales_rollup_source(
+        start_date=first_day_of_last_month,
+        end_date=today,
+        cashier_id=None if current_user.is_superuser else current_user.id,
+    )
+    sale_day = source.c.business_date
+
+    def revenue_between(start: date, end: date) -> Any:
+        return func.coalesce(
+            func.sum(source.c.total_amount).filter(sale_day >= start, sale_day <= end),
+            0,
+        )
+
+    sales_windows = (
+        select(
+            revenue_between(first_day_of_month, today).label("current_month_revenue"),
+            revenue_between(first_day_of_last_month, last_day_of_last_month).label(
+                "previous_month_revenue"
+            ),
+            revenue_between(today, today).label("today_revenue"),
+            revenue_between(yesterday, yesterday).label("yesterday_revenue"),
+        )
+        .select_from(source)
+        .subquery()
+    )
+
+    def expenses_between(start: date, end: date) -> Any:
+        return func.coalesce(
+            func.sum(Expense.amount).filter(
+                *date_range_conditions(Expense.expense_date, start, end)
+            ),
+            0,
+        )
+
+    expense_windows = (
+        select(
+            expenses_between(first_day_of_month, today).label("current_month_expenses"),
+            expenses_between(first_day_of_last_month, last_day_of_last_month).label(
+                "previous_month_expenses"
+            ),
+        )
+        .where(
+            *date_range_conditions(Expense.expense_date, first_day_of_last_month, today)
+        )
+        .subquery()
+    )
+
+    # Unpaid debts - any debt with balance > 0 and status != "paid"
+    unpaid_debts = (
+        select(
+            func.count(Debt.id).label("unpaid_debts_count"),
+            func.coalesce(func.sum(Debt.balance), 0).label("unpaid_debts_total"),
+        )
+        .where(and_(Debt.status != "paid", Debt.balance > 0))
+        .subquery()
+    )
+
+    # Each subquery yields exactly one row, so the cross join is a single row too
+    statement: Any = select(sales_windows, expense_windows, unpaid_debts)
+    row = (await session.exec(statement)).one()
+    return {key: float(value) for key, value in row._mapping.items()}
+
+
 @router.get("/dashboard-stats", response_model=DashboardStats)
-def get_dashboard_stats(
-    session: SessionDep,
+async def get_dashboard_stats(
+    session: AsyncSessionDep,
+    read_session: AsyncReadSessionDep,
     current_user: CurrentUser,
 ) -> Any:
     """
     Get dashboard statistics including revenue, expenses, and percentage changes.
     """
-    today = date.today()
+    today = business_today()
+    return await cached_response_async(
+        session,
+        current_user,
+        route="analytics/dashboard-stats",
+        # Windows are relative to today, so the date is part of the key
+        params={"as_of": today},
+        tables=("sale", "debt", "expense"),
+        compute=lambda: _build_dashboard_stats(read_session, current_user, today),
+        read_session=read_session,
+    )
+
+
+async def _build_dashboard_stats(
+    session: AsyncSession, current_user: CurrentUser, today: date
+) -> DashboardStats:
+    """Compute the dashboard statistics (uncached)"""
     first_day_of_month = date(today.year, today.month, 1)
 
     # Previous month dates
@@ -329,47 +478,23 @@ def get_dashboard_stats(
         first_day_of_last_month = date(today.year, today.month - 1, 1)
         last_day_of_last_month = date(today.year, today.month, 1) - timedelta(days=1)
 
-    yesterday = date.today() - timedelta(days=1)
-
-    # Get current month sales summary
-    current_month_sales = get_sales_summary(
-        session, current_user, first_day_of_month, today
-    )
-    current_month_revenue = current_month_sales.total_amount
-
-    # Get previous month sales summary
-    previous_month_sales = get_sales_summary(
-        session, current_user, first_day_of_last_month, last_day_of_last_month
-    )
-    previous_month_revenue = previous_month_sales.total_amount
-
-    # Get today's sales summary
-    today_sales = get_sales_summary(session, current_user, today, today)
-    today_revenue = today_sales.total_amount
+    yesterday = today - timedelta(days=1)
 
-    # Get yesterday's sales summary
-    yesterday_sales = get_sales_summary(session, current_user, yesterday, yesterday)
-    yesterday_revenue = yesterday_sales.total_amount
-
-    # Get current month expenses
-    current_expense_query: Any = select(func.sum(Expense.amount)).where(
-        and_(
-            cast(Expense.expense_date, Date) >= first_day_of_month,
-            cast(Expense.expense_date, Date) <= today,
-        )
-    )
-    current_expense_total = session.exec(current_expense_query).one() or Decimal("0")
-    current_month_expenses = float(current_expense_total)
-
-    # Get previous month expenses
-    previous_expense_query: Any = select(func.sum(Expense.amount)).where(
-        and_(
-            cast(Expense.expense_date, Date) >= first_day_of_last_month,
-            cast(Expense.expense_date, Date) <= last_day_of_last_month,
-        )
+    windows = await _dashboard_window_totals(
+        session,
+        current_user,
+        today=today,
+        yesterday=yesterday,
+        first_day_of_month=first_day_of_month,
+        first_day_of_last_month=first_day_of_last_month,
+        last_day_of_last_month=last_day_of_last_month,
     )
-    previous_expense_total = session.exec(previous_expense_query).one() or Decimal("0")
-    previous_month_expenses = float(previous_expense_total)
+    current_month_revenue = windows["current_month_revenue"]
+    previous_month_revenue = windows["previous_month_revenue"]
+    today_revenue = windows["today_revenue"]
+    yesterday_revenue = windows["yesterday_revenue"]
+    current_month_expenses = windows["current_month_expenses"]
+    previous_month_expenses = windows["previous_month_expenses"]
 
     # Calculate percentage changes
     def calculate_percentage_change(current: float, previous: float) -> float:
@@ -394,23 +519,8 @@ def get_dashboard_stats(
         net_profit, previous_net_profit
     )
 
-    # Get unpaid debts total (debts that are not fully paid)
-    from decimal import Decimal as Dec
-
-    # Query unpaid debts - any debt with balance > 0 and status != "paid"
-    unpaid_debts_query = select(
-        func.count(Debt.id).label("count"), func.sum(Debt.balance).label("total")
-    ).where(
-        and_(
-            Debt.status != "paid",  # type: ignore[arg-type]
-            Debt.balance > 0,  # type: ignore[arg-type]
-        )
-    )
-    unpaid_debts_result = session.exec(unpaid_debts_query).first()
-    unpaid_debts_count = unpaid_debts_result[0] or 0 if unpaid_debts_result else 0
-    unpaid_debts_total = (
-        float(unpaid_debts_result[1] or Dec("0")) if unpaid_debts_result else 0.0
-    )
+    unpaid_debts_total = windows["unpaid_debts_total"]
+    unpaid_debts_count = int(windows["unpaid_debts_count"])
 
     return DashboardStats(
         current_month_revenue=current_month_revenue,
@@ -16,20 +16,25 @@ import csv
 import io
 import time
 import uuid
+from collections.abc import Iterator
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
 from typing import Any
 
-import openpyxl  # type: ignore[import]  # For Excel file parsing
 from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from sqlmodel import Session, select
+from sqlalchemy import insert
+from sqlmodel import Session, col, func, select
 
 from app.api.deps import AdminUser, SessionDep
+from app.api.utils.spreadsheets import MAX_ROWS, SpreadsheetError, parse_spreadsheet
+from app.core.offload import run_blocking_io, run_cpu_bound, write_file
 from app.models import (
     BulkImportFinalRequest,
     BulkImportResult,
+    BulkImportRow,
     BulkImportSession,
     BulkImportSessionCreate,
     BulkImportSessionPublic,
@@ -50,94 +55,103 @@ router = APIRouter(prefix="/products/bulk", tags=["bulk-import"])
 
 # Configuration
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-MAX_ROWS = 1000
 SUPPORTED_FORMATS = ["csv", "xlsx"]
-CHUNK_SIZE = 50  # Process in chunks for progress updates
-
-# In-memory storage for session data (in production, use Redis or database)
-import_sessions_data: dict[str, dict[str, Any]] = {}
+CHUNK_SIZE = 50  # Staged rows read or written per query
 
 
 # ==================== HELPER FUNCTIONS ====================
 
 
-def parse_csv_file(
-    file_content: bytes, filename: str
-) -> tuple[list[str], list[dict[str, str]]]:
-    """Parse CSV file and return columns and rows."""
-    try:
-        # Try UTF-8 first
-        content = file_content.decode("utf-8")
-    except UnicodeDecodeError:
-        # Fallback to latin-1
-        try:
-            content = file_content.decode("latin-1")
-        except UnicodeDecodeError:
-            raise HTTPException(
-                status_code=400,
-                detail="Unable to read file. Please save as UTF-8 encoded CSV",
-            )
-
-    # Parse CSV
-    csv_file = io.StringIO(content)
-    reader = csv.DictReader(csv_file)
-
-    if not reader.fieldnames:
-        raise HTTPException(status_code=400, detail="CSV file has no column headers")
+def _save_import_session(
+    session: Session, db_session: BulkImportSession, rows: list[dict[str, str]]
+) -> None:
+    """Blocking commit for upload_file, run in the threadpool"""
+    session.add(db_session)
+    session.flush()
+    for start in range(0, len(rows), CHUNK_SIZE):
+        session.execute(
+            insert(BulkImportRow),
+            [
+                {"session_id": db_session.id, "row_number": row_number, "raw_data": row}
+                for row_number, row in enumerate(
+                    rows[start : start + CHUNK_SIZE], start=start + 1
+                )
+            ],
+        )
+    session.commit()
+    session.refresh(db_session)
 
-    columns = list(reader.fieldnames)
-    rows = []
 
-    for idx, row in enumerate(reader, start=1):
-        if idx > MAX_ROWS:
-            break
-        rows.append(row)
+# ==================== STAGED ROWS ====================
 
-    return columns, rows
 
+def iter_staged_rows(
+    session: Session, session_id: uuid.UUID, validated: bool = False
+) -> Iterator[list[BulkImportRow]]:
+    """
+    Yield the staged rows of an import in row order, CHUNK_SIZE at a time.
 
-def parse_excel_file(
-    file_content: bytes, filename: str
-) -> tuple[list[str], list[dict[str, str]]]:
-    """Parse Excel (XLSX) file and return columns and rows."""
-    try:
-        workbook = openpyxl.load_workbook(
-            io.BytesIO(file_content), read_only=True, data_only=True
+    Rows are read by keyset, so memory stays bounded by the chunk size and
+    the caller may commit between chunks.
+    """
+    after = 0
+    while True:
+        query = select(BulkImportRow).where(
+            BulkImportRow.session_id == session_id,
+            BulkImportRow.row_number > after,
         )
-        sheet = workbook.active
-
-        # Get headers from first row
-        headers = []
-        for cell in sheet[1]:
-            headers.append(str(cell.value) if cell.value is not None else "")
-
-        if not headers or all(h == "" for h in headers):
-            raise HTTPException(
-                status_code=400, detail="Excel file has no column headers"
-            )
-
-        # Read data rows
-        rows = []
-        for idx, row in enumerate(
-            sheet.iter_rows(min_row=2, values_only=True), start=1
-        ):
-            if idx > MAX_ROWS:
-                break
-
-            row_dict = {}
-            for col_idx, value in enumerate(row):
-                if col_idx < len(headers):
-                    # Convert all values to strings
-                    row_dict[headers[col_idx]] = str(value) if value is not None else ""
-            rows.append(row_dict)
+        if validated:
+            query = query.where(col(BulkImportRow.status).is_not(None))
+        chunk = session.exec(
+            query.order_by(col(BulkImportRow.row_number)).limit(CHUNK_SIZE)
+        ).all()
+        if not chunk:
+            return
+        yield list(chunk)
+        after = chunk[-1].row_number
+
+
+def stage_validation(staged: BulkImportRow, row: ImportRow) -> None:
+    """Record a row's validation result on its staged row"""
+    # JSON columns: prices are stored as strings
+    values = row.model_dump(mode="json")
+    staged.data = values["data"]
+    staged.mapped_data = values["mapped_data"]
+    staged.errors = values["errors"]
+    staged.warnings = values["warnings"]
+    staged.is_duplicate = row.is_duplicate
+    staged.duplicate_product_id = row.duplicate_product_id
+    staged.status = row.status
+
+
+def to_import_row(staged: BulkImportRow) -> ImportRow:
+    """The API form of a validated staged row"""
+    return ImportRow(
+        row_number=staged.row_number,
+        data=staged.data or {},
+        mapped_data=staged.mapped_data,
+        errors=staged.errors or [],
+        warnings=staged.warnings or [],
+        is_duplicate=staged.is_duplicate,
+        duplicate_product_id=staged.duplicate_product_id,
+        status=staged.status or ImportRowStatus.VALID,
+    )
 
-        workbook.close()
-        return headers, rows
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=400, detail=f"Failed to parse Excel file: {str(e)}"
-        )
+def count_staged_rows(session: Session, session_id: uuid.UUID) -> tuple[int, int, int]:
+    """Valid (including warnings), error and duplicate row counts"""
+    counts: dict[str | None, int] = dict(
+        session.exec(
+            select(BulkImportRow.status, func.count())
+            .where(BulkImportRow.session_id == session_id)
+            .group_by(BulkImportRow.status)
+        ).all()
+    )
+    return (
+        counts.get(ImportRowStatus.VALID, 0) + counts.get(ImportRowStatus.WARNING, 0),
+        counts.get(ImportRowStatus.ERROR, 0),
+        counts.get(ImportRowStatus.DUPLICATE, 0),
+    )
 
 
 def auto_map_columns(uploaded_columns: list[str]) -> dict[str, str]:
@@ -555,16 +569,14 @@ async def upload_file(
             detail=f"Invalid file format. Supported formats: {', '.join(SUPPORTED_FORMATS.upper())}",
         )
 
-    # Parse file based on format
+    # Parse file based on format, in the process pool so a large workbook
+    # doesn't stall the event loop
     try:
-        if file_ext == "csv":
-            columns, rows = parse_csv_file(file_content, file.filename)
-        elif file_ext in ["xlsx", "xls"]:
-            columns, rows = parse_excel_file(file_content, file.filename)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format")
-    except HTTPException:
-        raise
+        columns, rows = await run_cpu_bound(
+            parse_spreadsheet, file_content, file.filename, file_ext
+        )
+    except SpreadsheetError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse file: {str(e)}")
 
@@ -579,7 +591,7 @@ async def upload_file(
 
     # Save uploaded file to uploads/bulk-imports directory
     upload_dir = Path("uploads/bulk-imports")
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    await run_blocking_io(upload_dir.mkdir, parents=True, exist_ok=True)
 
     # Generate unique filename with timestamp
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
@@ -587,8 +599,7 @@ async def upload_file(
     file_path = upload_dir / safe_filename
 
     # Write file to disk
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+    await run_blocking_io(write_file, file_path, file_content)
 
     # Create import session
     session_create = BulkImportSessionCreate(
@@ -599,19 +610,11 @@ async def upload_file(
     db_session = BulkImportSession(
         **session_create.model_dump(),
         created_by_id=current_user.id,
+        columns=columns,
+        file_path=str(file_path),  # Store file path for reference
     )
-    session.add(db_session)
-    session.commit()
-    session.refresh(db_session)
-
-    # Store raw data in memory (in production, use Redis or file storage)
-    import_sessions_data[str(db_session.id)] = {
-        "columns": columns,
-        "rows": rows,
-        "validated_rows": [],
-        "auto_mapping": auto_map_columns(columns),
-        "file_path": str(file_path),  # Store file path for reference
-    }
+    # Stage the rows so any worker can serve the following steps
+    await run_in_threadpool(_save_import_session, session, db_session, rows)
 
     # Return session with columns and auto_mapping for frontend
     response = BulkImportSessionPublic.model_validate(db_session)
@@ -642,11 +645,6 @@ def map_columns(
     if db_session.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Get session data
-    session_data = import_sessions_data.get(str(request.session_id))
-    if not session_data:
-        raise HTTPException(status_code=404, detail="Import session data not found")
-
     # Validate category and status
     if request.default_category_id:
         category = session.get(ProductCategory, request.default_category_id)
@@ -658,53 +656,41 @@ def map_columns(
         if not status_obj:
             raise HTTPException(status_code=404, detail="Status not found")
 
-    # Apply column mapping to raw rows
-    raw_rows = session_data["rows"]
-    validated_rows = []
-
-    valid_count = 0
-    error_count = 0
-    duplicate_count = 0
-
-    for idx, raw_row in enumerate(raw_rows, start=1):
-        # Map columns
-        mapped_row = {}
-        for uploaded_col, system_field in request.column_mapping.items():
-            if uploaded_col in raw_row:
-                mapped_row[system_field] = raw_row[uploaded_col]
-
-        # Validate row
-        validated_row = validate_row_data(
-            mapped_row,
-            idx,
-            session,
-            request.default_category_id,
-            request.default_status_id,
-        )
-
-        validated_rows.append(validated_row)
+    # Apply column mapping to the staged rows, a chunk at a time
+    preview_rows: list[ImportRow] = []
+
+    for chunk in iter_staged_rows(session, request.session_id):
+        for staged in chunk:
+            # Map columns
+            mapped_row = {}
+            for uploaded_col, system_field in request.column_mapping.items():
+                if uploaded_col in staged.raw_data:
+                    mapped_row[system_field] = staged.raw_data[uploaded_col]
+
+            # Validate row
+            validated_row = validate_row_data(
+                mapped_row,
+                staged.row_number,
+                session,
+                request.default_category_id,
+                request.default_status_id,
+            )
+            stage_validation(staged, validated_row)
 
-        # Count statuses
-        if validated_row.status == ImportRowStatus.VALID:
-            valid_count += 1
-        elif validated_row.status == ImportRowStatus.ERROR:
-            error_count += 1
-        elif validated_row.status == ImportRowStatus.DUPLICATE:
-            duplicate_count += 1
-        elif validated_row.status == ImportRowStatus.WARNING:
-            valid_count += 1  # Warnings are still importable
+            # Keep preview of first 5 rows
+            if len(preview_rows) < 5:
+                preview_rows.append(validated_row)
+        session.flush()
 
-    # Update session
-    session_data["validated_rows"] = validated_rows
-    session_data["column_mapping"] = request.column_mapping
-    session_data["default_category_id"] = (
-        str(request.default_category_id) if request.default_category_id else None
-    )
-    session_data["default_status_id"] = (
-        str(request.default_status_id) if request.default_status_id else None
+    # Count statuses (warnings are still importable)
+    valid_count, error_count, duplicate_count = count_staged_rows(
+        session, request.session_id
     )
 
+    # Update session
     db_session.column_mapping = request.column_mapping
+    db_session.default_category_id = request.default_category_id
+    db_session.default_status_id = request.default_status_id
     db_session.valid_rows = valid_count
     db_session.error_rows = error_count
     db_session.duplicate_rows = duplicate_count
@@ -713,12 +699,9 @@ def map_columns(
     session.commit()
     session.refresh(db_session)
 
-    # Return preview (first 5 rows)
-    preview_rows = validated_rows[:5]
-
     return ColumnMappingResponse(
         session_id=request.session_id,
-        total_rows=len(validated_rows),
+        total_rows=db_session.total_rows,
         valid_rows=valid_count,
         error_rows=error_count,
         duplicate_rows=duplicate_count,
@@ -749,45 +732,38 @@ def get_validation_results(
     if db_session.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Get session data
-    session_data = import_sessions_data.get(str(session_id))
-    if not session_data:
-        raise HTTPException(status_code=404, detail="Import session data not found")
-
-    validated_rows = session_data.get("validated_rows", [])
-
     # Apply filter
+    filters = [
+        BulkImportRow.session_id == session_id,
+        col(BulkImportRow.status).is_not(None),
+    ]
     if filter == "errors":
-        filtered_rows = [r for r in validated_rows if r.status == ImportRowStatus.ERROR]
+        filters.append(BulkImportRow.status == ImportRowStatus.ERROR)
     elif filter == "duplicates":
-        filtered_rows = [
-            r for r in validated_rows if r.status == ImportRowStatus.DUPLICATE
-        ]
+        filters.append(BulkImportRow.status == ImportRowStatus.DUPLICATE)
     elif filter == "warnings":
-        filtered_rows = [
-            r for r in validated_rows if r.status == ImportRowStatus.WARNING
-        ]
-    else:
-        filtered_rows = validated_rows
+        filters.append(BulkImportRow.status == ImportRowStatus.WARNING)
+
+    total_count = session.exec(
+        select(func.count()).select_from(BulkImportRow).where(*filters)
+    ).one()
 
     # Apply pagination
-    paginated_rows = filtered_rows[skip : skip + limit]
+    paginated_rows = session.exec(
+        select(BulkImportRow)
+        .where(*filters)
+        .order_by(col(BulkImportRow.row_number))
+        .offset(skip)
+        .limit(limit)
+    ).all()
 
     # Count by status
-    valid_count = sum(
-        1
-        for r in validated_rows
-        if r.status in [ImportRowStatus.VALID, ImportRowStatus.WARNING]
-    )
-    error_count = sum(1 for r in validated_rows if r.status == ImportRowStatus.ERROR)
-    duplicate_count = sum(
-        1 for r in validated_rows if r.status == ImportRowStatus.DUPLICATE
-    )
+    valid_count, error_count, duplicate_count = count_staged_rows(session, session_id)
 
     return BulkImportValidationResponse(
         session_id=session_id,
-        rows=paginated_rows,
-        total_count=len(filtered_rows),
+        rows=[to_import_row(staged) for staged in paginated_rows],
+        total_count=total_count,
         valid_count=valid_count,
         error_count=error_count,
         duplicate_count=duplicate_count,
@@ -815,50 +791,24 @@ def fix_row(
     if db_session.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Get session data
-    session_data = import_sessions_data.get(str(session_id))
-    if not session_data:
-        raise HTTPException(status_code=404, detail="Import session data not found")
-
-    validated_rows = session_data.get("validated_rows", [])
-
     # Find row
-    row_index = request.row_number - 1
-    if row_index < 0 or row_index >= len(validated_rows):
+    staged = session.get(BulkImportRow, (session_id, request.row_number))
+    if not staged or staged.status is None:
         raise HTTPException(status_code=404, detail="Row not found")
 
-    # Get category and status IDs
-    default_category_id = session_data.get("default_category_id")
-    default_status_id = session_data.get("default_status_id")
-
-    if default_category_id:
-        default_category_id = uuid.UUID(default_category_id)
-    if default_status_id:
-        default_status_id = uuid.UUID(default_status_id)
-
     # Re-validate with updated data
     updated_row = validate_row_data(
         request.updated_data,
         request.row_number,
         session,
-        default_category_id,
-        default_status_id,
+        db_session.default_category_id,
+        db_session.default_status_id,
     )
-
-    # Update in memory
-    validated_rows[row_index] = updated_row
-    session_data["validated_rows"] = validated_rows
+    stage_validation(staged, updated_row)
+    session.flush()
 
     # Recalculate counts
-    valid_count = sum(
-        1
-        for r in validated_rows
-        if r.status in [ImportRowStatus.VALID, ImportRowStatus.WARNING]
-    )
-    error_count = sum(1 for r in validated_rows if r.status == ImportRowStatus.ERROR)
-    duplicate_count = sum(
-        1 for r in validated_rows if r.status == ImportRowStatus.DUPLICATE
-    )
+    valid_count, error_count, duplicate_count = count_staged_rows(session, session_id)
 
     # Update session
     db_session.valid_rows = valid_count
@@ -893,98 +843,104 @@ def import_products(
     if db_session.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Get session data
-    session_data = import_sessions_data.get(str(session_id))
-    if not session_data:
-        raise HTTPException(status_code=404, detail="Import session data not found")
-
-    validated_rows = session_data.get("validated_rows", [])
-
-    # Filter rows to import
-    rows_to_import = []
-    for row in validated_rows:
-        if request.skip_errors and row.status == ImportRowStatus.ERROR:
-            continue
-
-        if row.status == ImportRowStatus.DUPLICATE:
-            if request.duplicate_action == "skip":
-                continue
-            elif request.duplicate_action == "update":
-                # Update existing product
-                rows_to_import.append(("update", row))
-                continue
-            elif request.duplicate_action == "create":
-                # Create as new product anyway
-                rows_to_import.append(("create", row))
-                continue
-        else:
-            rows_to_import.append(("create", row))
-
     # Import products
     imported_product_ids = []
     failed_imports = []
     success_count = 0
+    total_processed = 0
+
+    # Staged rows are read a chunk at a time; each product is committed on its own
+    for chunk in iter_staged_rows(session, session_id, validated=True):
+        # Filter rows to import
+        rows_to_import = []
+        for row in map(to_import_row, chunk):
+            if request.skip_errors and row.status == ImportRowStatus.ERROR:
+                continue
 
-    for action, row in rows_to_import:
-        try:
-            if action == "create":
-                # Create new product
-                product_data = ProductCreate(
-                    name=row.mapped_data["name"],
-                    selling_price=row.mapped_data["selling_price"],
-                    buying_price=row.mapped_data.get("buying_price", Decimal("0.00")),
-                    current_stock=row.mapped_data.get("current_stock", 0),
-                    reorder_level=row.mapped_data.get("reorder_level"),
-                    description=row.mapped_data.get("description"),
-                    category_id=uuid.UUID(row.mapped_data["category_id"]),
-                    status_id=uuid.UUID(row.mapped_data["status_id"]),
-                )
+            if row.status == ImportRowStatus.DUPLICATE:
+                if request.duplicate_action == "skip":
+                    continue
+                elif request.duplicate_action == "update":
+                    # Update existing product
+                    rows_to_import.append(("update", row))
+                    continue
+                elif request.duplicate_action == "create":
+                    # Create as new product anyway
+                    rows_to_import.append(("create", row))
+                    continue
+            else:
+                rows_to_import.append(("create", row))
 
-                db_product = Product(
-                    **product_data.model_dump(),
-                    created_by_id=current_user.id,
-                )
-                session.add(db_product)
-                session.commit()
-                session.refresh(db_product)
-
-                imported_product_ids.append(db_product.id)
-                success_count += 1
-
-            elif action == "update" and row.duplicate_product_id:
-                # Update existing product
-                existing_product = session.get(Product, row.duplicate_product_id)
-                if existing_product:
-                    # Update fields
-                    existing_product.selling_price = row.mapped_data["selling_price"]
-                    existing_product.buying_price = row.mapped_data.get(
-                        "buying_price", Decimal("0.00")
+        total_processed += len(rows_to_import)
+
+        for action, row in rows_to_import:
+            try:
+                if action == "create":
+                    # Create new product
+                    product_data = ProductCreate(
+                        name=row.mapped_data["name"],
+                        selling_price=row.mapped_data["selling_price"],
+                        buying_price=row.mapped_data.get(
+                            "buying_price", Decimal("0.00")
+                        ),
+                        current_stock=row.mapped_data.get("current_stock", 0),
+                        reorder_level=row.mapped_data.get("reorder_level"),
+                        description=row.mapped_data.get("description"),
+                        category_id=uuid.UUID(row.mapped_data["category_id"]),
+                        status_id=uuid.UUID(row.mapped_data["status_id"]),
                     )
-                    existing_product.current_stock = row.mapped_data.get(
-                        "current_stock", 0
+
+                    db_product = Product(
+                        **product_data.model_dump(),
+                        created_by_id=current_user.id,
                     )
-                    if row.mapped_data.get("reorder_level") is not None:
-                        existing_product.reorder_level = row.mapped_data[
-                            "reorder_level"
-                        ]
-                    if row.mapped_data.get("description"):
-                        existing_product.description = row.mapped_data["description"]
-                    existing_product.updated_at = datetime.now(timezone.utc)
-
-                    session.add(existing_product)
+                    session.add(db_product)
                     session.commit()
+                    session.refresh(db_product)
 
-                    imported_product_ids.append(existing_product.id)
+                    imported_product_ids.append(db_product.id)
                     success_count += 1
 
-        except Exception as e:
-            failed_imports.append(
-                {
-                    "row_number": row.row_number,
-                    "error": str(e),
-                    "data": row.data,
-                }
-            )
+                elif action == "update" and row.duplicate_product_id:
+                    # Update existing product
+                    existing_product = session.get(Product, row.duplicate_product_id)
+                    if existing_product:
+                        # Update fields (prices are staged as strings)
+                        existing_product.selling_price = Decimal(
+                            str(row.mapped_data["selling_price"])
+                        )
+                        existing_product.buying_price = Decimal(
+                            str(row.mapped_data.get("buying_price", "0.00"))
+                        )
+                        existing_product.current_stock = row.mapped_data.get(
+                            "current_stock", 0
+                        )
+                        if row.mapped_data.get("reorder_level") is not None:
+                            existing_product.reorder_level = row.mapped_data[
+                                "reorder_level"
+                            ]
+                        if row.mapped_data.get("description"):
+                            existing_product.description = row.mapped_data[
+                                "description"
+                            ]
+                        existing_product.updated_at = datetime.now(timezone.utc)
+
+                        session.add(existing_product)
+                        session.commit()
+
+                        imported_product_ids.append(existing_product.id)
+                        success_count += 1
+
+            except Exception as e:
+                # Keep the session usable for the rows that follow
+                session.rollback()
+                failed_imports.append(
+                    {
+                        "row_number": row.row_number,
+                        "error": str(e),
+                        "data": row.data,
+                    }
+                )
 
     # Update session
     db_session.imported_rows = success_count
@@ -1006,7 +962,7 @@ def import_products(
         success_count=success_count,
         error_count=len(failed_imports),
         duplicate_count=db_session.duplicate_rows or 0,
-        total_processed=len(rows_to_import),
+        total_processed=total_processed,
         duration_seconds=duration,
         imported_product_ids=imported_product_ids,
         errors=failed_imports,
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Query
 from pydantic import BaseModel
 from sqlmodel import and_, func, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import AsyncReadSessionDep, CurrentUser
 from app.core.logging_config import get_logger
 from app.models import Debt, Sale
 
@@ -32,8 +32,8 @@ class CustomersPublic(BaseModel):
 
 
 @router.get("/", response_model=CustomersPublic)
-def get_customers(
-    session: SessionDep,
+async def get_customers(
+    session: AsyncReadSessionDep,
     current_user: CurrentUser,
     search: str | None = Query(None, description="Search by name or tel"),
     skip: int = Query(0, ge=0),
@@ -65,8 +65,8 @@ def get_customers(
     )
 
     # Execute queries
-    debt_results = session.exec(debt_customers_query).all()
-    sale_results = session.exec(last_sale_query).all()
+    debt_results = (await session.exec(debt_customers_query)).all()
+    sale_results = (await session.exec(last_sale_query)).all()
 
     # Create a map of customer data
     customer_map: dict[str, CustomerSummary] = {}
@@ -84,7 +84,7 @@ def get_customers(
         )
         .distinct()
     )
-    debt_contacts = session.exec(debt_contacts_query).all()
+    debt_contacts = (await session.exec(debt_contacts_query)).all()
     # Row objects support attribute access for selected columns
     contact_map: dict[str, str] = {
         row.customer_name.lower().strip(): row.customer_contact
@@ -7,9 +7,17 @@ from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import desc
 from sqlmodel import and_, col, func, select
 
-from app.api.deps import AdminUser, CurrentUser, SessionDep
+from app.api.deps import AdminUser, CurrentUser, ReadSessionDep, SessionDep
+from app.api.utils.pagination import (
+    COUNT_MODE_DESCRIPTION,
+    CURSOR_DESCRIPTION,
+    count_rows,
+    page_rows,
+    paginate,
+)
 from app.core.logging_config import get_logger
 from app.models import (
+    CountMode,
     Debt,
     DebtCreate,
     DebtPayment,
@@ -34,10 +42,12 @@ router = APIRouter(prefix="/debts", tags=["debts"])
 
 @router.get("/", response_model=DebtsPublic)
 def read_debts(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentUser,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     customer_name: str | None = None,
     status: str | None = None,
     start_date: str | None = None,
@@ -76,21 +86,24 @@ def read_debts(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid end_date format")
 
-    count_statement = select(func.count()).select_from(Debt)
-    if conditions:
-        count_statement = count_statement.where(and_(*conditions))
-    count = session.exec(count_statement).one()
-
     statement = select(Debt).options(
         qload_chain(Debt.sale, Sale.product)  # Load sale and product relationships
     )
     if conditions:
         statement = statement.where(and_(*conditions))
-    statement = statement.order_by(desc(Debt.debt_date)).offset(skip).limit(limit)
+    count, count_mode = count_rows(session, statement, count_mode)
+    order_by = (Debt.debt_date, Debt.id)
+    statement = paginate(
+        statement, order_by=order_by, skip=skip, limit=limit, cursor=cursor
+    )
 
-    debts = session.exec(statement).all()
+    debts, next_cursor = page_rows(
+        session.exec(statement).all(), order_by=order_by, limit=limit
+    )
 
-    return DebtsPublic(data=debts, count=count)
+    return DebtsPublic(
+        data=debts, count=count, count_mode=count_mode, next_cursor=next_cursor
+    )
 
 
 @router.post("/", response_model=DebtPublic)
@@ -325,6 +338,7 @@ def read_debt_payments(
     debt_id: uuid.UUID,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
 ) -> Any:
     """
     Get all payments for a specific debt.
@@ -333,12 +347,11 @@ def read_debt_payments(
     if not debt:
         raise HTTPException(status_code=404, detail="Debt not found")
 
-    count_statement = (
-        select(func.count())
-        .select_from(DebtPayment)
-        .where(DebtPayment.debt_id == debt_id)
+    count, count_mode = count_rows(
+        session,
+        select(DebtPayment).where(DebtPayment.debt_id == debt_id),
+        count_mode,
     )
-    count = session.exec(count_statement).one()
 
     statement = (
         select(DebtPayment)
@@ -353,7 +366,7 @@ def read_debt_payments(
 
     payments = session.exec(statement).all()
 
-    return DebtPaymentsPublic(data=payments, count=count)
+    return DebtPaymentsPublic(data=payments, count=count, count_mode=count_mode)
 
 
 @router.get("/customers/{customer_name}/balance")
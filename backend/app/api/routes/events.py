@@ -0,0 +1,169 @@
+"""
+Live Events API Route
+
+Server-sent events replacing the POS polling of till status, notification
+counts and recent sales. Clients connect with their usual Authorization and
+X-Register headers (a fetch-based SSE client, since EventSource can't send
+headers) and receive:
+
+- ``till``: the register's till status, as served by /till/status
+- ``notifications``: ``{"unread_count": n}`` for the current user
+- ``sales``: ``{"count": n}`` when the current user's sales were rung up or
+  voided; refetch /sales/recent
+- ``resync``: events may have been missed; refetch recent sales (the till and
+  notification state follow right after)
+
+A heartbeat comment is sent when the stream is otherwise idle. Reconnecting
+with Last-Event-ID resumes from that event on any worker.
+"""
+
+import asyncio
+import json
+import uuid
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.api.deps import CurrentUser, RegisterDep, SessionDep
+from app.api.utils.live_events import LiveEvent, live_events
+from app.api.utils.till_utils import till_status
+from app.core.config import settings
+from app.core.db import engine
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# Client reconnection delay after a dropped stream
+RETRY_MILLISECONDS = 3000
+
+
+def format_event(kind: str, data: Any, event_id: int | None = None) -> str:
+    """One SSE message"""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {kind}", f"data: {json.dumps(data, default=str)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def _till_state(register: str) -> dict[str, Any]:
+    with Session(engine) as session:
+        return till_status(session, register)
+
+
+def _unread_count(user_id: uuid.UUID) -> dict[str, int]:
+    with Session(engine) as session:
+        return {
+            "unread_count": crud.count_unread_notifications(
+                session=session, user_id=user_id
+            )
+        }
+
+
+async def _current_state(
+    user_id: uuid.UUID, register: str, event_id: int | None
+) -> list[str]:
+    return [
+        format_event("till", await run_in_threadpool(_till_state, register)),
+        format_event(
+            "notifications", await run_in_threadpool(_unread_count, user_id), event_id
+        ),
+    ]
+
+
+async def _render(
+    live_event: LiveEvent, user_id: uuid.UUID, register: str
+) -> list[str]:
+    """SSE messages for an event, empty when it isn't meant for this stream"""
+    data = live_event.data
+    if live_event.kind == "resync":
+        return [
+            format_event("resync", {}),
+            *await _current_state(user_id, register, live_events.last_event_id),
+        ]
+    if live_event.kind == "till" and data.get("register") == register:
+        state = await run_in_threadpool(_till_state, register)
+        return [format_event("till", state, live_event.id)]
+    if data.get("user_id") != str(user_id):
+        return []
+    if live_event.kind == "notifications":
+        count = await run_in_threadpool(_unread_count, user_id)
+        return [format_event("notifications", count, live_event.id)]
+    if live_event.kind == "sales":
+        return [format_event("sales", {"count": data["count"]}, live_event.id)]
+    return []
+
+
+async def live_event_stream(
+    request: Request,
+    user_id: uuid.UUID,
+    register: str,
+    last_event_id: int | None = None,
+) -> AsyncIterator[str]:
+    """Messages for one client until it disconnects"""
+    subscription = live_events.subscribe()
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        backlog = None
+        if last_event_id is not None:
+            backlog = live_events.since(last_event_id)
+        replayed = set()
+        if backlog is None:
+            if last_event_id is not None:
+                yield format_event("resync", {})
+            for message in await _current_state(
+                user_id, register, live_events.last_event_id
+            ):
+                yield message
+        else:
+            for live_event in backlog:
+                replayed.add(live_event.id)
+                for message in await _render(live_event, user_id, register):
+                    yield message
+
+        while True:
+            try:
+                live_event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=settings.LIVE_EVENTS_HEARTBEAT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": heartbeat\n\n"
+                continue
+            # Already sent from the backlog while subscribing
+            if live_event.id in replayed:
+                continue
+            for message in await _render(live_event, user_id, register):
+                yield message
+    finally:
+        live_events.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    session: SessionDep,
+    current_user: CurrentUser,
+    register: RegisterDep,
+    last_event_id: Annotated[int | None, Header()] = None,
+) -> StreamingResponse:
+    """
+    Server-sent events for the current user and the request's register.
+
+    Replaces polling /till/status, /notifications/unread-count and
+    /sales/recent.
+    """
+    if not settings.LIVE_EVENTS_ENABLED:
+        raise HTTPException(status_code=503, detail="Live events are disabled")
+    user_id = current_user.id
+    # Give the pooled connection back; the stream opens short sessions as needed
+    await run_in_threadpool(session.close)
+    return StreamingResponse(
+        live_event_stream(request, user_id, register, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -5,10 +5,25 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy.sql import ColumnElement
-from sqlmodel import and_, desc, func, select
-
-from app.api.deps import AdminUser, CurrentUser, SessionDep
+from sqlmodel import Session, and_, func, select
+
+from app.api.deps import (
+    AdminUser,
+    CurrentUser,
+    ReadSessionDep,
+    SessionDep,
+    conditional_get,
+)
+from app.api.utils.pagination import (
+    COUNT_MODE_DESCRIPTION,
+    CURSOR_DESCRIPTION,
+    count_rows,
+    page_rows,
+    paginate,
+)
+from app.api.utils.response_cache import cached_response
 from app.models import (
+    CountMode,
     Expense,
     ExpenseCategoriesPublic,
     ExpenseCategory,
@@ -20,6 +35,7 @@ from app.models import (
     ExpensesPublic,
     ExpenseUpdate,
 )
+from app.utils.date_ranges import date_range_conditions
 from app.utils.sqlalchemy_helpers import qload
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
@@ -28,7 +44,11 @@ router = APIRouter(prefix="/expenses", tags=["expenses"])
 # ==================== EXPENSE CATEGORIES ====================
 
 
-@router.get("/categories", response_model=ExpenseCategoriesPublic)
+@router.get(
+    "/categories",
+    response_model=ExpenseCategoriesPublic,
+    dependencies=[conditional_get("expense_category")],
+)
 def read_expense_categories(
     session: SessionDep,
     current_user: CurrentUser,
@@ -161,10 +181,12 @@ def delete_expense_category(
 
 @router.get("/", response_model=ExpensesPublic)
 def read_expenses(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentUser,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     category_id: uuid.UUID | None = Query(None),
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
@@ -176,6 +198,8 @@ def read_expenses(
     Args:
         skip: Number of expenses to skip (pagination)
         limit: Number of expenses to return (max 1000)
+        cursor: Keyset pagination cursor from a previous next_cursor (skip is ignored)
+        count_mode: exact, estimated (planner estimate past 1000 rows) or none
         category_id: Filter by category ID
         start_date: Filter expenses from this date onwards
         end_date: Filter expenses up to this date
@@ -187,50 +211,35 @@ def read_expenses(
         qload(Expense.created_by),
     )
 
-    # Build count query
-    count_statement = select(func.count()).select_from(Expense)
-
     # Apply filters
     conditions: list[ColumnElement[bool]] = []
 
     if category_id:
         conditions.append(Expense.category_id == category_id)  # type: ignore[arg-type]
 
-    if start_date:
-        conditions.append(
-            Expense.expense_date
-            >= datetime.combine(start_date, datetime.min.time()).replace(
-                tzinfo=datetime.now().astimezone().tzinfo
-            )
-        )  # type: ignore[arg-type]
-
-    if end_date:
-        conditions.append(
-            Expense.expense_date
-            <= datetime.combine(end_date, datetime.max.time()).replace(
-                tzinfo=datetime.now().astimezone().tzinfo
-            )
-        )  # type: ignore[arg-type]
+    conditions.extend(date_range_conditions(Expense.expense_date, start_date, end_date))
 
     if search:
         search_condition = Expense.description.ilike(f"%{search}%")
         conditions.append(search_condition)
 
-    # Apply conditions to both queries
     if conditions:
-        combined_conditions = and_(*conditions)
-        statement = statement.where(combined_conditions)
-        count_statement = count_statement.where(combined_conditions)
+        statement = statement.where(and_(*conditions))
 
-    # Execute count query
-    count = session.exec(count_statement).one()
+    count, count_mode = count_rows(session, statement, count_mode)
 
     # Execute expenses query with pagination and ordering
-    statement = statement.order_by(desc(Expense.expense_date), desc(Expense.created_at))
-    statement = statement.offset(skip).limit(limit)
-    expenses = session.exec(statement).all()
+    order_by = (Expense.expense_date, Expense.created_at, Expense.id)
+    statement = paginate(
+        statement, order_by=order_by, skip=skip, limit=limit, cursor=cursor
+    )
+    expenses, next_cursor = page_rows(
+        session.exec(statement).all(), order_by=order_by, limit=limit
+    )
 
-    return ExpensesPublic(data=expenses, count=count)
+    return ExpensesPublic(
+        data=expenses, count=count, count_mode=count_mode, next_cursor=next_cursor
+    )
 
 
 @router.post("/", response_model=ExpensePublic)
@@ -346,6 +355,7 @@ def delete_expense(
 @router.get("/stats/summary")
 def get_expense_summary(
     session: SessionDep,
+    read_session: ReadSessionDep,
     current_user: CurrentUser,
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
@@ -354,6 +364,31 @@ def get_expense_summary(
     """
     Get expense summary statistics.
     """
+    return cached_response(
+        session,
+        current_user,
+        route="expenses/stats/summary",
+        params={
+            "start_date": start_date,
+            "end_date": end_date,
+            "category_id": category_id,
+        },
+        tables=("expense", "expense_category"),
+        compute=lambda: _build_expense_summary(
+            read_session, start_date, end_date, category_id
+        ),
+        scoped=False,
+        read_session=read_session,
+    )
+
+
+def _build_expense_summary(
+    session: Session,
+    start_date: date | None,
+    end_date: date | None,
+    category_id: uuid.UUID | None,
+) -> dict[str, Any]:
+    """Compute the expense summary (uncached)"""
     # Build base query
     statement = select(Expense)
 
@@ -363,21 +398,7 @@ def get_expense_summary(
     if category_id:
         conditions.append(Expense.category_id == category_id)  # type: ignore[arg-type]
 
-    if start_date:
-        conditions.append(
-            Expense.expense_date
-            >= datetime.combine(start_date, datetime.min.time()).replace(
-                tzinfo=datetime.now().astimezone().tzinfo
-            )
-        )  # type: ignore[arg-type]
-
-    if end_date:
-        conditions.append(
-            Expense.expense_date
-            <= datetime.combine(end_date, datetime.max.time()).replace(
-                tzinfo=datetime.now().astimezone().tzinfo
-            )
-        )  # type: ignore[arg-type]
+    conditions.extend(date_range_conditions(Expense.expense_date, start_date, end_date))
 
     if conditions:
         combined_conditions = and_(*conditions)
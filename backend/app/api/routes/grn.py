@@ -3,17 +3,25 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from sqlalchemy import and_, desc, func, or_
+from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy import and_, func, or_
 from sqlalchemy.sql import ColumnElement
 from sqlmodel import select
 
-from app.api.deps import AdminUser, CurrentUser, SessionDep
+from app.api.deps import AdminUser, CurrentUser, ReadSessionDep, SessionDep
+from app.api.utils.pagination import (
+    COUNT_MODE_DESCRIPTION,
+    CURSOR_DESCRIPTION,
+    count_rows,
+    page_rows,
+    paginate,
+)
 from app.crud import grn as grn_crud
 from app.crud import supplier as supplier_crud
 from app.crud import transporter as transporter_crud
 from app.models import (
     GRN,
+    CountMode,
     GRNCreate,
     GRNItem,
     GRNPublic,
@@ -46,6 +54,7 @@ def read_suppliers(
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     search: str | None = None,
     is_active: bool | None = None,
 ) -> Any:
@@ -71,8 +80,7 @@ def read_suppliers(
         statement = statement.where(and_(*filters))
 
     # Get count
-    count_statement = select(func.count()).select_from(statement.subquery())
-    count = session.exec(count_statement).one()
+    count, count_mode = count_rows(session, statement, count_mode)
 
     # Apply pagination and ordering
     statement = statement.order_by(Supplier.name).offset(skip).limit(limit)
@@ -96,7 +104,7 @@ def read_suppliers(
         supplier_public = SupplierPublic(**supplier_dict)
         suppliers_with_debt.append(supplier_public)
 
-    return SuppliersPublic(data=suppliers_with_debt, count=count)
+    return SuppliersPublic(data=suppliers_with_debt, count=count, count_mode=count_mode)
 
 
 @router.post("/suppliers", response_model=SupplierPublic)
@@ -200,6 +208,7 @@ def read_transporters(
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     search: str | None = None,
     is_active: bool | None = None,
 ) -> Any:
@@ -225,14 +234,13 @@ def read_transporters(
         statement = statement.where(and_(*filters))
 
     # Get count
-    count_statement = select(func.count()).select_from(statement.subquery())
-    count = session.exec(count_statement).one()
+    count, count_mode = count_rows(session, statement, count_mode)
 
     # Apply pagination and ordering
     statement = statement.order_by(Transporter.name).offset(skip).limit(limit)
     transporters = session.exec(statement).all()
 
-    return TransportersPublic(data=transporters, count=count)
+    return TransportersPublic(data=transporters, count=count, count_mode=count_mode)
 
 
 @router.post("/transporters", response_model=TransporterPublic)
@@ -336,10 +344,12 @@ def delete_transporter(
 
 @router.get("/", response_model=GRNsPublic)
 def read_grns(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     search: str | None = None,
     supplier_id: uuid.UUID | None = None,
     is_approved: bool | None = None,
@@ -381,12 +391,16 @@ def read_grns(
         statement = statement.where(and_(*filters))
 
     # Get count
-    count_statement = select(func.count()).select_from(statement.subquery())
-    count = session.exec(count_statement).one()
+    count, count_mode = count_rows(session, statement, count_mode)
 
     # Apply pagination and ordering (newest first)
-    statement = statement.order_by(desc(GRN.created_at)).offset(skip).limit(limit)
-    grns = session.exec(statement).all()
+    order_by = (GRN.created_at, GRN.id)
+    statement = paginate(
+        statement, order_by=order_by, skip=skip, limit=limit, cursor=cursor
+    )
+    grns, next_cursor = page_rows(
+        session.exec(statement).all(), order_by=order_by, limit=limit
+    )
 
     # Add computed fields
     grns_public = []
@@ -397,7 +411,9 @@ def read_grns(
         grn_dict["items_count"] = len(grn.items) if grn.items else 0
         grns_public.append(GRNPublic(**grn_dict))
 
-    return GRNsPublic(data=grns_public, count=count)
+    return GRNsPublic(
+        data=grns_public, count=count, count_mode=count_mode, next_cursor=next_cursor
+    )
 
 
 @router.post("/", response_model=GRNPublicWithItems)
@@ -4,10 +4,12 @@ from pathlib import Path
 from typing import Any
 
 from fastapi import APIRouter, File, HTTPException, UploadFile
-from sqlmodel import select
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, select
 
 from app.api.deps import AdminUser, SessionDep
 from app.core.logging_config import get_logger
+from app.core.offload import run_blocking_io, write_file
 from app.models import Media, MediaCreate, MediaPublic
 
 logger = get_logger(__name__)
@@ -27,6 +29,13 @@ def get_upload_dir() -> Path:
     return upload_dir
 
 
+def _save_media(session: Session, media: Media) -> None:
+    """Blocking commit for upload_image, run in the threadpool"""
+    session.add(media)
+    session.commit()
+    session.refresh(media)
+
+
 @router.post("/upload", response_model=MediaPublic)
 async def upload_image(
     *, session: SessionDep, admin_user: AdminUser, file: UploadFile = File(...)
@@ -63,13 +72,12 @@ async def upload_image(
     unique_filename = f"{file_uuid}{file_ext}"
 
     # Get upload directory
-    upload_dir = get_upload_dir()
+    upload_dir = await run_blocking_io(get_upload_dir)
     file_path = upload_dir / unique_filename
 
     # Save file and create database record in atomic transaction
     try:
-        with open(file_path, "wb") as f:
-            f.write(content)
+        await run_blocking_io(write_file, file_path, content)
 
         # Create media record in database with relative path
         relative_path = f"products/{unique_filename}"
@@ -81,18 +89,15 @@ async def upload_image(
         )
 
         media = Media.model_validate(media_in)
-        session.add(media)
-        session.commit()
-        session.refresh(media)
+        await run_in_threadpool(_save_media, session, media)
     except Exception as e:
         # Rollback database transaction if file save succeeded but DB failed
-        session.rollback()
+        await run_in_threadpool(session.rollback)
         # Try to clean up file if it was created
-        if file_path.exists():
-            try:
-                file_path.unlink()
-            except Exception:
-                pass  # Ignore cleanup errors
+        try:
+            await run_blocking_io(file_path.unlink, missing_ok=True)
+        except Exception:
+            pass  # Ignore cleanup errors
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
 
     # Create response with URL
@@ -103,7 +108,7 @@ async def upload_image(
 
 
 @router.get("/serve/{media_id}")
-async def serve_image(media_id: uuid_lib.UUID, session: SessionDep) -> Any:  # type: ignore[return]
+def serve_image(media_id: uuid_lib.UUID, session: SessionDep) -> Any:  # type: ignore[return]
     """
     Serve an uploaded image.
     """
@@ -10,13 +10,20 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from sqlalchemy import desc
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Query
+from sqlmodel import select
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import CurrentUser, SessionDep, conditional_get
+from app.api.utils.pagination import (
+    COUNT_MODE_DESCRIPTION,
+    CURSOR_DESCRIPTION,
+    count_rows,
+    page_rows,
+    paginate,
+)
 from app.models import (
+    CountMode,
     Message,
     Notification,
     NotificationPublic,
@@ -26,12 +33,18 @@ from app.models import (
 router = APIRouter()
 
 
-@router.get("/", response_model=NotificationsPublic)
+@router.get(
+    "/",
+    response_model=NotificationsPublic,
+    dependencies=[conditional_get("notification", scoped=True)],
+)
 def list_notifications(
     session: SessionDep,
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     is_read: bool | None = None,
     notification_type: str | None = None,
     priority: str | None = None,
@@ -52,34 +65,37 @@ def list_notifications(
     if priority:
         statement = statement.where(Notification.priority == priority)
 
-    # Order by created_at desc (newest first)
-    statement = statement.order_by(desc(Notification.created_at))
-
     # Get total count
-    count_statement = select(func.count()).select_from(statement.subquery())
-    total_count = session.exec(count_statement).one()
+    total_count, count_mode = count_rows(session, statement, count_mode)
 
     # Get unread count
-    unread_statement = (
-        select(func.count())
-        .select_from(Notification)
-        .where(Notification.user_id == current_user.id)
-        .where(Notification.is_read is False)
+    unread_count = crud.count_unread_notifications(
+        session=session, user_id=current_user.id
     )
-    unread_count = session.exec(unread_statement).one()
 
-    # Apply pagination
-    statement = statement.offset(skip).limit(limit)
-    notifications = session.exec(statement).all()
+    # Apply pagination, newest first
+    order_by = (Notification.created_at, Notification.id)
+    statement = paginate(
+        statement, order_by=order_by, skip=skip, limit=limit, cursor=cursor
+    )
+    notifications, next_cursor = page_rows(
+        session.exec(statement).all(), order_by=order_by, limit=limit
+    )
 
     return NotificationsPublic(
         data=notifications,
         count=total_count,
+        count_mode=count_mode,
         unread_count=unread_count,
+        next_cursor=next_cursor,
     )
 
 
-@router.get("/unread-count", response_model=dict[str, int])
+@router.get(
+    "/unread-count",
+    response_model=dict[str, int],
+    dependencies=[conditional_get("notification", scoped=True)],
+)
 def get_unread_count(
     session: SessionDep,
     current_user: CurrentUser,
@@ -89,13 +105,7 @@ def get_unread_count(
 
     Used for badge display on notification bell icon.
     """
-    statement = (
-        select(func.count())
-        .select_from(Notification)
-        .where(Notification.user_id == current_user.id)
-        .where(Notification.is_read is False)
-    )
-    count = session.exec(statement).one()
+    count = crud.count_unread_notifications(session=session, user_id=current_user.id)
 
     return {"unread_count": count}
 
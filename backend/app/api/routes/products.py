@@ -7,9 +7,18 @@ from sqlalchemy.sql import ColumnElement
 from sqlmodel import and_, func, select
 
 from app import crud
-from app.api.deps import AdminUser, CurrentUser, SessionDep
+from app.api.deps import (
+    AdminUser,
+    CurrentUser,
+    ReadSessionDep,
+    SessionDep,
+    conditional_get,
+)
+from app.api.utils.pagination import count_rows
+from app.api.utils.product_search import name_search_condition, name_search_ranking
 from app.crud import product as product_crud
 from app.models import (
+    CountMode,
     Product,
     ProductCategoriesPublic,
     ProductCategory,
@@ -28,7 +37,11 @@ router = APIRouter(prefix="/products", tags=["products"])
 # ==================== PRODUCT CATEGORIES ====================
 
 
-@router.get("/categories", response_model=ProductCategoriesPublic)
+@router.get(
+    "/categories",
+    response_model=ProductCategoriesPublic,
+    dependencies=[conditional_get("product_category", public=True)],
+)
 def read_categories(session: SessionDep) -> Any:
     """
     Retrieve product categories.
@@ -43,7 +56,11 @@ def read_categories(session: SessionDep) -> Any:
 # ==================== PRODUCT STATUSES ====================
 
 
-@router.get("/statuses", response_model=list[ProductStatusPublic])
+@router.get(
+    "/statuses",
+    response_model=list[ProductStatusPublic],
+    dependencies=[conditional_get("product_status", public=True)],
+)
 def read_statuses(session: SessionDep) -> Any:
     """
     Retrieve product statuses.
@@ -56,14 +73,28 @@ def read_statuses(session: SessionDep) -> Any:
 # ==================== PRODUCTS CRUD ====================
 
 
-@router.get("/", response_model=ProductsPublic)
+@router.get(
+    "/",
+    response_model=ProductsPublic,
+    dependencies=[
+        conditional_get(
+            "product",
+            "product_category",
+            "product_status",
+            "media",
+            public=True,
+            replica=True,
+        )
+    ],
+)
 def read_products(
-    session: SessionDep,
+    session: ReadSessionDep,
     skip: int = 0,
     limit: int = 100,
     name: str | None = None,
     category_id: str | None = None,
     status_id: str | None = None,
+    count_mode: CountMode = "exact",
 ) -> Any:
     """
     Retrieve products with optional filtering.
@@ -71,9 +102,10 @@ def read_products(
     Args:
         skip: Number of products to skip (pagination)
         limit: Number of products to return (max 100)
-        name: Filter by product name (partial match, case-insensitive)
+        name: Filter by product name (partial match, case-insensitive, best matches first)
         category_id: Filter by category ID
         status_id: Filter by status ID
+        count_mode: exact, estimated (planner estimate past 1000 rows) or none
     """
     # Build base query
     statement = select(Product).options(
@@ -82,15 +114,13 @@ def read_products(
         qload(Product.image),
     )
 
-    # Build count query
-    count_statement = select(func.count()).select_from(Product)
-
     # Apply filters
     conditions: list[ColumnElement[bool]] = []
 
+    # A blank name would match every product; treat it as no filter
+    name = name.strip() if name else None
     if name:
-        name_condition = Product.name.ilike(f"%{name}%")
-        conditions.append(name_condition)
+        conditions.append(name_search_condition(session, Product.name, name))
 
     if category_id:
         try:
@@ -108,20 +138,20 @@ def read_products(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid status_id format")
 
-    # Apply conditions to both queries
     if conditions:
-        combined_conditions = and_(*conditions)
-        statement = statement.where(combined_conditions)
-        count_statement = count_statement.where(combined_conditions)
+        statement = statement.where(and_(*conditions))
 
-    # Execute count query
-    count = session.exec(count_statement).one()
+    count, count_mode = count_rows(session, statement, count_mode)
 
     # Execute products query with pagination
+    if name:
+        statement = statement.order_by(
+            *name_search_ranking(session, Product.name, name)
+        )
     statement = statement.offset(skip).limit(limit)
     products = session.exec(statement).all()
 
-    return ProductsPublic(data=products, count=count)
+    return ProductsPublic(data=products, count=count, count_mode=count_mode)
 
 
 @router.post("/", response_model=ProductPublic)
@@ -14,7 +14,9 @@ from sqlalchemy import desc
 from sqlmodel import func, select
 
 from app.api.deps import CurrentUser, SessionDep
+from app.api.utils.pagination import count_rows
 from app.models import (
+    CountMode,
     Message,
     ReminderLog,
     ReminderLogsPublic,
@@ -204,6 +206,7 @@ def list_reminder_logs(
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    count_mode: CountMode = "exact",
     status: str | None = None,
 ) -> Any:
     """
@@ -224,14 +227,13 @@ def list_reminder_logs(
         statement = statement.where(ReminderLog.status == status)
 
     # Get total count
-    count_statement = select(func.count()).select_from(statement.subquery())
-    total_count = session.exec(count_statement).one()
+    total_count, count_mode = count_rows(session, statement, count_mode)
 
     # Apply pagination
     statement = statement.offset(skip).limit(limit)
     logs = session.exec(statement).all()
 
-    return ReminderLogsPublic(data=logs, count=total_count)
+    return ReminderLogsPublic(data=logs, count=total_count, count_mode=count_mode)
 
 
 @router.get("/statistics", response_model=dict[str, Any])
@@ -1,18 +1,39 @@
 import uuid
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
-from sqlalchemy import Date, String, cast, desc, exists
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import String, cast, desc, exists
 from sqlalchemy.orm import selectinload
 from sqlalchemy.sql import ColumnElement
-from sqlmodel import and_, func, or_, select
-
-from app.api.deps import AdminUser, CurrentUser, SessionDep
+from sqlmodel import Session, and_, col, func, or_, select
+
+from app.api.deps import (
+    AdminUser,
+    CurrentUser,
+    ReadSessionDep,
+    RegisterDep,
+    SessionDep,
+    conditional_get,
+)
+from app.api.utils.catalog_cache import catalog_cache, products_with_stock
+from app.api.utils.pagination import (
+    COUNT_MODE_DESCRIPTION,
+    CURSOR_DESCRIPTION,
+    count_rows,
+    page_rows,
+    paginate,
+)
+from app.api.utils.product_search import name_search_condition, name_search_ranking
+from app.api.utils.sales_rollup import apply_sale_to_rollup, sales_rollup_source
+from app.api.utils.shift_totals import apply_sale_to_shift_totals
+from app.api.utils.stock import add_stock, sell_stock
 from app.core.logging_config import get_logger
 from app.models import (
+    CheckoutReceipt,
+    CountMode,
     Debt,
     PaymentMethod,
     PaymentMethodCreate,
@@ -27,17 +48,33 @@ from app.models import (
     SalePaymentPublic,
     SalePublic,
     SalesPublic,
+    SaleSyncResult,
+    SaleSyncResults,
+    TillShift,
+    User,
 )
+from app.utils.date_ranges import business_today, date_range_conditions
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/sales", tags=["sales"])
 
 
+def parse_receipt_number(value: str) -> int | None:
+    """Receipt number typed by a cashier ("1042" or "#1042"), or None if it isn't one"""
+    digits = value.strip().removeprefix("#")
+    # Anything longer than 18 digits can't be a BIGINT receipt number
+    return int(digits) if digits.isdigit() and len(digits) <= 18 else None
+
+
 # ==================== PAYMENT METHODS ====================
 
 
-@router.get("/payment-methods", response_model=PaymentMethodsPublic)
+@router.get(
+    "/payment-methods",
+    response_model=PaymentMethodsPublic,
+    dependencies=[conditional_get("payment_method")],
+)
 def read_payment_methods(
     session: SessionDep,
     current_user: CurrentUser,
@@ -132,56 +169,38 @@ def update_payment_method(
 def search_products_for_sale(
     session: SessionDep,
     current_user: CurrentUser,
-    q: str = Query(..., min_length=1, description="Search query"),
+    q: str = Query(..., pattern=r"\S", description="Search query"),
     category_id: str | None = Query(None, description="Filter by category ID"),
     limit: int = Query(50, le=100, description="Maximum results to return"),
 ) -> Any:
     """
     Fast product search for sales cart.
-    Searches by name or category.
+    Searches by name, ranked by prefix match then closeness.
     Only returns products with status 'Active' and stock > 0.
     """
     from app.models import ProductStatus
 
-    # Build search pattern for case-insensitive search
-    search_pattern = f"%{q}%"
-
-    # Base query - only active products with stock
+    # Only active products with stock
     conditions: list[ColumnElement[bool]] = [
-        Product.name.ilike(search_pattern),
-        Product.current_stock > 0,  # type: ignore[arg-type]
+        name_search_condition(session, Product.name, q),
+        Product.current_stock > 0,  # type: ignore[list-item]
+        ProductStatus.name == "Active",  # type: ignore[list-item]
     ]
 
     # Add category filter if provided
     if category_id:
         conditions.append(Product.category_id == category_id)  # type: ignore[arg-type]
 
+    # Only ids and live stock come from the database; the rest from the catalog cache
     statement = (
-        select(Product)
-        .join(Product.category)
+        select(Product.id, Product.current_stock)
         .join(Product.status)
-        .where(
-            and_(
-                or_(Product.name.ilike(search_pattern)),
-                Product.current_stock > 0,
-                ProductStatus.name == "Active",
-            )
-        )
-        .options(
-            selectinload(Product.category),
-            selectinload(Product.status),
-            selectinload(Product.image),
-        )
+        .where(and_(*conditions))
+        .order_by(*name_search_ranking(session, Product.name, q))
         .limit(limit)
     )
 
-    # Add category filter if specified
-    if category_id:
-        statement = statement.where(Product.category_id == category_id)
-
-    products = session.exec(statement).all()
-
-    return products
+    return products_with_stock(session, session.exec(statement).all())
 
 
 # ==================== SALES CRUD ====================
@@ -189,7 +208,11 @@ def search_products_for_sale(
 
 @router.post("", response_model=SalePublic)
 def create_sale(
-    *, session: SessionDep, current_user: CurrentUser, sale_in: SaleCreate
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    register: RegisterDep,
+    sale_in: SaleCreate,
 ) -> Any:
     """
     Create a new sale and update product stock.
@@ -206,7 +229,7 @@ def create_sale(
     # POS LOCK: Check if till is open
     from app.api.utils.till_utils import get_current_open_shift
 
-    open_shift = get_current_open_shift(session)
+    open_shift = get_current_open_shift(session, register)
     if not open_shift:
         raise HTTPException(
             status_code=403,
@@ -226,59 +249,30 @@ def create_sale(
             detail="Auditors have read-only access. Sales creation is not allowed.",
         )
 
-    # Validate product exists and lock row to prevent race conditions
-    product = session.exec(
-        select(Product).where(Product.id == sale_in.product_id).with_for_update()
-    ).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-
-    # Check if product is active
-    from app.models import ProductStatus
-
-    status = session.get(ProductStatus, product.status_id)
-    if status and status.name != "Active":
-        raise HTTPException(
-            status_code=400,
-            detail=f"Product '{product.name}' is not active. Current status: {status.name}",
-        )
-
-    # CRITICAL: Real-time stock validation
-    if product.current_stock is None:
-        raise HTTPException(
-            status_code=400, detail=f"Product '{product.name}' has no stock information"
-        )
+    # Validate payment method
+    payment_method = session.get(PaymentMethod, sale_in.payment_method_id)
+    if not payment_method:
+        raise HTTPException(status_code=404, detail="Payment method not found")
 
-    if product.current_stock < sale_in.quantity:
-        available = product.current_stock
-        requested = sale_in.quantity
-        shortfall = requested - available
-        raise HTTPException(
-            status_code=400,
-            detail=f"Insufficient stock for '{product.name}'. Available: {available}, Requested: {requested}, Shortfall: {shortfall}",
-        )
+    # ATOMIC OPERATION: check and decrement stock in one statement. The product
+    # row stays locked from here until commit, so nothing slow may follow.
+    stock = sell_stock(session, sale_in.product_id, sale_in.quantity)
 
     # Warn if stock is low (less than 5 units remaining after sale)
-    remaining_stock = product.current_stock - sale_in.quantity
-    if remaining_stock < 5:
+    if stock.current_stock < 5:
         logger.warning(
-            f"Low stock warning: Product '{product.name}' will have {remaining_stock} units remaining after this sale"
+            f"Low stock warning: Product '{stock.name}' will have {stock.current_stock} units remaining after this sale"
         )
 
-    # Validate payment method
-    payment_method = session.get(PaymentMethod, sale_in.payment_method_id)
-    if not payment_method:
-        raise HTTPException(status_code=404, detail="Payment method not found")
-
     # Calculate total_amount from selling price and quantity
-    if product.selling_price is None:
+    if stock.selling_price is None:
         raise HTTPException(
-            status_code=400, detail=f"Product '{product.name}' has no selling price set"
+            status_code=400, detail=f"Product '{stock.name}' has no selling price set"
         )
 
     # Use the total_amount from sale_in if provided, otherwise calculate it
     if sale_in.total_amount is None or sale_in.total_amount == 0:
-        calculated_total = float(product.selling_price) * sale_in.quantity
+        calculated_total = float(stock.selling_price) * sale_in.quantity
     else:
         calculated_total = float(sale_in.total_amount)
 
@@ -286,19 +280,17 @@ def create_sale(
     # IMPORTANT: created_by_id must be the currently authenticated user (from JWT token)
     # This ensures the sale is correctly attributed to the person who made it
     sale = Sale(
-        **sale_in.model_dump(),
+        **sale_in.model_dump(exclude={"total_amount"}),
         total_amount=Decimal(str(calculated_total)),
+        till_shift_id=open_shift.id,
         created_by_id=current_user.id,  # This is the authenticated user from the JWT token
     )
-
-    # ATOMIC OPERATION: Update product stock
-    product.current_stock -= sale_in.quantity
-
-    # Save both operations in single transaction
     session.add(sale)
-    session.add(product)
 
     try:
+        session.flush()
+        apply_sale_to_rollup(session, sale.id)
+        apply_sale_to_shift_totals(session, sale.id)
         session.commit()
         session.refresh(sale)
     except Exception as e:
@@ -335,7 +327,11 @@ class MultiPaymentSaleCreate(BaseModel):
 
 @router.post("/multi-payment", response_model=SalePublic)
 def create_sale_with_multiple_payments(
-    *, session: SessionDep, current_user: CurrentUser, sale_in: MultiPaymentSaleCreate
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    register: RegisterDep,
+    sale_in: MultiPaymentSaleCreate,
 ) -> Any:
     """
     Create a sale with multiple payment methods.
@@ -352,7 +348,7 @@ def create_sale_with_multiple_payments(
     # POS LOCK: Check if till is open
     from app.api.utils.till_utils import get_current_open_shift
 
-    open_shift = get_current_open_shift(session)
+    open_shift = get_current_open_shift(session, register)
     if not open_shift:
         raise HTTPException(
             status_code=403,
@@ -372,35 +368,6 @@ def create_sale_with_multiple_payments(
             detail="Auditors have read-only access. Sales creation is not allowed.",
         )
 
-    # Validate product exists and lock row to prevent race conditions
-    product = session.exec(
-        select(Product).where(Product.id == sale_in.product_id).with_for_update()
-    ).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-
-    # Check if product is active
-    from app.models import ProductStatus
-
-    status = session.get(ProductStatus, product.status_id)
-    if status and status.name != "Active":
-        raise HTTPException(
-            status_code=400,
-            detail=f"Product '{product.name}' is not active. Current status: {status.name}",
-        )
-
-    # CRITICAL: Real-time stock validation (with row lock)
-    if product.current_stock is None:
-        raise HTTPException(
-            status_code=400, detail=f"Product '{product.name}' has no stock information"
-        )
-
-    if product.current_stock < sale_in.quantity:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Insufficient stock for '{product.name}'. Available: {product.current_stock}, Requested: {sale_in.quantity}",
-        )
-
     # Validate payments
     # If customer is provided, allow empty payments (full amount becomes debt)
     # Otherwise, require at least one payment method
@@ -480,41 +447,13 @@ def create_sale_with_multiple_payments(
                 detail=f"Excessive overpayment detected: {payment_difference} ({overpayment_percentage:.1f}% of total). Please verify the payment amount.",
             )
 
-    # Calculate total_amount from selling price if not provided
-    if sale_in.total_amount is None or sale_in.total_amount == 0:
-        if product.selling_price is None:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Product '{product.name}' has no selling price set",
-            )
-        calculated_total = Decimal(str(product.selling_price)) * Decimal(
-            str(sale_in.quantity)
-        )
-    else:
-        calculated_total = sale_total_amount
-
     # Handle payment_method_id for sales with no payments (credit sales)
     # If no payments provided but customer exists, we need a payment method for the sale record
     # Try to find a "Credit" payment method, or use the first active payment method as fallback
     final_payment_method_id = primary_payment_method_id
     if final_payment_method_id is None and sale_in.customer_name:
-        # Look for a "Credit" payment method
-        credit_method = session.exec(
-            select(PaymentMethod)
-            .where(PaymentMethod.name.ilike("%credit%"))
-            .where(PaymentMethod.is_active.is_(True))
-            .limit(1)
-        ).first()
-
-        if credit_method:
-            final_payment_method_id = credit_method.id
-        else:
-            # Fallback: use first active payment method
-            fallback_method = session.exec(
-                select(PaymentMethod).where(PaymentMethod.is_active.is_(True)).limit(1)
-            ).first()
-            if fallback_method:
-                final_payment_method_id = fallback_method.id
+        # Look for a "Credit" payment method, else the first active one
+        final_payment_method_id = credit_payment_method_id(session)
 
     # If still no payment method found, raise error (shouldn't happen if payment methods exist)
     if final_payment_method_id is None:
@@ -523,6 +462,23 @@ def create_sale_with_multiple_payments(
             detail="No payment method available. Please configure at least one active payment method in the system.",
         )
 
+    # ATOMIC OPERATION: check and decrement stock in one statement. The product
+    # row stays locked from here until commit, so nothing slow may follow.
+    stock = sell_stock(session, sale_in.product_id, sale_in.quantity)
+
+    # Calculate total_amount from selling price if not provided
+    if sale_in.total_amount is None or sale_in.total_amount == 0:
+        if stock.selling_price is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Product '{stock.name}' has no selling price set",
+            )
+        calculated_total = Decimal(str(stock.selling_price)) * Decimal(
+            str(sale_in.quantity)
+        )
+    else:
+        calculated_total = sale_total_amount
+
     # Create sale with primary payment method (for backward compatibility)
     # IMPORTANT: created_by_id must be the currently authenticated user (from JWT token)
     # This ensures the sale is correctly attributed to the person who made it
@@ -534,19 +490,15 @@ def create_sale_with_multiple_payments(
         payment_method_id=final_payment_method_id,
         customer_name=sale_in.customer_name,
         notes=sale_in.notes,
+        till_shift_id=open_shift.id,
         created_by_id=current_user.id,  # This is the authenticated user from the JWT token
     )
 
-    # ATOMIC OPERATION: Update product stock
-    product.current_stock -= sale_in.quantity
-
     # Save sale first
     session.add(sale)
-    session.add(product)
 
     try:
         session.flush()  # Flush to get sale.id without committing
-        session.refresh(sale)
 
         # Create payment records (only if payments were provided)
         if sale_in.payments and len(sale_in.payments) > 0:
@@ -570,6 +522,8 @@ def create_sale_with_multiple_payments(
                 )
                 session.add(sale_payment)
 
+        apply_sale_to_rollup(session, sale.id)
+        apply_sale_to_shift_totals(session, sale.id)
         session.commit()
         session.refresh(sale)
 
@@ -621,6 +575,488 @@ def create_sale_with_multiple_payments(
     return sale
 
 
+# ==================== CART CHECKOUT ====================
+
+
+class CheckoutLine(BaseModel):
+    """One product line of a cart checkout"""
+
+    product_id: uuid.UUID
+    quantity: int = Field(gt=0)
+    unit_price: Decimal = Field(gt=0)
+    # Line total (quantity x unit_price); defaults to selling price x quantity
+    total_amount: Decimal | None = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def validate_total_amount(self) -> "CheckoutLine":
+        """Same rule as SaleBase: the total must equal quantity x unit_price"""
+        if self.total_amount is None:
+            return self
+        expected_total = self.quantity * self.unit_price
+        if abs(self.total_amount - expected_total) > Decimal("0.01"):
+            raise ValueError(
+                f"Total amount ({self.total_amount}) must equal quantity ({self.quantity}) × unit_price ({self.unit_price}) = {expected_total}"
+            )
+        return self
+
+
+class CheckoutCreate(BaseModel):
+    """Check out a whole cart: every line and payment in one transaction"""
+
+    lines: list[CheckoutLine] = Field(min_length=1, max_length=500)
+    customer_name: str | None = None
+    notes: str | None = None
+    payments: list[PaymentData] = []
+
+
+def allocate_payments(
+    payments: list[tuple[uuid.UUID, Decimal, str | None]],
+    line_totals: list[Decimal],
+) -> list[list[tuple[uuid.UUID, Decimal, str | None]]]:
+    """
+    Split basket payments across lines in proportion to the line totals.
+
+    Amounts are rounded to cents and the last line takes the remainder, so each
+    payment's parts add back up to the amount tendered.
+    """
+    basket_total = sum(line_totals, Decimal(0))
+    allocations: list[list[tuple[uuid.UUID, Decimal, str | None]]] = [
+        [] for _ in line_totals
+    ]
+    for payment_method_id, amount, reference_number in payments:
+        remaining = amount
+        for index, line_total in enumerate(line_totals):
+            if index == len(line_totals) - 1:
+                part = remaining
+            else:
+                part = (amount * line_total / basket_total).quantize(Decimal("0.01"))
+                part = min(part, remaining)
+            remaining -= part
+            if part > 0:
+                allocations[index].append((payment_method_id, part, reference_number))
+    return allocations
+
+
+def credit_payment_method_id(session: Session) -> uuid.UUID | None:
+    """Payment method recorded on sales taken entirely on credit"""
+    credit_method = session.exec(
+        select(PaymentMethod)
+        .where(PaymentMethod.name.ilike("%credit%"))
+        .where(PaymentMethod.is_active.is_(True))
+        .limit(1)
+    ).first()
+    if credit_method:
+        return credit_method.id
+    fallback_method = session.exec(
+        select(PaymentMethod).where(PaymentMethod.is_active.is_(True)).limit(1)
+    ).first()
+    return fallback_method.id if fallback_method else None
+
+
+def book_checkout(
+    session: Session,
+    current_user: User,
+    checkout_in: CheckoutCreate,
+    *,
+    checkout_id: uuid.UUID,
+    till_shift_id: uuid.UUID | None,
+    sale_date: datetime | None = None,
+) -> tuple[Decimal, Decimal, Decimal]:
+    """
+    Validate a cart and add its sales, payments and debts to the session.
+
+    Raises HTTPException on any rule violation; the caller commits (or rolls
+    back). Returns (basket total, amount paid, debt amount).
+    """
+    requested: dict[uuid.UUID, int] = {}
+    for line in checkout_in.lines:
+        requested[line.product_id] = requested.get(line.product_id, 0) + line.quantity
+    # Names and prices come from the catalog cache; stock and status are
+    # checked authoritatively by the stock updates below
+    products = catalog_cache.get_many(session, list(requested))
+    for product_id in requested:
+        if product_id not in products:
+            raise HTTPException(
+                status_code=404, detail=f"Product {product_id} not found"
+            )
+
+    line_totals = []
+    for line in checkout_in.lines:
+        if line.total_amount is not None:
+            line_totals.append(line.total_amount)
+            continue
+        product = products[line.product_id]
+        if product.selling_price is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Product '{product.name}' has no selling price set",
+            )
+        line_totals.append(product.selling_price * line.quantity)
+    basket_total = sum(line_totals, Decimal(0))
+    # Free products would make the basket worthless and the payment split
+    # divide by zero
+    if basket_total <= 0:
+        raise HTTPException(
+            status_code=400, detail="Basket total must be greater than 0"
+        )
+
+    if not checkout_in.customer_name and not checkout_in.payments:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one payment method is required when no customer is selected",
+        )
+
+    payments: list[tuple[uuid.UUID, Decimal, str | None]] = []
+    for payment_data in checkout_in.payments:
+        try:
+            payment_method_id = uuid.UUID(payment_data.payment_method_id)
+        except (ValueError, AttributeError):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid payment method ID: {payment_data.payment_method_id}",
+            )
+        payment_method = session.get(PaymentMethod, payment_method_id)
+        if not payment_method:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Payment method {payment_method_id} not found",
+            )
+        if not payment_method.is_active:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Payment method '{payment_method.name}' is not active",
+            )
+        amount = Decimal(str(payment_data.amount))
+        if amount <= 0:
+            raise HTTPException(
+                status_code=400, detail="Payment amount must be greater than 0"
+            )
+        payments.append((payment_method_id, amount, payment_data.reference_number))
+
+    amount_paid = sum((amount for _, amount, _ in payments), Decimal(0))
+    payment_difference = amount_paid - basket_total
+    if not checkout_in.customer_name and payment_difference < -Decimal("0.01"):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Total payment amount ({amount_paid}) is less than basket total ({basket_total}). Underpayment: {abs(payment_difference)}",
+        )
+    if payment_difference > Decimal("0.01"):
+        overpayment_percentage = (payment_difference / basket_total) * 100
+        if overpayment_percentage > 20:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Excessive overpayment detected: {payment_difference} ({overpayment_percentage:.1f}% of total). Please verify the payment amount.",
+            )
+
+    line_payments = allocate_payments(payments, line_totals)
+    credit_method_id = None
+    # Lines without any payment (a credit sale) still need a payment method
+    if not all(line_payments):
+        credit_method_id = credit_payment_method_id(session)
+        if credit_method_id is None:
+            raise HTTPException(
+                status_code=400,
+                detail="No payment method available. Please configure at least one active payment method in the system.",
+            )
+
+    customer_contact = None
+    if checkout_in.customer_name and payment_difference < 0:
+        existing_debt = session.exec(
+            select(Debt)
+            .where(Debt.customer_name == checkout_in.customer_name)
+            .where(Debt.customer_contact.isnot(None))
+            .limit(1)
+        ).first()
+        if existing_debt:
+            customer_contact = existing_debt.customer_contact
+
+    # Take stock product by product in id order, so concurrent baskets sharing
+    # products lock them in the same order and cannot deadlock
+    for product_id in sorted(requested):
+        sell_stock(session, product_id, requested[product_id])
+
+    sales = []
+    for line, line_total, allocated in zip(
+        checkout_in.lines, line_totals, line_payments, strict=True
+    ):
+        sale = Sale(
+            product_id=line.product_id,
+            quantity=line.quantity,
+            unit_price=line.unit_price,
+            total_amount=line_total,
+            payment_method_id=allocated[0][0] if allocated else credit_method_id,
+            customer_name=checkout_in.customer_name,
+            notes=checkout_in.notes,
+            checkout_id=checkout_id,
+            till_shift_id=till_shift_id,
+            created_by_id=current_user.id,
+        )
+        if sale_date is not None:
+            sale.sale_date = sale_date
+        sale.payments = [
+            SalePayment(
+                payment_method_id=payment_method_id,
+                amount=amount,
+                reference_number=reference_number,
+            )
+            for payment_method_id, amount, reference_number in allocated
+        ]
+        unpaid = line_total - sum((amount for _, amount, _ in allocated), Decimal(0))
+        sales.append((sale, unpaid))
+    session.add_all([sale for sale, _ in sales])
+    session.flush()
+
+    debt_amount = Decimal(0)
+    for sale, unpaid in sales:
+        apply_sale_to_rollup(session, sale.id)
+        apply_sale_to_shift_totals(session, sale.id)
+        if checkout_in.customer_name and unpaid > 0:
+            debt_amount += unpaid
+            session.add(
+                Debt(
+                    customer_name=checkout_in.customer_name,
+                    customer_contact=customer_contact,
+                    sale_id=sale.id,
+                    amount=unpaid,
+                    amount_paid=Decimal("0"),
+                    balance=unpaid,
+                    debt_date=sale_date or datetime.now(timezone.utc),
+                    status="pending",
+                    notes=f"Credit from checkout #{checkout_id}",
+                    created_by_id=current_user.id,
+                )
+            )
+    return basket_total, amount_paid, debt_amount
+
+
+def checkout_receipt(
+    session: Session,
+    checkout_id: uuid.UUID,
+    totals: tuple[Decimal, Decimal, Decimal],
+) -> CheckoutReceipt:
+    basket_total, amount_paid, debt_amount = totals
+    lines = session.exec(
+        select(Sale)
+        .where(Sale.checkout_id == checkout_id)
+        .order_by(col(Sale.receipt_number))
+        .options(
+            selectinload(Sale.product),
+            selectinload(Sale.payment_method),
+            selectinload(Sale.created_by),
+        )
+    ).all()
+    return CheckoutReceipt(
+        checkout_id=checkout_id,
+        receipt_number=lines[0].receipt_number,
+        lines=lines,
+        total_amount=basket_total,
+        amount_paid=amount_paid,
+        change=max(amount_paid - basket_total, Decimal(0)),
+        debt_amount=debt_amount,
+    )
+
+
+@router.post("/checkout", response_model=CheckoutReceipt)
+def checkout_cart(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    register: RegisterDep,
+    checkout_in: CheckoutCreate,
+) -> Any:
+    """
+    Check out a multi-line cart as a single transaction with one receipt.
+
+    Business rules match /sales/multi-payment, applied to the basket total:
+    - Till must be open and auditors cannot sell
+    - Every product must exist, be active and have stock for all its lines
+    - Without a customer the basket must be paid in full; with one, any unpaid
+      part becomes a debt per line
+    - Overpayment (change) is capped at 20% of the basket total
+
+    Product rows are locked in id order so concurrent checkouts sharing
+    products queue behind each other instead of deadlocking.
+    """
+    from app.api.utils.till_utils import get_current_open_shift
+
+    open_shift = get_current_open_shift(session, register)
+    if not open_shift:
+        raise HTTPException(
+            status_code=403,
+            detail="POS is locked. Please open a till shift before making sales. Go to Shift Reconciliation to open a till.",
+        )
+
+    if not current_user.is_active:
+        raise HTTPException(
+            status_code=403, detail="User is not active or not authenticated"
+        )
+
+    if current_user.is_auditor:
+        raise HTTPException(
+            status_code=403,
+            detail="Auditors have read-only access. Sales creation is not allowed.",
+        )
+
+    checkout_id = uuid.uuid4()
+    totals = book_checkout(
+        session,
+        current_user,
+        checkout_in,
+        checkout_id=checkout_id,
+        till_shift_id=open_shift.id,
+    )
+    session.commit()
+    return checkout_receipt(session, checkout_id, totals)
+
+
+# ==================== OFFLINE SALE SYNC ====================
+
+# Clock skew tolerated on recorded_at before an offline sale counts as future-dated
+OFFLINE_CLOCK_SKEW = timedelta(minutes=5)
+
+
+class OfflineCheckout(CheckoutCreate):
+    """A cart checked out while the POS was offline"""
+
+    # Generated on the POS; resending the same id is reported as a duplicate
+    checkout_id: uuid.UUID
+    recorded_at: datetime
+    till_shift_id: uuid.UUID | None = None  # Shift open when it was rung up
+
+
+class SaleSyncBatch(BaseModel):
+    """Offline checkouts in the order they were made"""
+
+    checkouts: list[OfflineCheckout] = Field(min_length=1, max_length=500)
+
+
+def existing_checkout_receipt(session: Session, checkout_id: uuid.UUID) -> int | None:
+    """Receipt number of an already booked checkout, or None"""
+    return session.exec(
+        select(func.min(Sale.receipt_number)).where(Sale.checkout_id == checkout_id)
+    ).one()
+
+
+def check_offline_till_shift(
+    session: Session, till_shift_id: uuid.UUID, register: str, current_user: User
+) -> None:
+    """Reject syncing onto a shift the offline sale can't have been rung up on"""
+    # Locked so a reconciliation can't complete between the check and the totals
+    till_shift = session.get(TillShift, till_shift_id, with_for_update=True)
+    if not till_shift:
+        raise HTTPException(status_code=404, detail="Till shift not found")
+    if till_shift.register != register:
+        raise HTTPException(
+            status_code=400, detail="Till shift belongs to another register"
+        )
+    if till_shift.status == "reconciled":
+        raise HTTPException(status_code=400, detail="Till shift is already reconciled")
+    if till_shift.opened_by_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="Till shift belongs to another cashier"
+        )
+
+
+@router.post("/sync", response_model=SaleSyncResults)
+def sync_offline_sales(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    register: RegisterDep,
+    batch: SaleSyncBatch,
+) -> Any:
+    """
+    Book checkouts queued by the POS while it was offline.
+
+    Checkouts are applied in order, each in its own transaction, with the
+    same rules as /sales/checkout except the open-till check (the till was
+    open when the sale was rung up). A checkout's till shift must be on this
+    register, not yet reconciled and, unless the caller is a superuser, the
+    caller's own. Each result is one of:
+    - accepted: booked now, dated `recorded_at`
+    - duplicate: this checkout_id was already synced; nothing changed
+    - rejected: a rule failed (e.g. insufficient stock); see `detail`
+
+    Safe to retry: a batch interrupted midway can be resent as a whole.
+    """
+    if not current_user.is_active:
+        raise HTTPException(
+            status_code=403, detail="User is not active or not authenticated"
+        )
+    if current_user.is_auditor:
+        raise HTTPException(
+            status_code=403,
+            detail="Auditors have read-only access. Sales creation is not allowed.",
+        )
+
+    results = []
+    for checkout_in in batch.checkouts:
+        checkout_id = checkout_in.checkout_id
+        recorded_at = checkout_in.recorded_at
+        if recorded_at.tzinfo is None:
+            recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+
+        # Serialize concurrent syncs of the same checkout until commit
+        session.execute(
+            select(
+                func.pg_advisory_xact_lock(func.hashtextextended(str(checkout_id), 0))
+            )
+        )
+        receipt_number = existing_checkout_receipt(session, checkout_id)
+        if receipt_number is not None:
+            session.rollback()
+            results.append(
+                SaleSyncResult(
+                    checkout_id=checkout_id,
+                    status="duplicate",
+                    receipt_number=receipt_number,
+                )
+            )
+            continue
+
+        try:
+            if recorded_at > datetime.now(timezone.utc) + OFFLINE_CLOCK_SKEW:
+                raise HTTPException(
+                    status_code=400, detail="recorded_at is in the future"
+                )
+            if checkout_in.till_shift_id:
+                check_offline_till_shift(
+                    session, checkout_in.till_shift_id, register, current_user
+                )
+            book_checkout(
+                session,
+                current_user,
+                checkout_in,
+                checkout_id=checkout_id,
+                till_shift_id=checkout_in.till_shift_id,
+                sale_date=recorded_at,
+            )
+            session.commit()
+        except HTTPException as e:
+            session.rollback()
+            results.append(
+                SaleSyncResult(
+                    checkout_id=checkout_id, status="rejected", detail=e.detail
+                )
+            )
+            continue
+        results.append(
+            SaleSyncResult(
+                checkout_id=checkout_id,
+                status="accepted",
+                receipt_number=existing_checkout_receipt(session, checkout_id),
+            )
+        )
+
+    statuses = [result.status for result in results]
+    return SaleSyncResults(
+        results=results,
+        accepted=statuses.count("accepted"),
+        duplicates=statuses.count("duplicate"),
+        rejected=statuses.count("rejected"),
+    )
+
+
 @router.get("/{sale_id}/payments", response_model=list[SalePaymentPublic])
 def read_sale_payments(
     session: SessionDep, current_user: CurrentUser, sale_id: uuid.UUID
@@ -648,10 +1084,12 @@ def read_sale_payments(
 
 @router.get("", response_model=SalesPublic)
 def read_sales(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentUser,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     product_id: str | None = Query(None, description="Filter by product ID"),
     payment_method_id: str | None = Query(None, description="Filter by payment method"),
     start_date: date | None = Query(None, description="Filter sales from this date"),
@@ -661,7 +1099,7 @@ def read_sales(
         None, description="Filter by cashier name (searches full_name and username)"
     ),
     search: str | None = Query(
-        None, description="Search by receipt number (last 6 chars) or notes"
+        None, description="Receipt number (digits, optional leading #) or notes text"
     ),
     exclude_with_debt: bool = Query(
         False,
@@ -671,21 +1109,13 @@ def read_sales(
     """
     Retrieve sales with optional filtering.
     Admins see all sales, cashiers see only their own sales.
+    Pass `cursor` (from `next_cursor`) for keyset pagination on (sale_date, id).
     """
-    # Count query
-    count_statement = select(func.count()).select_from(Sale)
-
     # Base query
-    statement = (
-        select(Sale)
-        .options(
-            selectinload(Sale.product),
-            selectinload(Sale.payment_method),
-            selectinload(Sale.created_by),
-        )
-        .offset(skip)
-        .limit(limit)
-        .order_by(desc(Sale.sale_date))
+    statement = select(Sale).options(
+        selectinload(Sale.product),
+        selectinload(Sale.payment_method),
+        selectinload(Sale.created_by),
     )
 
     # Apply filters
@@ -695,7 +1125,6 @@ def read_sales(
     # Auditors can see all sales for auditing purposes
     if not current_user.is_superuser and not current_user.is_auditor:
         conditions.append(Sale.created_by_id == current_user.id)  # type: ignore[arg-type]
-        count_statement = count_statement.where(Sale.created_by_id == current_user.id)
 
     if product_id:
         conditions.append(Sale.product_id == product_id)  # type: ignore[arg-type]
@@ -703,13 +1132,8 @@ def read_sales(
     if payment_method_id:
         conditions.append(Sale.payment_method_id == payment_method_id)  # type: ignore[arg-type]
 
-    if start_date:
-        # Cast datetime to date for comparison to properly match dates
-        conditions.append(cast(Sale.sale_date, Date) >= start_date)  # type: ignore[arg-type]
-
-    if end_date:
-        # Cast datetime to date for comparison to include entire day
-        conditions.append(cast(Sale.sale_date, Date) <= end_date)  # type: ignore[arg-type]
+    # Whole business days, as a sargable range on sale_date
+    conditions.extend(date_range_conditions(Sale.sale_date, start_date, end_date))
 
     # Category filter requires joining with Product
     needs_product_join = category_id is not None
@@ -735,16 +1159,15 @@ def read_sales(
         )
         conditions.append(cashier_conditions)  # type: ignore[arg-type]
 
-    # Search filter - search in notes (receipt number search done after fetch)
+    # Search filter - receipt numbers hit the unique index, anything else searches notes
     if search:
         search_term = search.strip()
-        if search_term:
+        receipt_number = parse_receipt_number(search_term)
+        if receipt_number is not None:
+            conditions.append(Sale.receipt_number == receipt_number)  # type: ignore[arg-type]
+        elif search_term:
             # Search in notes using ILIKE for case-insensitive search
-            conditions.append(
-                or_(
-                    cast(Sale.notes, String).ilike(f"%{search_term}%"),  # type: ignore[attr-defined]
-                )
-            )
+            conditions.append(cast(Sale.notes, String).ilike(f"%{search_term}%"))  # type: ignore[arg-type]
 
     # Exclude sales with associated debts (for receipts view - debt sales should appear in invoices)
     if exclude_with_debt:
@@ -753,40 +1176,36 @@ def read_sales(
             and_(Debt.sale_id == Sale.id, Debt.sale_id.isnot(None))
         )
         conditions.append(~debt_exists)  # type: ignore[arg-type]
-        count_statement = count_statement.where(~debt_exists)  # type: ignore[arg-type]
 
     if conditions:
         statement = statement.where(and_(*conditions))
-        count_statement = count_statement.where(and_(*conditions))
 
-    count = session.exec(count_statement).one()
-    sales = session.exec(statement).all()
-
-    # Apply receipt number search filter if provided (search by last 6 chars of ID)
-    # This is done after fetch because UUID string conversion is easier in Python
-    if search:
-        search_term = search.strip().lower()
-        if search_term:
-            filtered_sales = []
-            for sale in sales:
-                # Check notes (already filtered in SQL above)
-                notes_match = sale.notes and search_term in sale.notes.lower()
-                # Also check receipt number (last 6 chars of UUID as string)
-                receipt_no = str(sale.id)[-6:].lower()
-                receipt_match = search_term in receipt_no
-                if notes_match or receipt_match:
-                    filtered_sales.append(sale)
-            sales = filtered_sales
-            # Update count to reflect filtered results
-            count = len(sales)
+    # Counted on the filtered statement so category/cashier joins apply too
+    count, count_mode = count_rows(session, statement, count_mode)
+    order_by = (Sale.sale_date, Sale.id)
+    statement = paginate(
+        statement, order_by=order_by, skip=skip, limit=limit, cursor=cursor
+    )
+    sales, next_cursor = page_rows(
+        session.exec(statement).all(), order_by=order_by, limit=limit
+    )
 
-    return SalesPublic(data=sales, count=count)
+    return SalesPublic(
+        data=sales, count=count, count_mode=count_mode, next_cursor=next_cursor
+    )
 
 
-@router.get("/recent", response_model=SalesPublic)
+@router.get(
+    "/recent",
+    response_model=SalesPublic,
+    dependencies=[
+        conditional_get("sale", "product", "payment_method", "till_shift", scoped=True)
+    ],
+)
 def get_recent_sales(
     session: SessionDep,
     current_user: CurrentUser,
+    register: RegisterDep,
     limit: int = Query(10, ge=1, le=50, description="Number of recent sales to return"),
     include_voided: bool = Query(False, description="Include voided sales"),
 ) -> Any:
@@ -808,10 +1227,10 @@ def get_recent_sales(
         conditions.append(Sale.voided.is_(False))  # type: ignore[arg-type]
 
     # Get current shift if open
-    open_shift = get_current_open_shift(session)
+    open_shift = get_current_open_shift(session, register)
     if open_shift and not current_user.is_superuser:
         # For cashiers, only show sales from current shift
-        conditions.append(Sale.sale_date >= open_shift.opening_time)  # type: ignore[arg-type]
+        conditions.append(Sale.till_shift_id == open_shift.id)  # type: ignore[arg-type]
 
     statement = (
         select(Sale)
@@ -836,52 +1255,86 @@ def get_today_sales_summary(session: SessionDep, current_user: CurrentUser) -> A
     """
     Get today's sales summary for the current cashier.
     Returns total sales, total amount, and breakdown by payment method.
+    Voided sales are excluded; totals are read from the daily rollup.
     """
-    from sqlalchemy import Date, cast
-
-    today = date.today()
+    today = business_today()
 
     # Filter by current user unless admin
-    conditions: list[ColumnElement[bool]] = [cast(Sale.sale_date, Date) == today]  # type: ignore[arg-type]
-
-    if not current_user.is_superuser:
-        conditions.append(Sale.created_by_id == current_user.id)  # type: ignore[arg-type]
+    source = sales_rollup_source(
+        start_date=today,
+        end_date=today,
+        cashier_id=None if current_user.is_superuser else current_user.id,
+        exclude_unpaid_debts=False,
+    )
 
     # Total sales and amount
-    total_statement = select(
-        func.count(Sale.id).label("total_sales"),
-        func.sum(Sale.total_amount).label("total_amount"),
-        func.sum(Sale.quantity).label("total_items"),
-    ).where(and_(*conditions))
+    total_statement: Any = select(
+        func.sum(source.c.sale_count).label("total_sales"),
+        func.sum(source.c.total_amount).label("total_amount"),
+        func.sum(source.c.item_count).label("total_items"),
+    )
 
     result = session.exec(total_statement).first()
 
     # Breakdown by payment method
-    payment_breakdown_statement = (
+    payment_breakdown_statement: Any = (
         select(
             PaymentMethod.name,
-            func.count(Sale.id).label("count"),
-            func.sum(Sale.total_amount).label("amount"),
+            func.sum(source.c.sale_count).label("count"),
+            func.sum(source.c.total_amount).label("amount"),
         )
-        .join(PaymentMethod, Sale.payment_method_id == PaymentMethod.id)
-        .where(and_(*conditions))
+        .select_from(source)
+        .join(PaymentMethod, source.c.payment_method_id == PaymentMethod.id)
         .group_by(PaymentMethod.name)
+        .having(func.sum(source.c.sale_count) > 0)
     )
 
     payment_breakdown = session.exec(payment_breakdown_statement).all()
 
     return {
         "date": today.isoformat(),
-        "total_sales": result[0] or 0 if result else 0,
+        "total_sales": int(result[0] or 0) if result else 0,
         "total_amount": float(result[1] or 0) if result else 0.0,
-        "total_items": result[2] or 0 if result else 0,
+        "total_items": int(result[2] or 0) if result else 0,
         "payment_breakdown": [
-            {"payment_method": row[0], "count": row[1], "amount": float(row[2] or 0)}
+            {
+                "payment_method": row[0],
+                "count": int(row[1]),
+                "amount": float(row[2] or 0),
+            }
             for row in payment_breakdown
         ],
     }
 
 
+@router.get("/by-receipt/{receipt_number}", response_model=SalePublic)
+def read_sale_by_receipt(
+    session: SessionDep, current_user: CurrentUser, receipt_number: int
+) -> Any:
+    """
+    Get sale by receipt number (for reprints and voids).
+    Cashiers can only view their own sales.
+    """
+    statement = (
+        select(Sale)
+        .where(Sale.receipt_number == receipt_number)
+        .options(
+            selectinload(Sale.product),
+            selectinload(Sale.payment_method),
+            selectinload(Sale.created_by),
+        )
+    )
+    sale = session.exec(statement).first()
+    if not sale:
+        raise HTTPException(status_code=404, detail="Sale not found")
+
+    # Cashiers can only view their own sales
+    if not current_user.is_superuser and sale.created_by_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to view this sale")
+
+    return sale
+
+
 @router.get("/{sale_id}", response_model=SalePublic)
 def read_sale(
     session: SessionDep, current_user: CurrentUser, sale_id: uuid.UUID
@@ -919,6 +1372,7 @@ def void_sale(
     *,
     session: SessionDep,
     current_user: CurrentUser,
+    register: RegisterDep,
     sale_id: uuid.UUID,
     reason: str = Query(..., min_length=1, max_length=500, description="Reason for voiding the sale"),
 ) -> Any:
@@ -932,7 +1386,7 @@ def void_sale(
     # Check if till is open
     from app.api.utils.till_utils import get_current_open_shift
 
-    open_shift = get_current_open_shift(session)
+    open_shift = get_current_open_shift(session, register)
     if not open_shift:
         raise HTTPException(
             status_code=403,
@@ -965,17 +1419,18 @@ def void_sale(
 
     # Check if sale is from current shift (optional - can be relaxed for admin)
     if not current_user.is_superuser:
-        if sale.sale_date < open_shift.opening_time:
+        if sale.till_shift_id != open_shift.id:
             raise HTTPException(
                 status_code=400,
                 detail="Cannot void sales from previous shifts. Only current shift sales can be voided.",
             )
 
     # Restore product stock
-    product = sale.product
-    if product:
-        product.current_stock = (product.current_stock or 0) + sale.quantity
-        session.add(product)
+    add_stock(session, sale.product_id, sale.quantity)
+
+    # Take the sale out of the daily rollup and its shift's totals in the same transaction
+    apply_sale_to_rollup(session, sale.id, sign=-1)
+    apply_sale_to_shift_totals(session, sale.id, sign=-1)
 
     # Mark sale as voided
     sale.voided = True
@@ -1019,15 +1474,10 @@ def delete_sale(session: SessionDep, admin_user: AdminUser, sale_id: uuid.UUID)
             detail="Cannot delete a non-voided sale. Please void it first, then delete if necessary.",
         )
 
-    # Restore product stock with row lock to prevent race conditions
-    product = session.exec(
-        select(Product).where(Product.id == sale.product_id).with_for_update()
-    ).first()
-
-    if product:
-        product.current_stock = (product.current_stock or 0) + sale.quantity
-        session.add(product)
+    # Restore product stock
+    add_stock(session, sale.product_id, sale.quantity)
 
+    # Voided sales were already removed from the daily rollup when voided
     session.delete(sale)
 
     try:
@@ -9,7 +9,9 @@ from sqlalchemy.sql import ColumnElement
 from sqlmodel import and_, func, select
 
 from app.api.deps import CurrentUser, SessionDep
+from app.api.utils.pagination import COUNT_MODE_DESCRIPTION, count_rows
 from app.models import (
+    CountMode,
     PaymentMethod,
     Sale,
     ShiftReconciliation,
@@ -18,6 +20,7 @@ from app.models import (
     ShiftReconciliationsPublic,
     ShiftReconciliationUpdate,
 )
+from app.utils.date_ranges import business_today, date_range_conditions
 
 router = APIRouter(prefix="/shift-reconciliation", tags=["shift-reconciliation"])
 
@@ -47,6 +50,7 @@ def read_shift_reconciliations(
     current_user: CurrentUser,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     start_date: date | None = Query(None, description="Filter from this date"),
     end_date: date | None = Query(None, description="Filter until this date"),
 ) -> Any:
@@ -54,13 +58,8 @@ def read_shift_reconciliations(
     Retrieve shift reconciliations.
     Admins see all, cashiers see only their own.
     """
-    count_statement = select(func.count()).select_from(ShiftReconciliation)
-    statement = (
-        select(ShiftReconciliation)
-        .options(selectinload(ShiftReconciliation.created_by))
-        .offset(skip)
-        .limit(limit)
-        .order_by(desc(ShiftReconciliation.shift_date))
+    statement = select(ShiftReconciliation).options(
+        selectinload(ShiftReconciliation.created_by)
     )
 
     conditions: list[ColumnElement[bool]] = []
@@ -68,24 +67,23 @@ def read_shift_reconciliations(
     # Cashiers only see their own reconciliations
     if not current_user.is_superuser:
         conditions.append(ShiftReconciliation.created_by_id == current_user.id)  # type: ignore[arg-type]
-        count_statement = count_statement.where(
-            ShiftReconciliation.created_by_id == current_user.id
-        )
-
-    if start_date:
-        conditions.append(ShiftReconciliation.shift_date >= start_date)  # type: ignore[arg-type]
 
-    if end_date:
-        conditions.append(ShiftReconciliation.shift_date <= end_date)  # type: ignore[arg-type]
+    conditions.extend(
+        date_range_conditions(ShiftReconciliation.shift_date, start_date, end_date)
+    )
 
     if conditions:
         statement = statement.where(and_(*conditions))
-        count_statement = count_statement.where(and_(*conditions))
 
-    count = session.exec(count_statement).one()
+    count, count_mode = count_rows(session, statement, count_mode)
+    statement = (
+        statement.order_by(desc(ShiftReconciliation.shift_date))
+        .offset(skip)
+        .limit(limit)
+    )
     shifts = session.exec(statement).all()
 
-    return ShiftReconciliationsPublic(data=shifts, count=count)
+    return ShiftReconciliationsPublic(data=shifts, count=count, count_mode=count_mode)
 
 
 @router.get("/{shift_id}", response_model=ShiftReconciliationPublic)
@@ -153,13 +151,11 @@ def get_current_cash_summary(
     Get cash sales summary for shift reconciliation.
     Returns cash totals for the specified date range.
     """
-    from sqlalchemy import Date, cast
-
     # Default to today if not specified
     if not start_date:
-        start_date = date.today()
+        start_date = business_today()
     if not end_date:
-        end_date = date.today()
+        end_date = business_today()
 
     # Find cash payment method
     cash_pm = session.exec(
@@ -177,10 +173,7 @@ def get_current_cash_summary(
         }
 
     # Build conditions
-    conditions: list[ColumnElement[bool]] = [
-        cast(Sale.sale_date, Date) >= start_date,  # type: ignore[arg-type]
-        cast(Sale.sale_date, Date) <= end_date,  # type: ignore[arg-type]
-    ]
+    conditions = date_range_conditions(Sale.sale_date, start_date, end_date)
 
     # Cashiers only see their own sales
     if not current_user.is_superuser:
@@ -2,12 +2,25 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import desc
 from sqlalchemy.orm import selectinload
-from sqlmodel import func, or_, select
-
-from app.api.deps import AdminUser, CurrentUser, SessionDep
+from sqlmodel import or_, select
+
+from app.api.deps import AdminUser, CurrentUser, ReadSessionDep, SessionDep
+from app.api.utils.pagination import (
+    COUNT_MODE_DESCRIPTION,
+    CURSOR_DESCRIPTION,
+    count_rows,
+    page_rows,
+    paginate,
+)
+from app.api.utils.product_search import (
+    escape_like,
+    name_search_condition,
+    name_search_ranking,
+)
+from app.api.utils.stock import set_stock
 from app.models import (
+    CountMode,
     Product,
     ProductPublic,
     StockEntriesPublic,
@@ -27,27 +40,23 @@ router = APIRouter(prefix="/stock-entries", tags=["stock-entries"])
 def search_products_for_stock_entry(
     session: SessionDep,
     current_user: CurrentUser,
-    q: str = Query(..., min_length=1, description="Search query"),
+    q: str = Query(..., pattern=r"\S", description="Search query"),
     limit: int = Query(50, le=100, description="Maximum results to return"),
 ) -> Any:
     """
     Blazingly fast product search for stock entry.
-    Searches by name or category name.
+    Searches by name (ranked by prefix match then closeness) or category name.
     Returns products with all relationships loaded.
     """
     from app.models import ProductCategory
 
-    # Build search pattern for case-insensitive search
-    search_pattern = f"%{q}%"
-
     statement = (
         select(Product)
         .join(Product.category)
-        .join(Product.status)
         .where(
             or_(
-                Product.name.ilike(search_pattern),
-                ProductCategory.name.ilike(search_pattern),
+                name_search_condition(session, Product.name, q),
+                ProductCategory.name.ilike(f"%{escape_like(q.strip())}%"),
             )
         )
         .options(
@@ -55,6 +64,7 @@ def search_products_for_stock_entry(
             selectinload(Product.status),
             selectinload(Product.image),
         )
+        .order_by(*name_search_ranking(session, Product.name, q))
         .limit(limit)
     )
 
@@ -67,40 +77,39 @@ def search_products_for_stock_entry(
 
 @router.get("/", response_model=StockEntriesPublic)
 def read_stock_entries(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     product_id: uuid.UUID | None = None,
 ) -> Any:
     """
     Retrieve stock entries.
     Optionally filter by product_id.
     """
-    count_statement = select(func.count()).select_from(StockEntry)
-    if product_id:
-        count_statement = count_statement.where(StockEntry.product_id == product_id)
-
-    count = session.exec(count_statement).one()
-
-    statement = (
-        select(StockEntry)
-        .options(
-            selectinload(StockEntry.product).selectinload(Product.category),
-            selectinload(StockEntry.product).selectinload(Product.status),
-            selectinload(StockEntry.product).selectinload(Product.tag),
-            selectinload(StockEntry.product).selectinload(Product.image),
-        )
-        .offset(skip)
-        .limit(limit)
-        .order_by(desc(StockEntry.entry_date))
+    statement = select(StockEntry).options(
+        selectinload(StockEntry.product).selectinload(Product.category),
+        selectinload(StockEntry.product).selectinload(Product.status),
+        selectinload(StockEntry.product).selectinload(Product.tag),
+        selectinload(StockEntry.product).selectinload(Product.image),
     )
 
     if product_id:
         statement = statement.where(StockEntry.product_id == product_id)
 
-    entries = session.exec(statement).all()
-    return StockEntriesPublic(data=entries, count=count)
+    count, count_mode = count_rows(session, statement, count_mode)
+    order_by = (StockEntry.entry_date, StockEntry.id)
+    statement = paginate(
+        statement, order_by=order_by, skip=skip, limit=limit, cursor=cursor
+    )
+    entries, next_cursor = page_rows(
+        session.exec(statement).all(), order_by=order_by, limit=limit
+    )
+    return StockEntriesPublic(
+        data=entries, count=count, count_mode=count_mode, next_cursor=next_cursor
+    )
 
 
 @router.post("/", response_model=StockEntryPublic)
@@ -110,24 +119,17 @@ def create_stock_entry(
     """
     Create new stock entry.
     """
-    # Validate product exists and lock row to prevent race conditions
-    product = session.exec(
-        select(Product).where(Product.id == entry_in.product_id).with_for_update()
-    ).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-
     # Create stock entry
     db_obj = StockEntry.model_validate(
         entry_in, update={"created_by_id": admin_user.id}
     )
 
     # Update product current_stock based on closing_stock (atomic operation)
-    product.current_stock = entry_in.closing_stock
+    if set_stock(session, entry_in.product_id, entry_in.closing_stock) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
 
     # Save both operations in single transaction
     session.add(db_obj)
-    session.add(product)
 
     try:
         session.commit()
@@ -200,12 +202,7 @@ def update_stock_entry(
 
     # Update product current_stock if closing_stock was updated (atomic operation)
     if entry_in.closing_stock is not None:
-        product = session.exec(
-            select(Product).where(Product.id == entry.product_id).with_for_update()
-        ).first()
-        if product:
-            product.current_stock = entry_in.closing_stock
-            session.add(product)
+        set_stock(session, entry.product_id, entry_in.closing_stock)
 
     session.add(entry)
 
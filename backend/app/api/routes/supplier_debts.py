@@ -10,12 +10,21 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Query
+from sqlmodel import Session, func, select
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import AsyncReadSessionDep, CurrentUser, ReadSessionDep, SessionDep
+from app.api.utils.pagination import (
+    COUNT_MODE_DESCRIPTION,
+    CURSOR_DESCRIPTION,
+    count_rows,
+    page_rows,
+    paginate,
+)
+from app.api.utils.response_cache import cached_response
 from app.models import (
+    CountMode,
     Supplier,
     SupplierDebt,
     SupplierDebtCreate,
@@ -36,10 +45,12 @@ router = APIRouter()
 
 @router.get("/", response_model=SupplierDebtsPublic)
 def list_supplier_debts(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     supplier_id: uuid.UUID | None = None,
     status: str | None = None,
     is_overdue: bool | None = None,
@@ -73,18 +84,29 @@ def list_supplier_debts(
     if end_date:
         statement = statement.where(SupplierDebt.due_date <= end_date)
 
-    # Order by due date (overdue first)
-    statement = statement.order_by(SupplierDebt.due_date.asc())
-
     # Get total count
-    count_statement = select(func.count()).select_from(statement.subquery())
-    total_count = session.exec(count_statement).one()
-
-    # Apply pagination
-    statement = statement.offset(skip).limit(limit)
-    debts = session.exec(statement).all()
+    total_count, count_mode = count_rows(session, statement, count_mode)
+
+    # Apply pagination, ordered by due date (overdue first)
+    order_by = (SupplierDebt.due_date, SupplierDebt.id)
+    statement = paginate(
+        statement,
+        order_by=order_by,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        descending=False,
+    )
+    debts, next_cursor = page_rows(
+        session.exec(statement).all(), order_by=order_by, limit=limit
+    )
 
-    return SupplierDebtsPublic(data=debts, count=total_count)
+    return SupplierDebtsPublic(
+        data=debts,
+        count=total_count,
+        count_mode=count_mode,
+        next_cursor=next_cursor,
+    )
 
 
 @router.post("/", response_model=SupplierDebtPublic)
@@ -148,6 +170,7 @@ def create_supplier_debt(
 def get_summary(
     *,
     session: SessionDep,
+    read_session: ReadSessionDep,
     current_user: CurrentUser,
 ) -> Any:
     """
@@ -158,6 +181,20 @@ def get_summary(
     if not current_user.is_superuser and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only admin can view summary")
 
+    return cached_response(
+        session,
+        current_user,
+        route="supplier-debts/summary",
+        params={},
+        tables=("supplier_debt",),
+        compute=lambda: _build_summary(read_session),
+        scoped=False,
+        read_session=read_session,
+    )
+
+
+def _build_summary(session: Session) -> dict[str, Any]:
+    """Compute the supplier debt summary (uncached)"""
     # Total debts, amount, balance
     total_statement = select(
         func.count(SupplierDebt.id),
@@ -190,9 +227,9 @@ def get_summary(
 
 
 @router.get("/aging-report", response_model=list[dict[str, Any]])
-def get_aging_report(
+async def get_aging_report(
     *,
-    session: SessionDep,
+    session: AsyncReadSessionDep,
     current_user: CurrentUser,
     supplier_id: uuid.UUID | None = None,
 ) -> Any:
@@ -211,7 +248,7 @@ def get_aging_report(
     if supplier_id:
         statement = statement.where(SupplierDebt.supplier_id == supplier_id)
 
-    debts = session.exec(statement).all()
+    debts = (await session.exec(statement)).all()
 
     # Calculate aging buckets
     buckets = [
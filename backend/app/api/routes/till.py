@@ -4,36 +4,47 @@ from decimal import Decimal
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import Date, cast, desc
+from sqlalchemy import desc
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from sqlalchemy.sql import ColumnElement
 from sqlmodel import and_, col, func, select
 
-from app.api.deps import CurrentUser, SessionDep
-from app.api.utils.till_utils import get_current_open_shift
+from app.api.deps import (
+    CurrentUser,
+    ReadSessionDep,
+    RegisterDep,
+    SessionDep,
+    conditional_get,
+)
+from app.api.utils.pagination import COUNT_MODE_DESCRIPTION, count_rows
+from app.api.utils.shift_totals import shift_payment_totals
+from app.api.utils.till_utils import get_current_open_shift, till_status
 from app.models import (
     CashierVariance,
     CashierVariancePublic,
     CashierVariancesPublic,
-    PaymentMethod,
+    CountMode,
     PaymentMethodReconciliation,
-    Sale,
-    SalePayment,
     ShiftReconciliation,
     TillShift,
     TillShiftCreate,
     TillShiftPublic,
     TillShiftsPublic,
 )
+from app.utils.date_ranges import date_range_conditions
 
 router = APIRouter(prefix="/till", tags=["till"])
 
 
-def get_last_closed_shift(session: SessionDep) -> TillShift | None:
-    """Get the last closed shift to determine next shift type"""
+def get_last_closed_shift(session: SessionDep, register: str) -> TillShift | None:
+    """Get the register's last closed shift to determine next shift type"""
     statement = (
         select(TillShift)
-        .where(col(TillShift.status).in_(["closed", "reconciled"]))
+        .where(
+            TillShift.register == register,
+            col(TillShift.status).in_(["closed", "reconciled"]),
+        )
         .order_by(desc(col(TillShift.closing_time)))
     )
     return session.exec(statement).first()
@@ -42,65 +53,30 @@ def get_last_closed_shift(session: SessionDep) -> TillShift | None:
 def calculate_system_counts(
     session: SessionDep, till_shift: TillShift
 ) -> dict[str, Any]:
-    """Calculate system counts for all payment methods from sales during the shift"""
-    # Get all sales during this shift
-    conditions: list[ColumnElement[bool]] = [
-        col(Sale.sale_date) >= till_shift.opening_time,
-        col(Sale.created_by_id) == till_shift.opened_by_id,
-    ]
-
-    if till_shift.closing_time:
-        conditions.append(col(Sale.sale_date) <= till_shift.closing_time)
-
-    # Get all payment methods
-    payment_methods = session.exec(
-        select(PaymentMethod).where(PaymentMethod.is_active.is_(True))
-    ).all()
-
-    system_counts: dict[str, dict[str, Any]] = {}
-    for pm in payment_methods:
-        # Get sales with this payment method (including multi-payment)
-        pm_conditions = conditions.copy()
-
-        # Check both primary payment method and SalePayment records
-        primary_total = session.exec(
-            select(func.sum(Sale.total_amount)).where(
-                and_(*pm_conditions, col(Sale.payment_method_id) == pm.id)
-            )
-        ).first() or Decimal(0)
-
-        # Get multi-payment amounts
-        multi_total = session.exec(
-            select(func.sum(SalePayment.amount))
-            .join(Sale, col(SalePayment.sale_id) == col(Sale.id))
-            .where(and_(*pm_conditions, col(SalePayment.payment_method_id) == pm.id))
-        ).first() or Decimal(0)
-
-        system_counts[str(pm.id)] = {
-            "payment_method_id": pm.id,
-            "payment_method_name": pm.name,
-            "system_count": primary_total + multi_total,
-        }
-
-    return system_counts
+    """System counts for all active payment methods, from the shift's running totals"""
+    return shift_payment_totals(session, till_shift.id)
 
 
 @router.post("/open", response_model=TillShiftPublic)
 def open_till(
-    *, session: SessionDep, current_user: CurrentUser, till_in: TillShiftCreate
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    register: RegisterDep,
+    till_in: TillShiftCreate,
 ) -> Any:
     """
-    Open a new till shift.
+    Open a new till shift on the request's register (X-Register header).
     - Cashiers must open till before making sales
-    - Shift type alternates (Day/Night)
-    - Only one till can be open at a time
+    - Shift type alternates (Day/Night) per register
+    - Only one till can be open at a time per register
     """
-    # Check if there's already an open shift
-    open_shift = get_current_open_shift(session)
+    # Check if there's already an open shift on this register
+    open_shift = get_current_open_shift(session, register)
     if open_shift:
         raise HTTPException(
             status_code=400,
-            detail=f"A till is already open. Shift ID: {open_shift.id}, Opened by: {open_shift.opened_by.email if open_shift.opened_by else 'Unknown'}",
+            detail=f"A till is already open on register '{register}'. Shift ID: {open_shift.id}, Opened by: {open_shift.opened_by.email if open_shift.opened_by else 'Unknown'}",
         )
 
     # Validate shift type
@@ -111,7 +87,7 @@ def open_till(
         )
 
     # Determine shift type based on last closed shift
-    last_shift = get_last_closed_shift(session)
+    last_shift = get_last_closed_shift(session, register)
     if last_shift:
         # Alternate: if last was day, next is night, and vice versa
         if last_shift.shift_type.lower() == "day":
@@ -142,6 +118,7 @@ def open_till(
     # Create new till shift
     till_shift = TillShift(
         shift_type=shift_type,
+        register=register,
         opening_cash_float=till_in.opening_cash_float,
         opening_balance=till_in.opening_balance,  # Balance left by previous cashier (optional)
         opened_by_id=current_user.id,
@@ -150,7 +127,14 @@ def open_till(
     )
 
     session.add(till_shift)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        # Lost a race with another open on the same register
+        session.rollback()
+        raise HTTPException(
+            status_code=400, detail=f"A till is already open on register '{register}'"
+        )
     session.refresh(till_shift)
 
     # Load relationships
@@ -165,9 +149,11 @@ def open_till(
 
 
 @router.get("/current", response_model=TillShiftPublic)
-def get_current_till(*, session: SessionDep, current_user: CurrentUser) -> Any:
-    """Get the currently open till shift"""
-    till_shift = get_current_open_shift(session)
+def get_current_till(
+    *, session: SessionDep, current_user: CurrentUser, register: RegisterDep
+) -> Any:
+    """Get the till shift currently open on the request's register"""
+    till_shift = get_current_open_shift(session, register)
     if not till_shift:
         raise HTTPException(status_code=404, detail="No till is currently open")
 
@@ -187,19 +173,16 @@ def get_current_till(*, session: SessionDep, current_user: CurrentUser) -> Any:
     return result
 
 
-@router.get("/status", response_model=dict)
-def get_till_status(*, session: SessionDep, current_user: CurrentUser) -> Any:
-    """Check if till is open (for POS lock)"""
-    till_shift = get_current_open_shift(session)
-
-    return {
-        "is_open": till_shift is not None,
-        "till_id": str(till_shift.id) if till_shift else None,
-        "opened_by": till_shift.opened_by.email
-        if till_shift and till_shift.opened_by
-        else None,
-        "opening_time": till_shift.opening_time.isoformat() if till_shift else None,
-    }
+@router.get(
+    "/status",
+    response_model=dict,
+    dependencies=[conditional_get("till_shift", "user")],
+)
+def get_till_status(
+    *, session: SessionDep, current_user: CurrentUser, register: RegisterDep
+) -> Any:
+    """Check if the request's register has an open till (for POS lock)"""
+    return till_status(session, register)
 
 
 @router.post("/close", response_model=TillShiftPublic)
@@ -207,14 +190,15 @@ def close_till(
     *,
     session: SessionDep,
     current_user: CurrentUser,
+    register: RegisterDep,
     closing_cash_float: Decimal = Query(..., description="Closing cash float amount"),
 ) -> Any:
     """
-    Close the current till shift.
+    Close the till shift open on the request's register.
     - Only the cashier who opened it can close it (unless admin)
     - Calculates system counts automatically
     """
-    till_shift = get_current_open_shift(session)
+    till_shift = get_current_open_shift(session, register)
     if not till_shift:
         raise HTTPException(status_code=404, detail="No till is currently open")
 
@@ -274,6 +258,7 @@ def get_system_counts(
     *,
     session: SessionDep,
     current_user: CurrentUser,
+    register: RegisterDep,
     shift_id: uuid.UUID | None = Query(None, description="Specific shift ID (for closed shifts)"),
 ) -> Any:
     """
@@ -299,8 +284,8 @@ def get_system_counts(
                 detail="You can only view system counts for your own shifts",
             )
     else:
-        # Get current open shift
-        till_shift = get_current_open_shift(session)
+        # Get the shift open on this register
+        till_shift = get_current_open_shift(session, register)
         if not till_shift:
             raise HTTPException(status_code=404, detail="No till is currently open")
 
@@ -321,6 +306,7 @@ def reconcile_shift(
     *,
     session: SessionDep,
     current_user: CurrentUser,
+    register: RegisterDep,
     physical_counts: dict[str, Any],  # {payment_method_id: amount}
     notes: str | None = None,
     shift_id: uuid.UUID | None = Query(None, description="Specific shift ID to reconcile"),
@@ -347,8 +333,8 @@ def reconcile_shift(
                 status_code=400, detail="This shift has already been reconciled"
             )
     else:
-        # Get the most recently closed shift
-        till_shift = get_last_closed_shift(session)
+        # Get the register's most recently closed shift
+        till_shift = get_last_closed_shift(session, register)
         if not till_shift:
             raise HTTPException(
                 status_code=400, detail="No closed shift available for reconciliation"
@@ -459,6 +445,7 @@ def get_cashier_variances(
     current_user: CurrentUser,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     cashier_id: uuid.UUID | None = Query(None, description="Filter by cashier ID"),
     start_date: date | None = Query(None, description="Filter from this date"),
     end_date: date | None = Query(None, description="Filter until this date"),
@@ -472,16 +459,9 @@ def get_cashier_variances(
         # Cashiers see only their own
         cashier_id = current_user.id
 
-    count_statement = select(func.count()).select_from(CashierVariance)
-    statement = (
-        select(CashierVariance)
-        .options(
-            selectinload(CashierVariance.cashier),  # type: ignore[arg-type]
-            selectinload(CashierVariance.till_shift),  # type: ignore[arg-type]
-        )
-        .offset(skip)
-        .limit(limit)
-        .order_by(desc(col(CashierVariance.created_at)))
+    statement = select(CashierVariance).options(
+        selectinload(CashierVariance.cashier),  # type: ignore[arg-type]
+        selectinload(CashierVariance.till_shift),  # type: ignore[arg-type]
     )
 
     conditions: list[ColumnElement[bool]] = []
@@ -489,17 +469,19 @@ def get_cashier_variances(
     if cashier_id:
         conditions.append(col(CashierVariance.cashier_id) == cashier_id)
 
-    if start_date:
-        conditions.append(cast(col(CashierVariance.created_at), Date) >= start_date)
-
-    if end_date:
-        conditions.append(cast(col(CashierVariance.created_at), Date) <= end_date)
+    conditions.extend(
+        date_range_conditions(col(CashierVariance.created_at), start_date, end_date)
+    )
 
     if conditions:
         statement = statement.where(and_(*conditions))
-        count_statement = count_statement.where(and_(*conditions))
 
-    count = session.exec(count_statement).one()
+    count, count_mode = count_rows(session, statement, count_mode)
+    statement = (
+        statement.order_by(desc(col(CashierVariance.created_at)))
+        .offset(skip)
+        .limit(limit)
+    )
     variances = session.exec(statement).all()
 
     # Calculate totals
@@ -533,6 +515,7 @@ def get_cashier_variances(
     return CashierVariancesPublic(
         data=variance_publics,
         count=count,
+        count_mode=count_mode,
         total_shortage=total_shortage,
         total_overage=total_overage,
     )
@@ -562,20 +545,6 @@ def get_shift_summary(
     # Calculate system counts
     system_counts = calculate_system_counts(session, till_shift)
 
-    # Get sales during shift
-    conditions: list[ColumnElement[bool]] = [
-        col(Sale.sale_date) >= till_shift.opening_time,
-        col(Sale.created_by_id) == till_shift.opened_by_id,
-    ]
-    if till_shift.closing_time:
-        conditions.append(col(Sale.sale_date) <= till_shift.closing_time)
-
-    sales = session.exec(select(Sale).where(and_(*conditions))).all()
-
-    # Calculate totals
-    total_sales = sum(Decimal(str(sale.total_amount or 0)) for sale in sales)
-    total_items = sum(sale.quantity or 0 for sale in sales)
-
     # Calculate duration
     if till_shift.closing_time:
         duration_seconds = (till_shift.closing_time - till_shift.opening_time).total_seconds()
@@ -607,9 +576,9 @@ def get_shift_summary(
         "opening_cash_float": float(till_shift.opening_cash_float),
         "opening_balance": float(till_shift.opening_balance) if till_shift.opening_balance else 0,
         "closing_cash_float": float(till_shift.closing_cash_float) if till_shift.closing_cash_float else None,
-        "total_sales": float(total_sales),
-        "total_transactions": len(sales),
-        "total_items_sold": total_items,
+        "total_sales": float(till_shift.total_sales),
+        "total_transactions": till_shift.sale_count,
+        "total_items_sold": till_shift.item_count,
         "payment_methods": list(system_counts.values()),
         "variance": variance_info,
     }
@@ -618,25 +587,20 @@ def get_shift_summary(
 @router.get("", response_model=TillShiftsPublic)
 def get_till_shifts(
     *,
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentUser,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    count_mode: CountMode = Query("exact", description=COUNT_MODE_DESCRIPTION),
     status: str | None = Query(
         None, description="Filter by status: open, closed, reconciled"
     ),
+    register: str | None = Query(None, description="Filter by register"),
 ) -> Any:
     """Get list of till shifts"""
-    count_statement = select(func.count()).select_from(TillShift)
-    statement = (
-        select(TillShift)
-        .options(
-            selectinload(TillShift.opened_by),  # type: ignore[arg-type]
-            selectinload(TillShift.closed_by),  # type: ignore[arg-type]
-        )
-        .offset(skip)
-        .limit(limit)
-        .order_by(desc(col(TillShift.opening_time)))
+    statement = select(TillShift).options(
+        selectinload(TillShift.opened_by),  # type: ignore[arg-type]
+        selectinload(TillShift.closed_by),  # type: ignore[arg-type]
     )
 
     conditions: list[ColumnElement[bool]] = []
@@ -644,19 +608,20 @@ def get_till_shifts(
     # Cashiers see only their own shifts
     if not current_user.is_superuser:
         conditions.append(TillShift.opened_by_id == current_user.id)  # type: ignore[arg-type]
-        count_statement = count_statement.where(
-            TillShift.opened_by_id == current_user.id
-        )
 
     if status:
         conditions.append(TillShift.status == status)  # type: ignore[arg-type]
-        count_statement = count_statement.where(TillShift.status == status)
+
+    if register:
+        conditions.append(TillShift.register == register)  # type: ignore[arg-type]
 
     if conditions:
         statement = statement.where(and_(*conditions))
-        count_statement = count_statement.where(and_(*conditions))
 
-    count = session.exec(count_statement).one()
+    count, count_mode = count_rows(session, statement, count_mode)
+    statement = (
+        statement.order_by(desc(col(TillShift.opening_time))).offset(skip).limit(limit)
+    )
     shifts = session.exec(statement).all()
 
     shift_publics = []
@@ -674,4 +639,4 @@ def get_till_shifts(
             )
         )
 
-    return TillShiftsPublic(data=shift_publics, count=count)
+    return TillShiftsPublic(data=shift_publics, count=count, count_mode=count_mode)
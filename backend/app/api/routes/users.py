@@ -2,7 +2,7 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import func, select
+from sqlmodel import select
 
 from app import crud
 from app.api.deps import (
@@ -10,9 +10,11 @@ from app.api.deps import (
     SessionDep,
     get_current_active_superuser,
 )
+from app.api.utils.pagination import count_rows
 from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
 from app.models import (
+    CountMode,
     Message,
     UpdatePassword,
     User,
@@ -33,18 +35,22 @@ router = APIRouter(prefix="/users", tags=["users"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    count_mode: CountMode = "exact",
+) -> Any:
     """
     Retrieve users.
     """
 
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
+    count, count_mode = count_rows(session, select(User), count_mode)
 
     statement = select(User).offset(skip).limit(limit)
     users = session.exec(statement).all()
 
-    return UsersPublic(data=users, count=count)
+    return UsersPublic(data=users, count=count, count_mode=count_mode)
 
 
 @router.post(
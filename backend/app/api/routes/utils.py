@@ -1,8 +1,13 @@
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
-from app.api.deps import get_current_active_superuser
-from app.models import Message
+from app.api.deps import SessionDep, get_current_active_superuser
+from app.api.utils.catalog_cache import catalog_cache
+from app.api.utils.response_cache import get_cache_stats
+from app.core.admission import admission_stats
+from app.core.offload import loop_lag_monitor
+from app.core.pool_metrics import async_pool_metrics, pool_metrics
+from app.models import CacheStatsPublic, Message
 from app.utils import generate_test_email, send_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
@@ -26,6 +31,68 @@ def test_email(email_to: EmailStr) -> Message:
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/cache-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=CacheStatsPublic,
+)
+def cache_stats(session: SessionDep) -> CacheStatsPublic:
+    """
+    Response cache hit/miss counters, shared across all workers.
+    """
+    return get_cache_stats(session)
+
+
+@router.get(
+    "/catalog-cache-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=dict,
+)
+def catalog_cache_stats() -> dict:
+    """
+    POS catalog cache counters for the worker that served this request.
+    """
+    return catalog_cache.stats()
+
+
+@router.get(
+    "/pool-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=dict,
+)
+def pool_stats() -> dict:
+    """
+    Connection pool occupancy, checkouts and hold times for the worker that
+    served this request; the async routes' pool under ``async_pool``.
+    """
+    return {**pool_metrics.stats(), "async_pool": async_pool_metrics.stats()}
+
+
+@router.get(
+    "/admission-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=dict,
+)
+def read_admission_stats() -> dict:
+    """
+    Per-lane concurrency, queue depth and shed counts for the worker that
+    served this request.
+    """
+    return admission_stats()
+
+
+@router.get(
+    "/loop-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=dict,
+)
+def read_loop_stats() -> dict:
+    """
+    Event loop lag and stall count for the worker that served this request.
+    """
+    return loop_lag_monitor.stats()
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
@@ -0,0 +1,236 @@
+"""
+In-process POS catalog cache, kept coherent across workers with LISTEN/NOTIFY.
+
+Each worker keeps the display side of recently used products (name, prices,
+category, status, image URL) keyed by product id. Any transaction that writes
+a product, category, status or media row sends a ``catalog_changed``
+notification that Postgres delivers on commit, and every worker's listener
+thread evicts the affected entries. The after_flush hook below queues the
+notification for every ORM write, which covers product CRUD and bulk imports.
+No Core statement changes cached fields today; one that does must call
+notify_catalog_changed() itself.
+
+Stock is never served from here: callers read current_stock from the database
+in the same statement that selects the product ids. The stock updates in
+app.api.utils.stock therefore don't evict anything.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.core.notify_listener import listen
+from app.models import Media, Product, ProductCategory, ProductPublic, ProductStatus
+
+logger = get_logger(__name__)
+
+CATALOG_CHANNEL = "catalog_changed"
+# Payload meaning "drop everything" (category, status or media changed)
+_ALL = "*"
+# Product ids per notification; keeps payloads well under the 8000 byte limit
+_IDS_PER_NOTIFICATION = 200
+
+
+class CatalogCache:
+    """Thread-safe LRU of ProductPublic entries with live stock left out"""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.listening = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[uuid.UUID, ProductPublic] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a load racing with one isn't stored
+        self._generation = 0
+
+    def get_many(
+        self, session: Session, product_ids: Sequence[uuid.UUID]
+    ) -> dict[uuid.UUID, ProductPublic]:
+        """Entries for `product_ids`, loading any misses in one query"""
+        found: dict[uuid.UUID, ProductPublic] = {}
+        with self._lock:
+            generation = self._generation
+            for product_id in product_ids:
+                entry = self._entries.get(product_id)
+                if entry is not None:
+                    self._entries.move_to_end(product_id)
+                    found[product_id] = entry
+            self.hits += len(found)
+
+        missing = [product_id for product_id in product_ids if product_id not in found]
+        if not missing:
+            return found
+
+        loaded = _load_entries(session, missing)
+        found.update(loaded)
+        with self._lock:
+            self.misses += len(missing)
+            # Without a live listener we could miss invalidations, so don't store
+            if (
+                settings.CATALOG_CACHE_ENABLED
+                and self.listening
+                and generation == self._generation
+            ):
+                for product_id, entry in loaded.items():
+                    self._entries[product_id] = entry
+                    self._entries.move_to_end(product_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return found
+
+    def invalidate(self, product_ids: Iterable[uuid.UUID] | None = None) -> None:
+        """Evict the given products, or everything when `product_ids` is None"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if product_ids is None:
+                self._entries.clear()
+                return
+            for product_id in product_ids:
+                self._entries.pop(product_id, None)
+
+    def set_listening(self, listening: bool) -> None:
+        """Called by the notify listener when LISTEN starts or stops working"""
+        if listening:
+            # Anything cached before LISTEN took effect may be stale
+            self.invalidate()
+            self.listening = True
+        else:
+            # Notifications may be missed until it reconnects
+            self.listening = False
+            self.invalidate()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "listening": self.listening,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_MAX_ENTRIES)
+
+
+def _load_entries(
+    session: Session, product_ids: Sequence[uuid.UUID]
+) -> dict[uuid.UUID, ProductPublic]:
+    products = session.exec(
+        select(Product)
+        .where(col(Product.id).in_(product_ids))
+        .options(
+            selectinload(Product.category),  # type: ignore[arg-type]
+            selectinload(Product.status),  # type: ignore[arg-type]
+            selectinload(Product.image),  # type: ignore[arg-type]
+        )
+        # Rows already in the session's identity map may predate the change
+        .execution_options(populate_existing=True)
+    ).all()
+    entries = {}
+    for product in products:
+        entry = ProductPublic.model_validate(product)
+        if entry.image:
+            entry.image.url = f"{settings.API_V1_STR}/media/serve/{entry.image.id}"
+        entries[product.id] = entry
+    return entries
+
+
+# ==================== READ HELPERS ====================
+
+
+def products_with_stock(
+    session: Session, rows: Iterable[tuple[uuid.UUID, int]]
+) -> list[ProductPublic]:
+    """
+    Hydrate (product id, current_stock) rows from the cache, keeping row order.
+
+    Products deleted between the id query and the lookup are skipped.
+    """
+    rows = list(rows)
+    entries = catalog_cache.get_many(session, [product_id for product_id, _ in rows])
+    return [
+        entries[product_id].model_copy(update={"current_stock": current_stock})
+        for product_id, current_stock in rows
+        if product_id in entries
+    ]
+
+
+# ==================== NOTIFICATIONS ====================
+
+
+def notify_catalog_changed(
+    session: OrmSession, product_ids: Iterable[uuid.UUID | str] | None = None
+) -> None:
+    """
+    Queue a catalog_changed notification in the session's transaction.
+
+    Postgres delivers it on commit and drops it on rollback. Pass None to
+    flush every worker's whole cache.
+    """
+    if product_ids is None:
+        payloads = [_ALL]
+    else:
+        ids = sorted({str(product_id) for product_id in product_ids})
+        payloads = [
+            ",".join(ids[start : start + _IDS_PER_NOTIFICATION])
+            for start in range(0, len(ids), _IDS_PER_NOTIFICATION)
+        ]
+    connection = session.connection()
+    for payload in payloads:
+        connection.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CATALOG_CHANNEL, "payload": payload},
+        )
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _notify_flushed_catalog_rows(session: OrmSession, _flush_context: Any) -> None:
+    product_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, ProductCategory | ProductStatus | Media):
+            notify_catalog_changed(session)
+            return
+        if isinstance(obj, Product):
+            product_ids.add(obj.id)
+    if product_ids:
+        notify_catalog_changed(session, product_ids)
+
+
+def _parse_payload(payload: str) -> list[uuid.UUID] | None:
+    if payload == _ALL:
+        return None
+    try:
+        return [uuid.UUID(value) for value in payload.split(",") if value]
+    except ValueError:
+        logger.warning(f"Ignoring malformed {CATALOG_CHANNEL} payload: {payload!r}")
+        return []
+
+
+# ==================== LISTENER ====================
+
+
+def _on_catalog_changed(payload: str) -> None:
+    catalog_cache.invalidate(_parse_payload(payload))
+
+
+def listen_for_catalog_changes() -> None:
+    """Have the worker's notify listener evict entries on catalog_changed"""
+    if settings.CATALOG_CACHE_ENABLED:
+        listen(CATALOG_CHANNEL, _on_catalog_changed, catalog_cache.set_listening)
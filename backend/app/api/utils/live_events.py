@@ -0,0 +1,217 @@
+"""
+Live POS events for the server-sent events stream, fanned out with LISTEN/NOTIFY.
+
+Any transaction that opens or closes a till, changes a user's notifications or
+rings up / voids sales sends a ``live_events`` notification (queued by the
+after_flush hook below, so ORM writes are covered automatically). Postgres
+delivers it on commit to every worker, whose listener thread hands it to the
+streams connected to that worker.
+
+Each event carries an id from the live_event_seq sequence. Every worker sees
+the same events in the same (commit) order and keeps the most recent ones, so
+a stream reconnecting to any worker with Last-Event-ID resumes right after
+that event. When the id is no longer held (too old, or the listener was down
+in between) the stream is told to resync and gets the current state instead.
+"""
+
+import asyncio
+import json
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session as OrmSession
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.core.notify_listener import listen
+from app.models import Notification, Sale, TillShift
+
+logger = get_logger(__name__)
+
+LIVE_EVENTS_CHANNEL = "live_events"
+# Events a slow stream may have queued before it is switched to a resync
+_MAX_PENDING = 100
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    id: int
+    kind: str  # "till", "notifications", "sales" or "resync"
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+# Sent to a stream that may have missed events; it resends the current state
+RESYNC = LiveEvent(id=0, kind="resync")
+
+
+class Subscription:
+    """Queue of events for one stream, fed from the listener thread"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[LiveEvent] = asyncio.Queue(maxsize=_MAX_PENDING)
+
+    def offer(self, live_event: LiveEvent) -> None:
+        """Queue an event; runs on the stream's event loop"""
+        if self.queue.full():
+            # Too far behind to catch up event by event
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            live_event = RESYNC
+        self.queue.put_nowait(live_event)
+
+
+class LiveEventBroker:
+    """Per-worker fan-out of live events to the streams subscribed here"""
+
+    def __init__(self, history: int) -> None:
+        self.listening = False
+        self._history: deque[LiveEvent] = deque(maxlen=history)
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        """Register a stream; call from the stream's event loop"""
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, live_event: LiveEvent) -> None:
+        with self._lock:
+            self._history.append(live_event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            self._deliver(subscription, live_event)
+
+    def reset(self) -> None:
+        """Forget the history and resync every stream (events may have been missed)"""
+        with self._lock:
+            self._history.clear()
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            self._deliver(subscription, RESYNC)
+
+    def set_listening(self, listening: bool) -> None:
+        """Called by the notify listener when LISTEN starts or stops working"""
+        self.listening = listening
+        # Streams may have missed events while we weren't listening
+        self.reset()
+
+    def since(self, last_event_id: int) -> list[LiveEvent] | None:
+        """Events after `last_event_id`, or None when it is no longer in the history"""
+        with self._lock:
+            if not self.listening:
+                return None
+            history = list(self._history)
+        for position, live_event in enumerate(history):
+            if live_event.id == last_event_id:
+                return history[position + 1 :]
+        return None
+
+    @property
+    def last_event_id(self) -> int | None:
+        with self._lock:
+            return self._history[-1].id if self._history else None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "listening": self.listening,
+                "subscribers": len(self._subscribers),
+                "history": len(self._history),
+            }
+
+    @staticmethod
+    def _deliver(subscription: Subscription, live_event: LiveEvent) -> None:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription.offer, live_event)
+        except RuntimeError:
+            # The stream's event loop has already shut down
+            pass
+
+
+live_events = LiveEventBroker(settings.LIVE_EVENTS_HISTORY)
+
+
+# ==================== NOTIFICATIONS ====================
+
+
+def notify_live_event(session: OrmSession, kind: str, data: dict[str, Any]) -> None:
+    """
+    Queue a live event in the session's transaction.
+
+    Postgres delivers it on commit and drops it on rollback.
+    """
+    session.connection().execute(
+        text(
+            "SELECT pg_notify(:channel, nextval('live_event_seq') || ':' || :payload)"
+        ),
+        {
+            "channel": LIVE_EVENTS_CHANNEL,
+            "payload": json.dumps({"kind": kind, "data": data}),
+        },
+    )
+
+
+def _changed(obj: Any, attribute: str) -> bool:
+    return bool(inspect(obj).attrs[attribute].history.has_changes())
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _notify_flushed_live_rows(session: OrmSession, _flush_context: Any) -> None:
+    if not settings.LIVE_EVENTS_ENABLED:
+        return
+    registers: set[str] = set()
+    notified_users: set[str] = set()
+    sales_by_user: Counter[str] = Counter()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        is_new = obj in session.new
+        if isinstance(obj, TillShift) and (is_new or _changed(obj, "status")):
+            registers.add(obj.register)
+        elif isinstance(obj, Notification) and (
+            is_new or obj in session.deleted or _changed(obj, "is_read")
+        ):
+            notified_users.add(str(obj.user_id))
+        elif isinstance(obj, Sale) and (is_new or _changed(obj, "voided")):
+            sales_by_user[str(obj.created_by_id)] += 1
+
+    for register in sorted(registers):
+        notify_live_event(session, "till", {"register": register})
+    for user_id in sorted(notified_users):
+        notify_live_event(session, "notifications", {"user_id": user_id})
+    for user_id, count in sorted(sales_by_user.items()):
+        notify_live_event(session, "sales", {"user_id": user_id, "count": count})
+
+
+def _parse_payload(payload: str) -> LiveEvent | None:
+    try:
+        event_id, body = payload.split(":", 1)
+        message = json.loads(body)
+        return LiveEvent(id=int(event_id), kind=message["kind"], data=message["data"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"Ignoring malformed {LIVE_EVENTS_CHANNEL} payload: {payload!r}")
+        return None
+
+
+# ==================== LISTENER ====================
+
+
+def _on_live_event(payload: str) -> None:
+    live_event = _parse_payload(payload)
+    if live_event is not None:
+        live_events.publish(live_event)
+
+
+def listen_for_live_events() -> None:
+    """Have the worker's notify listener publish live_events to the broker"""
+    if settings.LIVE_EVENTS_ENABLED:
+        listen(LIVE_EVENTS_CHANNEL, _on_live_event, live_events.set_listening)
@@ -0,0 +1,149 @@
+"""Keyset (cursor) pagination and count helpers for list endpoints"""
+
+import base64
+import json
+import uuid
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import asc, desc, tuple_
+from sqlmodel import Session, func, select
+
+from app.models import CountMode
+
+CURSOR_DESCRIPTION = (
+    "Opaque cursor from a previous page's next_cursor. "
+    "When set, keyset pagination is used and skip is ignored."
+)
+
+COUNT_MODE_DESCRIPTION = (
+    "exact: count every matching row. "
+    "estimated: exact up to 1000 rows, planner estimate beyond that. "
+    "none: skip counting (count is null)."
+)
+
+# Above this many matches, estimated mode switches to the planner's row estimate
+ESTIMATE_EXACT_UP_TO = 1000
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(column: Any, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return value
+
+
+def encode_cursor(row: Any, order_by: Sequence[Any]) -> str:
+    """Opaque cursor pointing just past `row` in the given ordering"""
+    values = [_encode_value(getattr(row, column.key)) for column in order_by]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: Sequence[Any]) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(order_by):
+            raise ValueError("cursor does not match ordering")
+        return [
+            _decode_value(column, value)
+            for column, value in zip(order_by, values, strict=True)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    statement: Any,
+    *,
+    order_by: Sequence[Any],
+    skip: int,
+    limit: int,
+    cursor: str | None = None,
+    descending: bool = True,
+) -> Any:
+    """
+    Order `statement` by `order_by` (last column must be unique, e.g. id) and page it.
+
+    With a cursor, rows strictly after the cursor position are selected with a
+    row comparison, so deep pages cost the same as the first one. Without a
+    cursor the classic offset mode is used. One extra row is fetched so that
+    page_rows() can tell whether there is a next page.
+    """
+    direction = desc if descending else asc
+    if cursor:
+        position = tuple_(*decode_cursor(cursor, order_by))
+        keys = tuple_(*order_by)
+        statement = statement.where(keys < position if descending else keys > position)
+    else:
+        statement = statement.offset(skip)
+    return statement.order_by(*(direction(column) for column in order_by)).limit(
+        limit + 1
+    )
+
+
+def page_rows(
+    rows: Sequence[Any], *, order_by: Sequence[Any], limit: int
+) -> tuple[list[Any], str | None]:
+    """Trim the look-ahead row and build next_cursor when there is another page"""
+    page = list(rows[:limit])
+    if len(rows) > limit and page:
+        return page, encode_cursor(page[-1], order_by)
+    return page, None
+
+
+# ==================== COUNTS ====================
+
+
+def _planner_rows(session: Session, statement: Any) -> int:
+    """Row estimate from the query planner, without executing the query"""
+    connection = session.connection()
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar_one()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(
+    session: Session, statement: Any, count_mode: CountMode
+) -> tuple[int | None, CountMode]:
+    """
+    Count the rows `statement` (filtered, not yet paged) would return.
+
+    Returns the count and the mode that actually produced it: an estimated
+    count that stayed under ESTIMATE_EXACT_UP_TO is exact, and reported so.
+    """
+    if count_mode == "none":
+        return None, "none"
+    statement = statement.order_by(None)
+    if count_mode == "exact":
+        return session.exec(
+            select(func.count()).select_from(statement.subquery())
+        ).one(), "exact"
+
+    capped = session.exec(
+        select(func.count()).select_from(
+            statement.limit(ESTIMATE_EXACT_UP_TO + 1).subquery()
+        )
+    ).one()
+    if capped <= ESTIMATE_EXACT_UP_TO:
+        return capped, "exact"
+    return max(_planner_rows(session, statement), capped), "estimated"
@@ -0,0 +1,67 @@
+"""Ranked product name search for the POS, stock entry and product list endpoints"""
+
+from typing import Any
+
+from sqlalchemy import desc, or_, text
+from sqlalchemy.sql import ColumnElement
+from sqlmodel import Session, func
+
+# Database URL -> whether pg_trgm is installed there
+_trigram_support: dict[str, bool] = {}
+
+
+def trigram_search_available(session: Session) -> bool:
+    """
+    Whether pg_trgm is installed (checked once per database).
+
+    The extension is created by a migration where the server ships it; without
+    it searches still work, using plain ILIKE and position-based ranking.
+    """
+    key = str(session.get_bind().url)
+    if key not in _trigram_support:
+        _trigram_support[key] = session.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        ).scalar_one()
+    return _trigram_support[key]
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input only matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def name_search_condition(session: Session, column: Any, q: str) -> ColumnElement[bool]:
+    """
+    Substring match on `column`, served by the ix_product_name_trgm GIN index.
+
+    With pg_trgm the similarity operator is OR-ed in so near misses ("jamesn")
+    still find "Jameson"; both sides use the same index. `q` must not be
+    blank: that would match every row, so routes reject or skip it first.
+    """
+    term = q.strip()
+    condition = column.ilike(f"%{escape_like(term)}%")
+    if trigram_search_available(session):
+        condition = or_(condition, column.op("%")(term))
+    return condition  # type: ignore[no-any-return]
+
+
+def name_search_ranking(session: Session, column: Any, q: str) -> list[Any]:
+    """
+    ORDER BY terms: whole-name prefix, then word prefix, then closest match.
+
+    Ties fall back to shorter names, then alphabetical, so results are stable
+    between keystrokes.
+    """
+    term = q.strip()
+    lowered = func.lower(column)
+    needle = escape_like(term.lower())
+    ranking: list[Any] = [
+        desc(lowered.like(f"{needle}%")),
+        desc(lowered.like(f"% {needle}%")),
+    ]
+    if trigram_search_available(session):
+        ranking.append(desc(func.similarity(column, term)))
+    else:
+        ranking.append(func.strpos(lowered, term.lower()))
+    ranking.extend([func.length(column), column])
+    return ranking
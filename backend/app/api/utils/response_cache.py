@@ -0,0 +1,433 @@
+"""
+Response cache for report endpoints, shared by all workers through Postgres.
+
+Entries are keyed by route, normalized params and visibility scope, and are
+stamped with the versions of the tables they were computed from. Every commit
+that writes a tracked table bumps that table's version, which invalidates the
+dependent entries without having to know their keys.
+
+The same versions drive conditional GETs on list and reference endpoints: the
+ETag is derived from them, so a polling client's If-None-Match is answered
+with 304 before the endpoint's own queries run.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import Any
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Integer, String, column, delete, event, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.models import (
+    CacheRouteStats,
+    CacheStatsPublic,
+    ResponseCacheEntry,
+    TableVersion,
+    User,
+)
+
+logger = get_logger(__name__)
+
+# Tables whose writes bump a version counter
+TRACKED_TABLES = frozenset(
+    {
+        "debt",
+        "debt_payment",
+        "expense",
+        "expense_category",
+        "media",
+        "notification",
+        "payment_method",
+        "product",
+        "product_category",
+        "product_status",
+        "sale",
+        "sale_payment",
+        "supplier_debt",
+        "supplier_debt_payment",
+        "till_shift",
+        "user",
+    }
+)
+
+_WRITTEN_TABLES = "response_cache_written_tables"
+
+
+# ==================== TABLE VERSIONS ====================
+
+
+def mark_tables_written(session: OrmSession, *tables: str) -> None:
+    """Flag tables changed outside the ORM (bulk/core statements) for a version bump"""
+    session.info.setdefault(_WRITTEN_TABLES, set()).update(tables)
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _collect_written_tables(session: OrmSession, _flush_context: Any) -> None:
+    written = {
+        getattr(obj, "__tablename__", None)
+        for obj in chain(session.new, session.dirty, session.deleted)
+    }
+    tracked = written & TRACKED_TABLES
+    if tracked:
+        mark_tables_written(session, *tracked)  # type: ignore[arg-type]
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _bump_written_tables(session: OrmSession) -> None:
+    tables = session.info.pop(_WRITTEN_TABLES, None)
+    if not tables:
+        return
+    # Bump after the commit so a reader can never cache pre-commit data under
+    # the new version. Runs on its own connection as the session is finished.
+    try:
+        with session.get_bind().begin() as connection:
+            connection.execute(_bump_statement(tables))
+    except Exception as e:
+        logger.error(f"Failed to bump table versions for {sorted(tables)}: {e}")
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_written_tables(session: OrmSession) -> None:
+    session.info.pop(_WRITTEN_TABLES, None)
+
+
+def _bump_statement(tables: Iterable[str]) -> Any:
+    now = datetime.now(timezone.utc)
+    table = TableVersion.__table__  # type: ignore[attr-defined]
+    # Sorted so concurrent bumps lock rows in the same order
+    statement = insert(table).values(
+        [
+            {"table_name": name, "version": 1, "updated_at": now}
+            for name in sorted(tables)
+        ]
+    )
+    return statement.on_conflict_do_update(
+        index_elements=["table_name"],
+        set_={
+            "version": table.c.version + 1,
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+
+
+def get_table_versions(session: Session, tables: Iterable[str]) -> dict[str, int]:
+    """Current version of each table (0 if it has never been written)"""
+    names = sorted(set(tables))
+    rows = session.exec(
+        select(TableVersion.table_name, TableVersion.version).where(
+            col(TableVersion.table_name).in_(names)
+        )
+    ).all()
+    versions = dict.fromkeys(names, 0)
+    versions.update(dict(rows))
+    return versions
+
+
+# ==================== RESPONSE CACHE ====================
+
+
+def _cache_key(route: str, params: dict[str, Any], scope: str) -> str:
+    normalized = {k: v for k, v in jsonable_encoder(params).items() if v is not None}
+    raw = json.dumps(
+        {"route": route, "params": normalized, "scope": scope},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _cache_scope(current_user: User, scoped: bool) -> str:
+    return (
+        "all" if current_user.is_superuser or not scoped else f"user:{current_user.id}"
+    )
+
+
+def _versions_key(versions: dict[str, int]) -> str:
+    return ",".join(f"{name}:{version}" for name, version in versions.items())
+
+
+class _HitCounter:
+    """
+    Hits counted in memory per worker and added to the entries now and then.
+
+    Writing each hit through would turn every cache hit into a commit on a
+    row that all workers contend on.
+    """
+
+    def __init__(self, flush_seconds: float) -> None:
+        self.flush_seconds = flush_seconds
+        self._pending: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def add(self, cache_key: str) -> None:
+        with self._lock:
+            self._pending[cache_key] += 1
+
+    def take(self, force: bool = False) -> dict[str, int]:
+        """The pending hits, if due (or forced), resetting them"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_flush < self.flush_seconds:
+                return {}
+            pending, self._pending = dict(self._pending), Counter()
+            self._last_flush = now
+        return pending
+
+
+_hits = _HitCounter(settings.RESPONSE_CACHE_HIT_FLUSH_SECONDS)
+
+
+def _add_pending_hits(session: Session, force: bool = False) -> bool:
+    """Add this worker's pending hits to their entries; the caller commits"""
+    pending = _hits.take(force)
+    if not pending:
+        return False
+    counts = values(
+        column("cache_key", String), column("hits", Integer), name="pending_hits"
+    ).data(list(pending.items()))
+    session.execute(
+        update(ResponseCacheEntry)
+        .where(col(ResponseCacheEntry.cache_key) == counts.c.cache_key)
+        .values(hits=ResponseCacheEntry.hits + counts.c.hits)
+    )
+    return True
+
+
+def _read_entry(
+    session: Session, cache_key: str, versions: str, now: datetime
+) -> Any | None:
+    """The stored payload if it is current, counting the hit"""
+    cached = session.exec(
+        select(ResponseCacheEntry.payload).where(
+            ResponseCacheEntry.cache_key == cache_key,
+            ResponseCacheEntry.versions == versions,
+            ResponseCacheEntry.expires_at > now,
+        )
+    ).first()
+    if cached is not None:
+        _hits.add(cache_key)
+        if _add_pending_hits(session):
+            session.commit()
+    return cached
+
+
+def _store_entry(
+    session: Session,
+    route: str,
+    cache_key: str,
+    versions: str,
+    payload: Any,
+    now: datetime,
+) -> None:
+    table = ResponseCacheEntry.__table__  # type: ignore[attr-defined]
+    expires_at = now + timedelta(seconds=settings.RESPONSE_CACHE_TTL_SECONDS)
+    statement = insert(table).values(
+        cache_key=cache_key,
+        route=route,
+        payload=payload,
+        versions=versions,
+        hits=0,
+        misses=1,
+        created_at=now,
+        expires_at=expires_at,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["cache_key"],
+        set_={
+            "payload": statement.excluded.payload,
+            "versions": statement.excluded.versions,
+            "misses": table.c.misses + 1,
+            "created_at": statement.excluded.created_at,
+            "expires_at": statement.excluded.expires_at,
+        },
+    )
+    session.execute(statement)
+    _add_pending_hits(session)
+    session.commit()
+
+
+def cached_response(
+    session: Session,
+    current_user: User,
+    *,
+    route: str,
+    params: dict[str, Any],
+    tables: Iterable[str],
+    compute: Callable[[], Any],
+    scoped: bool = True,
+    read_session: Session | None = None,
+) -> Any:
+    """
+    Return the cached JSON response for this route/params/scope, or compute and store it.
+
+    ``tables`` lists every table the response is derived from. With ``scoped``
+    the entry is private to the user unless they are a superuser, matching the
+    "cashiers only see their own sales" rule of the report endpoints.
+
+    When ``compute`` reads from ``read_session`` (a possibly lagging replica),
+    the versions are read there too, so an entry never pairs current versions
+    with stale data; the entry itself is always stored through ``session``.
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return jsonable_encoder(compute())
+
+    cache_key = _cache_key(route, params, _cache_scope(current_user, scoped))
+    versions = _versions_key(get_table_versions(read_session or session, tables))
+    now = datetime.now(timezone.utc)
+
+    cached = _read_entry(session, cache_key, versions, now)
+    if cached is not None:
+        return cached
+
+    payload = jsonable_encoder(compute())
+    _store_entry(session, route, cache_key, versions, payload, now)
+    return payload
+
+
+async def cached_response_async(
+    session: AsyncSession,
+    current_user: User,
+    *,
+    route: str,
+    params: dict[str, Any],
+    tables: Iterable[str],
+    compute: Callable[[], Awaitable[Any]],
+    scoped: bool = True,
+    read_session: AsyncSession | None = None,
+) -> Any:
+    """cached_response() for async def routes; ``compute`` is awaited"""
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return jsonable_encoder(await compute())
+
+    cache_key = _cache_key(route, params, _cache_scope(current_user, scoped))
+    versions = _versions_key(
+        await (read_session or session).run_sync(get_table_versions, tables)
+    )
+    now = datetime.now(timezone.utc)
+
+    cached = await session.run_sync(_read_entry, cache_key, versions, now)
+    if cached is not None:
+        return cached
+
+    payload = jsonable_encoder(await compute())
+    await session.run_sync(_store_entry, route, cache_key, versions, payload, now)
+    return payload
+
+
+def delete_expired_entries(session: Session) -> int:
+    """
+    Delete entries past their expiry. Returns rows deleted.
+
+    Keys include arbitrary date ranges and per-user scopes, so entries that
+    are never asked for again would otherwise pile up.
+    """
+    result = session.execute(
+        delete(ResponseCacheEntry).where(
+            col(ResponseCacheEntry.expires_at) < datetime.now(timezone.utc)
+        )
+    )
+    session.commit()
+    return result.rowcount  # type: ignore[attr-defined, no-any-return]
+
+
+def get_cache_stats(session: Session) -> CacheStatsPublic:
+    """
+    Hit/miss counters per route, summed across all workers.
+
+    Other workers' hits show up once they flush them, within
+    RESPONSE_CACHE_HIT_FLUSH_SECONDS.
+    """
+    _add_pending_hits(session, force=True)
+    session.commit()
+    rows = session.exec(
+        select(
+            ResponseCacheEntry.route,
+            func.count(),
+            func.coalesce(func.sum(ResponseCacheEntry.hits), 0),
+            func.coalesce(func.sum(ResponseCacheEntry.misses), 0),
+        )
+        .group_by(ResponseCacheEntry.route)
+        .order_by(ResponseCacheEntry.route)
+    ).all()
+    data = [
+        CacheRouteStats(
+            route=route,
+            entries=entries,
+            hits=hits,
+            misses=misses,
+            hit_ratio=hits / (hits + misses) if hits + misses else 0.0,
+        )
+        for route, entries, hits, misses in rows
+    ]
+    return CacheStatsPublic(
+        data=data,
+        hits=sum(item.hits for item in data),
+        misses=sum(item.misses for item in data),
+    )
+
+
+# ==================== CONDITIONAL GET ====================
+
+# Browsers must revalidate on every use; the 304 makes that cheap
+_REVALIDATE = "private, no-cache"
+
+
+def compute_etag(
+    session: Session, request: Request, tables: Iterable[str], scope: str
+) -> str:
+    """Weak ETag for the request, from the table versions alone"""
+    raw = json.dumps(
+        {
+            "path": request.url.path,
+            "query": sorted(request.query_params.multi_items()),
+            "register": request.headers.get("x-register"),
+            "scope": scope,
+            "versions": get_table_versions(session, tables),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return f'W/"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    # Weak comparison, as required for If-None-Match
+    return "*" in candidates or etag.removeprefix("W/") in {
+        candidate.removeprefix("W/") for candidate in candidates
+    }
+
+
+def answer_conditional_get(
+    session: Session,
+    request: Request,
+    response: Response,
+    tables: Iterable[str],
+    scope: str,
+) -> None:
+    """
+    Raise a 304 when If-None-Match already holds the current ETag.
+
+    Otherwise set the ETag on the response the endpoint is about to produce.
+    """
+    etag = compute_etag(session, request, tables, scope)
+    headers = {"ETag": etag, "Cache-Control": _REVALIDATE}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
@@ -0,0 +1,268 @@
+"""Maintenance and query helpers for the sales daily rollup"""
+
+import uuid
+from datetime import date
+from typing import Any
+
+from sqlalchemy import delete, exists, literal, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import ColumnElement
+from sqlmodel import Session, and_, func, select
+
+from app.api.utils.response_cache import mark_tables_written
+from app.models import Debt, Product, Sale, SalesDailyRollup
+from app.utils.date_ranges import business_date, date_range_conditions
+
+ROLLUP_KEY = ("business_date", "cashier_id", "payment_method_id", "category_id")
+
+
+def sale_business_date() -> Any:
+    """Business date a sale is booked under"""
+    return business_date(Sale.sale_date)
+
+
+def sale_category() -> Any:
+    """Category a sale is booked under; needs Product joined for unstamped sales"""
+    return func.coalesce(Sale.category_id, Product.category_id)
+
+
+def unpaid_debt_exists() -> Any:
+    """Correlated EXISTS matching sales that still carry an unpaid debt"""
+    return exists().where(
+        and_(
+            Debt.sale_id == Sale.id,
+            Debt.status != "paid",
+            Debt.balance > 0,
+        )
+    )
+
+
+def _date_conditions(
+    column: Any, start_date: date | None, end_date: date | None
+) -> list[ColumnElement[bool]]:
+    conditions: list[ColumnElement[bool]] = []
+    if start_date:
+        conditions.append(column >= start_date)
+    if end_date:
+        conditions.append(column <= end_date)
+    return conditions
+
+
+def _aggregated_sales(start_date: date | None, end_date: date | None) -> Any:
+    """Rollup rows recomputed from the sale table"""
+    sale_day = sale_business_date()
+    return (
+        select(
+            sale_day.label("business_date"),
+            Sale.created_by_id.label("cashier_id"),
+            Sale.payment_method_id.label("payment_method_id"),
+            sale_category().label("category_id"),
+            func.count(Sale.id).label("sale_count"),
+            func.sum(Sale.quantity).label("item_count"),
+            func.sum(Sale.total_amount).label("total_amount"),
+        )
+        .join(Product, Product.id == Sale.product_id)  # type: ignore[arg-type]
+        .where(
+            Sale.voided.is_(False),  # type: ignore[attr-defined]
+            *date_range_conditions(Sale.sale_date, start_date, end_date),
+        )
+        .group_by(
+            sale_day,
+            Sale.created_by_id,
+            Sale.payment_method_id,
+            sale_category(),
+        )
+    )
+
+
+# ==================== WRITE PATH ====================
+
+
+def apply_sale_to_rollup(
+    session: Session, sale_id: uuid.UUID, *, sign: int = 1
+) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) a sale from the rollup.
+
+    Runs inside the caller's transaction, so the sale must already be flushed.
+    Adding stamps the sale with its product's category, and removing uses the
+    stamped one, so a product recategorized in between doesn't move the void
+    to another rollup row.
+    """
+    table = SalesDailyRollup.__table__  # type: ignore[attr-defined]
+    if sign > 0:
+        booked: Any = (
+            update(Sale)
+            .where(Sale.id == sale_id, Product.id == Sale.product_id)
+            .values(category_id=Product.category_id)
+            .returning(
+                Sale.sale_date,
+                Sale.created_by_id,
+                Sale.payment_method_id,
+                Sale.category_id,
+                Sale.quantity,
+                Sale.total_amount,
+            )
+            .cte("booked")
+        )
+        source = select(
+            business_date(booked.c.sale_date),
+            booked.c.created_by_id,
+            booked.c.payment_method_id,
+            booked.c.category_id,
+            literal(sign),
+            booked.c.quantity,
+            booked.c.total_amount,
+        )
+    else:
+        source = (
+            select(
+                sale_business_date(),
+                Sale.created_by_id,
+                Sale.payment_method_id,
+                sale_category(),
+                literal(sign),
+                Sale.quantity * sign,
+                Sale.total_amount * sign,
+            )
+            .join(Product, Product.id == Sale.product_id)  # type: ignore[arg-type]
+            .where(Sale.id == sale_id)
+        )
+    statement = insert(table).from_select(
+        [*ROLLUP_KEY, "sale_count", "item_count", "total_amount"], source
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY),
+        set_={
+            "sale_count": table.c.sale_count + statement.excluded.sale_count,
+            "item_count": table.c.item_count + statement.excluded.item_count,
+            "total_amount": table.c.total_amount + statement.excluded.total_amount,
+        },
+    )
+    session.execute(statement)
+
+
+def rebuild_sales_rollup(
+    session: Session, start_date: date | None = None, end_date: date | None = None
+) -> int:
+    """Recompute the rollup from the sale table for the given range. Returns rows written."""
+    session.execute(
+        delete(SalesDailyRollup).where(
+            *_date_conditions(SalesDailyRollup.business_date, start_date, end_date)
+        )
+    )
+    table = SalesDailyRollup.__table__  # type: ignore[attr-defined]
+    inserted = session.execute(
+        insert(table)
+        .from_select(
+            [*ROLLUP_KEY, "sale_count", "item_count", "total_amount"],
+            _aggregated_sales(start_date, end_date),
+        )
+        .returning(table.c.business_date)
+    ).all()
+    # Reports read the rollup, so cached responses must be recomputed
+    mark_tables_written(session, "sale")
+    session.commit()
+    return len(inserted)
+
+
+def check_sales_rollup(
+    session: Session, start_date: date | None = None, end_date: date | None = None
+) -> list[dict[str, Any]]:
+    """Diff the rollup against the sale table. Returns one entry per mismatched key."""
+    expected = _aggregated_sales(start_date, end_date).subquery()
+    actual = (
+        select(SalesDailyRollup)
+        .where(
+            SalesDailyRollup.sale_count != 0,  # type: ignore[arg-type]
+            *_date_conditions(SalesDailyRollup.business_date, start_date, end_date),
+        )
+        .subquery()
+    )
+    on_key = and_(*(expected.c[key] == actual.c[key] for key in ROLLUP_KEY))
+    statement: Any = (
+        select(
+            *(
+                func.coalesce(expected.c[key], actual.c[key]).label(key)
+                for key in ROLLUP_KEY
+            ),
+            func.coalesce(expected.c.sale_count, 0).label("expected_sale_count"),
+            func.coalesce(actual.c.sale_count, 0).label("rollup_sale_count"),
+            func.coalesce(expected.c.item_count, 0).label("expected_item_count"),
+            func.coalesce(actual.c.item_count, 0).label("rollup_item_count"),
+            func.coalesce(expected.c.total_amount, 0).label("expected_total_amount"),
+            func.coalesce(actual.c.total_amount, 0).label("rollup_total_amount"),
+        )
+        .select_from(expected.join(actual, on_key, full=True))
+        .where(
+            (
+                func.coalesce(expected.c.sale_count, 0)
+                != func.coalesce(actual.c.sale_count, 0)
+            )
+            | (
+                func.coalesce(expected.c.item_count, 0)
+                != func.coalesce(actual.c.item_count, 0)
+            )
+            | (
+                func.coalesce(expected.c.total_amount, 0)
+                != func.coalesce(actual.c.total_amount, 0)
+            )
+        )
+        .order_by(
+            *(func.coalesce(expected.c[key], actual.c[key]) for key in ROLLUP_KEY)
+        )
+    )
+    return [dict(row._mapping) for row in session.execute(statement).all()]
+
+
+# ==================== READ PATH ====================
+
+
+def sales_rollup_source(
+    *,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    cashier_id: uuid.UUID | None = None,
+    exclude_unpaid_debts: bool = True,
+) -> Any:
+    """
+    Per-day sales totals for whole-day ranges, read from the rollup.
+
+    Sales still carrying an unpaid debt are subtracted as negative rows, so the
+    cost is proportional to days in range plus open debts rather than to sales.
+    Columns: business_date, cashier_id, payment_method_id, sale_count,
+    item_count, total_amount.
+    """
+    rollup_conditions = _date_conditions(
+        SalesDailyRollup.business_date, start_date, end_date
+    )
+    if cashier_id:
+        rollup_conditions.append(SalesDailyRollup.cashier_id == cashier_id)  # type: ignore[arg-type]
+    rollup_rows = select(
+        SalesDailyRollup.business_date,
+        SalesDailyRollup.cashier_id,
+        SalesDailyRollup.payment_method_id,
+        SalesDailyRollup.sale_count,
+        SalesDailyRollup.item_count,
+        SalesDailyRollup.total_amount,
+    ).where(*rollup_conditions)
+    if not exclude_unpaid_debts:
+        return rollup_rows.subquery()
+
+    sale_day = sale_business_date()
+    debt_conditions = [
+        Sale.voided.is_(False),  # type: ignore[attr-defined]
+        unpaid_debt_exists(),
+        *date_range_conditions(Sale.sale_date, start_date, end_date),
+    ]
+    if cashier_id:
+        debt_conditions.append(Sale.created_by_id == cashier_id)
+    unpaid_rows = select(
+        sale_day,
+        Sale.created_by_id,
+        Sale.payment_method_id,
+        literal(-1),
+        -Sale.quantity,
+        -Sale.total_amount,
+    ).where(*debt_conditions)
+    return union_all(rollup_rows, unpaid_rows).subquery()
@@ -0,0 +1,284 @@
+"""
+Running sales totals per till shift.
+
+Every sale rung up on a shift adds to the shift's sale/item/amount counters
+and to its till_shift_payment_total rows in the sale's own transaction, and a
+void takes it back out. The till endpoints then read one row per payment
+method instead of summing the shift's sales.
+
+A sale counts under its SalePayment rows when it has any, otherwise under its
+primary payment method for the full total.
+
+The counters are written with Core statements and deliberately don't bump the
+till_shift table version: the ETag'd till endpoints don't show them, and
+/till/status would otherwise lose its 304 on every sale. A cached view of the
+totals would need a version key of its own.
+"""
+
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import delete, exists, literal, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import ColumnElement
+from sqlmodel import Session, and_, col, func, select
+
+from app.models import (
+    PaymentMethod,
+    Sale,
+    SalePayment,
+    TillShift,
+    TillShiftPaymentTotal,
+)
+
+COUNTERS = ("sale_count", "item_count", "total_sales")
+
+
+def _shift_conditions(
+    column: Any, shift_ids: Sequence[uuid.UUID] | None
+) -> list[ColumnElement[bool]]:
+    if shift_ids is None:
+        return [column.is_not(None)]
+    return [column.in_(shift_ids)]
+
+
+def _payment_rows(*conditions: ColumnElement[bool]) -> Any:
+    """(till_shift_id, payment_method_id, amount) for each payment of the matching sales"""
+    split = (
+        select(
+            col(Sale.till_shift_id).label("till_shift_id"),
+            col(SalePayment.payment_method_id).label("payment_method_id"),
+            col(SalePayment.amount).label("amount"),
+        )
+        .join(Sale, col(SalePayment.sale_id) == col(Sale.id))
+        .where(*conditions)
+    )
+    whole = select(
+        col(Sale.till_shift_id),
+        col(Sale.payment_method_id),
+        col(Sale.total_amount),
+    ).where(*conditions, ~exists().where(col(SalePayment.sale_id) == col(Sale.id)))
+    return union_all(split, whole).subquery()
+
+
+def _expected_counters(shift_ids: Sequence[uuid.UUID] | None) -> Any:
+    return (
+        select(
+            col(Sale.till_shift_id).label("till_shift_id"),
+            func.count(col(Sale.id)).label("sale_count"),
+            func.sum(Sale.quantity).label("item_count"),
+            func.sum(Sale.total_amount).label("total_sales"),
+        )
+        .where(
+            col(Sale.voided).is_(False),
+            *_shift_conditions(Sale.till_shift_id, shift_ids),
+        )
+        .group_by(col(Sale.till_shift_id))
+        .subquery()
+    )
+
+
+def _expected_payments(shift_ids: Sequence[uuid.UUID] | None) -> Any:
+    rows = _payment_rows(
+        col(Sale.voided).is_(False),
+        *_shift_conditions(Sale.till_shift_id, shift_ids),
+    )
+    return select(
+        rows.c.till_shift_id,
+        rows.c.payment_method_id,
+        func.sum(rows.c.amount).label("amount"),
+    ).group_by(rows.c.till_shift_id, rows.c.payment_method_id)
+
+
+# ==================== WRITE PATH ====================
+
+
+def apply_sale_to_shift_totals(
+    session: Session, sale_id: uuid.UUID, *, sign: int = 1
+) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) a sale from its shift's totals.
+
+    Runs inside the caller's transaction and flushes it first, so the sale and
+    any payment rows added with it are included. Sales without a shift are
+    ignored.
+    """
+    session.flush()
+    shifts = TillShift.__table__  # type: ignore[attr-defined]
+    session.execute(
+        update(shifts)
+        .where(
+            shifts.c.id == Sale.till_shift_id,
+            col(Sale.id) == sale_id,
+        )
+        .values(
+            sale_count=shifts.c.sale_count + sign,
+            item_count=shifts.c.item_count + Sale.quantity * sign,
+            total_sales=shifts.c.total_sales + Sale.total_amount * sign,
+        )
+    )
+
+    table = TillShiftPaymentTotal.__table__  # type: ignore[attr-defined]
+    rows = _payment_rows(col(Sale.id) == sale_id)
+    source = (
+        select(
+            rows.c.till_shift_id,
+            rows.c.payment_method_id,
+            func.sum(rows.c.amount) * literal(sign),
+        )
+        .where(rows.c.till_shift_id.is_not(None))
+        .group_by(rows.c.till_shift_id, rows.c.payment_method_id)
+    )
+    statement = insert(table).from_select(
+        ["till_shift_id", "payment_method_id", "amount"], source
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["till_shift_id", "payment_method_id"],
+        set_={"amount": table.c.amount + statement.excluded.amount},
+    )
+    session.execute(statement)
+
+
+def rebuild_shift_totals(
+    session: Session, shift_ids: Sequence[uuid.UUID] | None = None
+) -> int:
+    """Recompute shift totals from the sale table (all shifts by default). Returns shifts rebuilt."""
+    # Lock the shifts first: sales still in flight on them wait for this
+    # transaction and then add on top of the rebuilt values
+    locked = session.exec(
+        select(TillShift.id)
+        .where(*_shift_conditions(TillShift.id, shift_ids))
+        .order_by(col(TillShift.id))
+        .with_for_update()
+    ).all()
+    if not locked:
+        return 0
+
+    shifts = TillShift.__table__  # type: ignore[attr-defined]
+    session.execute(
+        update(shifts)
+        .where(shifts.c.id.in_(locked))
+        .values(sale_count=0, item_count=0, total_sales=0)
+    )
+    expected = _expected_counters(locked)
+    session.execute(
+        update(shifts)
+        .where(shifts.c.id == expected.c.till_shift_id)
+        .values({counter: expected.c[counter] for counter in COUNTERS})
+    )
+
+    table = TillShiftPaymentTotal.__table__  # type: ignore[attr-defined]
+    session.execute(delete(table).where(table.c.till_shift_id.in_(locked)))
+    session.execute(
+        insert(table).from_select(
+            ["till_shift_id", "payment_method_id", "amount"],
+            _expected_payments(locked),
+        )
+    )
+    session.commit()
+    return len(locked)
+
+
+def check_shift_totals(
+    session: Session, shift_ids: Sequence[uuid.UUID] | None = None
+) -> list[dict[str, Any]]:
+    """
+    Diff the stored shift totals against the sale table.
+
+    Returns one entry (till_shift_id, field, expected, actual) per mismatch,
+    where field is a counter name or a payment method id.
+    """
+    expected = _expected_counters(shift_ids)
+    counters = session.execute(
+        select(
+            col(TillShift.id),
+            *(col(getattr(TillShift, counter)) for counter in COUNTERS),
+            *(func.coalesce(expected.c[counter], 0) for counter in COUNTERS),
+        )
+        .outerjoin(expected, expected.c.till_shift_id == col(TillShift.id))
+        .where(*_shift_conditions(TillShift.id, shift_ids))
+        .order_by(col(TillShift.id))
+    ).all()
+    mismatches = []
+    for shift_id, *values in counters:
+        for counter, actual, wanted in zip(
+            COUNTERS, values[: len(COUNTERS)], values[len(COUNTERS) :], strict=True
+        ):
+            if actual != wanted:
+                mismatches.append(
+                    {
+                        "till_shift_id": shift_id,
+                        "field": counter,
+                        "expected": wanted,
+                        "actual": actual,
+                    }
+                )
+
+    wanted_payments = _expected_payments(shift_ids).subquery()
+    stored = (
+        select(TillShiftPaymentTotal)
+        .where(*_shift_conditions(TillShiftPaymentTotal.till_shift_id, shift_ids))
+        .subquery()
+    )
+    on_key = and_(
+        wanted_payments.c.till_shift_id == stored.c.till_shift_id,
+        wanted_payments.c.payment_method_id == stored.c.payment_method_id,
+    )
+    payments = session.execute(
+        select(
+            func.coalesce(wanted_payments.c.till_shift_id, stored.c.till_shift_id),
+            func.coalesce(
+                wanted_payments.c.payment_method_id, stored.c.payment_method_id
+            ),
+            func.coalesce(wanted_payments.c.amount, 0),
+            func.coalesce(stored.c.amount, 0),
+        )
+        .select_from(wanted_payments.join(stored, on_key, full=True))
+        .where(
+            func.coalesce(wanted_payments.c.amount, 0)
+            != func.coalesce(stored.c.amount, 0)
+        )
+    ).all()
+    for shift_id, payment_method_id, wanted, actual in payments:
+        mismatches.append(
+            {
+                "till_shift_id": shift_id,
+                "field": str(payment_method_id),
+                "expected": wanted,
+                "actual": actual,
+            }
+        )
+    return mismatches
+
+
+# ==================== READ PATH ====================
+
+
+def shift_payment_totals(
+    session: Session, till_shift_id: uuid.UUID
+) -> dict[str, dict[str, Any]]:
+    """System count per active payment method for a shift, keyed by method id"""
+    rows = session.exec(
+        select(
+            PaymentMethod.id,
+            PaymentMethod.name,
+            func.coalesce(TillShiftPaymentTotal.amount, 0),
+        )
+        .outerjoin(
+            TillShiftPaymentTotal,
+            and_(
+                col(TillShiftPaymentTotal.payment_method_id) == PaymentMethod.id,
+                col(TillShiftPaymentTotal.till_shift_id) == till_shift_id,
+            ),
+        )
+        .where(col(PaymentMethod.is_active).is_(True))
+    ).all()
+    return {
+        str(payment_method_id): {
+            "payment_method_id": payment_method_id,
+            "payment_method_name": name,
+            "system_count": amount,
+        }
+        for payment_method_id, name, amount in rows
+    }
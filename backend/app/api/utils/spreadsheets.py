@@ -0,0 +1,104 @@
+"""
+CSV / XLSX parsing for bulk product imports.
+
+These functions are CPU-bound and run in the process pool (see
+app.core.offload), so they stay importable without the app's database and
+web stack and report problems as SpreadsheetError, which pickles cleanly
+back to the request.
+"""
+
+import csv
+import io
+
+import openpyxl  # type: ignore[import]  # For Excel file parsing
+
+MAX_ROWS = 1000
+
+
+class SpreadsheetError(ValueError):
+    """The upload can't be read; the message is safe to show the user"""
+
+
+def parse_csv_file(
+    file_content: bytes, filename: str
+) -> tuple[list[str], list[dict[str, str]]]:
+    """Parse CSV file and return columns and rows."""
+    try:
+        # Try UTF-8 first
+        content = file_content.decode("utf-8")
+    except UnicodeDecodeError:
+        # Fallback to latin-1
+        try:
+            content = file_content.decode("latin-1")
+        except UnicodeDecodeError:
+            raise SpreadsheetError(
+                "Unable to read file. Please save as UTF-8 encoded CSV"
+            )
+
+    # Parse CSV
+    csv_file = io.StringIO(content)
+    reader = csv.DictReader(csv_file)
+
+    if not reader.fieldnames:
+        raise SpreadsheetError("CSV file has no column headers")
+
+    columns = list(reader.fieldnames)
+    rows = []
+
+    for idx, row in enumerate(reader, start=1):
+        if idx > MAX_ROWS:
+            break
+        rows.append(row)
+
+    return columns, rows
+
+
+def parse_excel_file(
+    file_content: bytes, filename: str
+) -> tuple[list[str], list[dict[str, str]]]:
+    """Parse Excel (XLSX) file and return columns and rows."""
+    try:
+        workbook = openpyxl.load_workbook(
+            io.BytesIO(file_content), read_only=True, data_only=True
+        )
+        sheet = workbook.active
+
+        # Get headers from first row
+        headers = []
+        for cell in sheet[1]:
+            headers.append(str(cell.value) if cell.value is not None else "")
+
+        if not headers or all(h == "" for h in headers):
+            raise SpreadsheetError("Excel file has no column headers")
+
+        # Read data rows
+        rows = []
+        for idx, row in enumerate(
+            sheet.iter_rows(min_row=2, values_only=True), start=1
+        ):
+            if idx > MAX_ROWS:
+                break
+
+            row_dict = {}
+            for col_idx, value in enumerate(row):
+                if col_idx < len(headers):
+                    # Convert all values to strings
+                    row_dict[headers[col_idx]] = str(value) if value is not None else ""
+            rows.append(row_dict)
+
+        workbook.close()
+        return headers, rows
+
+    except Exception as e:
+        raise SpreadsheetError(f"Failed to parse Excel file: {str(e)}")
+
+
+def parse_spreadsheet(
+    file_content: bytes, filename: str, file_ext: str
+) -> tuple[list[str], list[dict[str, str]]]:
+    """Parse an upload by extension; the entry point used in the process pool"""
+    if file_ext == "csv":
+        return parse_csv_file(file_content, filename)
+    if file_ext in ["xlsx", "xls"]:
+        return parse_excel_file(file_content, filename)
+    raise SpreadsheetError("Unsupported file format")
@@ -0,0 +1,118 @@
+"""
+Single-statement stock mutations.
+
+Every change to product.current_stock goes through one conditional
+``UPDATE ... RETURNING`` here. The row lock is then held only from that
+statement to the caller's commit, not across the validation queries that used
+to follow a ``SELECT ... FOR UPDATE``, so concurrent sales of the same product
+queue on the UPDATE alone and can never drive stock negative.
+
+Callers should do every check that doesn't need the new stock level before
+calling in, and commit soon after.
+"""
+
+import uuid
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import Row, update
+from sqlmodel import Session, col, select
+
+from app.api.utils.response_cache import mark_tables_written
+from app.models import Product, ProductStatus
+
+ACTIVE_STATUS = "Active"
+
+_RETURNING = (
+    col(Product.id),
+    col(Product.name),
+    col(Product.current_stock),
+    col(Product.selling_price),
+)
+
+
+def _apply(session: Session, product_id: uuid.UUID | str, statement: Any) -> Row | None:
+    row = session.execute(
+        statement.where(col(Product.id) == product_id).returning(*_RETURNING)
+    ).first()
+    if row is not None:
+        # Core UPDATEs bypass the flush hooks that bump the table version
+        mark_tables_written(session, "product")
+    return row
+
+
+def take_stock(
+    session: Session,
+    product_id: uuid.UUID | str,
+    quantity: int,
+    *,
+    active_only: bool = False,
+) -> Row | None:
+    """
+    Decrement stock by `quantity` if at least that much is left.
+
+    Returns (id, name, current_stock, selling_price) after the update, or None
+    when the product is missing, short, or (with `active_only`) not active.
+    """
+    statement = update(Product).where(col(Product.current_stock) >= quantity)
+    if active_only:
+        statement = statement.where(
+            col(Product.status_id).in_(
+                select(ProductStatus.id).where(ProductStatus.name == ACTIVE_STATUS)
+            )
+        )
+    return _apply(
+        session,
+        product_id,
+        statement.values(current_stock=col(Product.current_stock) - quantity),
+    )
+
+
+def add_stock(
+    session: Session, product_id: uuid.UUID | str, quantity: int
+) -> Row | None:
+    """Increment stock by `quantity` (restocks, voids). None if the product is missing."""
+    return _apply(
+        session,
+        product_id,
+        update(Product).values(current_stock=col(Product.current_stock) + quantity),
+    )
+
+
+def set_stock(
+    session: Session, product_id: uuid.UUID | str, current_stock: int
+) -> Row | None:
+    """Overwrite stock with a counted level. None if the product is missing."""
+    return _apply(
+        session, product_id, update(Product).values(current_stock=current_stock)
+    )
+
+
+def sell_stock(session: Session, product_id: uuid.UUID | str, quantity: int) -> Row:
+    """
+    take_stock() for a sale of an active product, raising the POS errors.
+
+    The failure is only diagnosed (with a plain read) after the UPDATE has
+    matched nothing, so the happy path is the single statement.
+    """
+    row = take_stock(session, product_id, quantity, active_only=True)
+    if row is not None:
+        return row
+
+    product = session.exec(
+        select(Product.name, Product.current_stock, ProductStatus.name)
+        .join(ProductStatus, col(ProductStatus.id) == Product.status_id)
+        .where(col(Product.id) == product_id)
+    ).first()
+    if product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    name, available, status_name = product
+    if status_name != ACTIVE_STATUS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Product '{name}' is not active. Current status: {status_name}",
+        )
+    raise HTTPException(
+        status_code=400,
+        detail=f"Insufficient stock for '{name}'. Available: {available}, Requested: {quantity}, Shortfall: {quantity - available}",
+    )
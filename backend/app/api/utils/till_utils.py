@@ -1,16 +1,39 @@
 """Utility functions for till/shift management"""
 
-from sqlalchemy import desc
-from sqlmodel import Session, col, select
+from typing import Any
+
+from sqlmodel import Session, select
 
 from app.models import TillShift
 
+# Register used by clients that don't send X-Register (single-till shops)
+DEFAULT_REGISTER = "main"
+
+
+def get_current_open_shift(
+    session: Session, register: str = DEFAULT_REGISTER
+) -> TillShift | None:
+    """
+    Get the open till shift on `register`.
 
-def get_current_open_shift(session: Session) -> TillShift | None:
-    """Get the currently open till shift"""
-    statement = (
-        select(TillShift)
-        .where(TillShift.status == "open")
-        .order_by(desc(col(TillShift.opening_time)))
+    There is at most one, enforced by the partial unique index
+    ix_till_shift_open_register, which also makes this a single index lookup.
+    """
+    statement = select(TillShift).where(
+        TillShift.register == register, TillShift.status == "open"
     )
     return session.exec(statement).first()
+
+
+def till_status(session: Session, register: str) -> dict[str, Any]:
+    """Whether `register` has an open till, as served for the POS lock"""
+    till_shift = get_current_open_shift(session, register)
+    return {
+        "is_open": till_shift is not None,
+        "register": register,
+        "till_id": str(till_shift.id) if till_shift else None,
+        "opened_by": till_shift.opened_by.email
+        if till_shift and till_shift.opened_by
+        else None,
+        "opening_time": till_shift.opening_time.isoformat() if till_shift else None,
+    }
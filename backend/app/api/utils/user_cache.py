@@ -0,0 +1,174 @@
+"""
+Per-worker cache of the users behind access tokens, kept coherent with LISTEN/NOTIFY.
+
+get_current_user() runs on every authenticated request. Instead of a
+``session.get(User, ...)`` round trip each time, each worker keeps the column
+values of recently seen users for a short TTL and merges them into the
+request's session without a query.
+
+Every transaction that updates or deletes a user row (profile edits, password
+changes, deactivation, deletion) sends a ``user_changed`` notification that
+Postgres delivers on commit, and every worker's listener thread evicts the
+user. As with the catalog cache, nothing is stored while the listener is down.
+"""
+
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.core.notify_listener import listen
+from app.models import User
+
+logger = get_logger(__name__)
+
+USER_CHANNEL = "user_changed"
+_COLUMNS = tuple(attribute.key for attribute in inspect(User).column_attrs)
+
+
+class UserCache:
+    """Thread-safe, TTL-bounded LRU of user column values keyed by user id"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.listening = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a load racing with one isn't stored
+        self._generation = 0
+
+    def get(self, session: Session, user_id: str) -> User | None:
+        """The user as a persistent object of `session`, loading it on a miss"""
+        try:
+            user_id = str(uuid.UUID(user_id))
+        except ValueError:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                values = entry[1]
+            else:
+                values = None
+                self.misses += 1
+
+        if values is not None:
+            user = User(**copy.deepcopy(values))
+            make_transient_to_detached(user)
+            return session.merge(user, load=False)
+
+        loaded = session.get(User, user_id)
+        if loaded is None:
+            return None
+        values = {column: getattr(loaded, column) for column in _COLUMNS}
+        with self._lock:
+            # Without a live listener we could miss invalidations, so don't store
+            if (
+                settings.USER_CACHE_ENABLED
+                and self.listening
+                and generation == self._generation
+            ):
+                self._entries[user_id] = (
+                    now + self.ttl_seconds,
+                    copy.deepcopy(values),
+                )
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return loaded
+
+    def invalidate(self, user_ids: list[str] | None = None) -> None:
+        """Evict the given users, or everyone when `user_ids` is None"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if user_ids is None:
+                self._entries.clear()
+                return
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def set_listening(self, listening: bool) -> None:
+        """Called by the notify listener when LISTEN starts or stops working"""
+        if listening:
+            # Anything cached before LISTEN took effect may be stale
+            self.invalidate()
+            self.listening = True
+        else:
+            # Notifications may be missed until it reconnects
+            self.listening = False
+            self.invalidate()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "listening": self.listening,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = UserCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
+
+
+# ==================== NOTIFICATIONS ====================
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _notify_flushed_users(session: OrmSession, _flush_context: Any) -> None:
+    user_ids = sorted(
+        str(obj.id)
+        for obj in chain(session.dirty, session.deleted)
+        if isinstance(obj, User)
+    )
+    if not user_ids:
+        return
+    # Also drop them here at once; the notification evicts again after commit
+    user_cache.invalidate(user_ids)
+    session.connection().execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": USER_CHANNEL, "payload": ",".join(user_ids)},
+    )
+
+
+def _parse_payload(payload: str) -> list[str]:
+    try:
+        return [str(uuid.UUID(value)) for value in payload.split(",") if value]
+    except ValueError:
+        logger.warning(f"Ignoring malformed {USER_CHANNEL} payload: {payload!r}")
+        return []
+
+
+# ==================== LISTENER ====================
+
+
+def _on_user_changed(payload: str) -> None:
+    user_cache.invalidate(_parse_payload(payload))
+
+
+def listen_for_user_changes() -> None:
+    """Have the worker's notify listener evict users on user_changed"""
+    if settings.USER_CACHE_ENABLED:
+        listen(USER_CHANNEL, _on_user_changed, user_cache.set_listening)
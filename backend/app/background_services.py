@@ -5,6 +5,8 @@ Scheduled jobs for:
 1. Debt reminder emails (daily at 8 AM)
 2. Reorder level alerts (daily at 9 AM)
 3. Notification cleanup (weekly)
+4. Till shift totals verification (daily)
+5. Expired response cache cleanup (hourly)
 """
 
 import logging
@@ -14,6 +16,8 @@ from sqlalchemy import and_
 from sqlmodel import Session, select
 
 from app import crud
+from app.api.utils.response_cache import delete_expired_entries
+from app.api.utils.shift_totals import check_shift_totals, rebuild_shift_totals
 from app.core.db import engine
 from app.core.logging_config import get_logger, setup_logging
 from app.models import (
@@ -23,6 +27,7 @@ from app.models import (
     ReminderSetting,
     Supplier,
     SupplierDebt,
+    TillShift,
     User,
 )
 from app.utils import (
@@ -35,6 +40,9 @@ from app.utils import (
 setup_logging(level=logging.INFO)
 logger = get_logger(__name__)
 
+# Shifts opened this recently are re-verified by the shift totals job
+SHIFT_TOTALS_CHECK_DAYS = 7
+
 
 def send_debt_reminder_emails():
     """
@@ -303,6 +311,51 @@ def cleanup_old_notifications():
         )
 
 
+def verify_shift_totals():
+    """
+    Recompute recent till shift totals from the raw sales and repair drift.
+
+    Runs daily at 5 AM (business time), outside trading hours.
+    Any shift whose stored counters or payment totals disagree with its sales
+    is logged and rebuilt.
+    """
+    logger.info("Running shift totals verification job...")
+
+    with Session(engine) as session:
+        since = datetime.now(timezone.utc) - timedelta(days=SHIFT_TOTALS_CHECK_DAYS)
+        shift_ids = session.exec(
+            select(TillShift.id).where(TillShift.opening_time >= since)
+        ).all()
+        if not shift_ids:
+            logger.info("No recent till shifts to verify")
+            return
+
+        mismatches = check_shift_totals(session, shift_ids)
+        for mismatch in mismatches:
+            logger.warning(f"Shift totals mismatch: {mismatch}")
+        drifted = sorted({mismatch["till_shift_id"] for mismatch in mismatches})
+        if drifted:
+            rebuild_shift_totals(session, drifted)
+        logger.info(
+            f"Shift totals verification completed. Checked: {len(shift_ids)}, Rebuilt: {len(drifted)}"
+        )
+
+
+def cleanup_response_cache():
+    """
+    Delete expired response cache entries.
+
+    Runs hourly.
+    """
+    logger.info("Running response cache cleanup job...")
+
+    with Session(engine) as session:
+        deleted_count = delete_expired_entries(session)
+        logger.info(
+            f"Response cache cleanup completed. Deleted {deleted_count} expired entries"
+        )
+
+
 def should_send_today(setting: ReminderSetting) -> bool:
     """
     Check if reminder should be sent today based on frequency settings.
@@ -351,6 +404,8 @@ def run_scheduled_jobs():
     - send_debt_reminder_emails() - Daily at 8:00 AM
     - send_reorder_alerts() - Daily at 9:00 AM
     - cleanup_old_notifications() - Weekly on Sunday at midnight
+    - verify_shift_totals() - Daily at 5:00 AM, outside trading hours
+    - cleanup_response_cache() - Hourly
     """
     import sys
 
@@ -360,6 +415,8 @@ def run_scheduled_jobs():
         logger.error("  - debt_reminders")
         logger.error("  - reorder_alerts")
         logger.error("  - notification_cleanup")
+        logger.error("  - shift_totals_check")
+        logger.error("  - response_cache_cleanup")
         return
 
     job_name = sys.argv[1]
@@ -370,6 +427,10 @@ def run_scheduled_jobs():
         send_reorder_alerts()
     elif job_name == "notification_cleanup":
         cleanup_old_notifications()
+    elif job_name == "shift_totals_check":
+        verify_shift_totals()
+    elif job_name == "response_cache_cleanup":
+        cleanup_response_cache()
     else:
         logger.error(f"Unknown job: {job_name}")
 
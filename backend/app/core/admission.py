@@ -0,0 +1,220 @@
+"""
+Admission control with a separate lane per class of request.
+
+Every API request is classified as ``pos`` (sales, till, login), ``reports``
+(analytics and other aggregate reads), ``bulk`` (product imports) or ``crud``
+(everything else, including the sales list and its search). Each lane admits a fixed number of concurrent requests and
+queues a bounded number more; when its queue is full, or a queued request
+waits too long, the request is shed with 503 and Retry-After before it takes a
+threadpool thread or a database connection.
+
+The POS lane is never shed: its capacity is reserved (no other class can use
+it) and its queue is unbounded. Admitting a request only matters if it can
+also get a database connection, so the other lanes together are capped at the
+primary pool's size minus ADMISSION_POS_RESERVED_CONNECTIONS (see Settings),
+leaving connections free for sales. A cashier's sale then waits at most
+behind other sales, never behind a balance sheet. This assumes a request holds
+one primary connection at a time. Limits are per worker process.
+"""
+
+import asyncio
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+POS = "pos"
+CRUD = "crud"
+REPORTS = "reports"
+BULK = "bulk"
+
+_POS_PREFIXES = ("/sales", "/till", "/login")
+_REPORT_PREFIXES = (
+    "/analytics",
+    "/customers",
+    "/expenses/stats",
+    "/supplier-debts/aging-report",
+    "/supplier-debts/summary",
+)
+_BULK_PREFIXES = ("/products/bulk",)
+# Under a POS prefix, but filtered lists with exact counts rather than checkout
+_CRUD_PATHS = ("/sales", "/sales/")
+# Long-lived or trivial; holding a slot for them would starve the lane
+_EXEMPT_PATHS = ("/events/stream", "/utils/health-check/")
+
+
+def _matches(path: str, prefixes: tuple[str, ...]) -> bool:
+    return any(path == prefix or path.startswith(prefix + "/") for prefix in prefixes)
+
+
+def classify(method: str, path: str) -> str | None:
+    """The lane for a request, or None when it bypasses admission control"""
+    if method == "OPTIONS" or not path.startswith(settings.API_V1_STR + "/"):
+        return None
+    path = path[len(settings.API_V1_STR) :]
+    if path in _EXEMPT_PATHS:
+        return None
+    if method == "GET" and path in _CRUD_PATHS:
+        return CRUD
+    if _matches(path, _POS_PREFIXES):
+        return POS
+    if _matches(path, _REPORT_PREFIXES):
+        return REPORTS
+    if _matches(path, _BULK_PREFIXES):
+        return BULK
+    return CRUD
+
+
+@dataclass
+class Lane:
+    """Concurrency limit and FIFO queue for one class of requests"""
+
+    name: str
+    limit: int
+    # None: never shed, queue as long as needed
+    queue_limit: int | None
+    queue_timeout: float
+    active: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    peak_waiting: int = 0
+    _waiters: deque[asyncio.Future[None]] = field(default_factory=deque)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, queueing if needed; False when the request is shed"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if self.queue_limit is not None and self.waiting >= self.queue_limit:
+            self.rejected += 1
+            return False
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            timeout = None if self.queue_limit is None else self.queue_timeout
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Handed a slot just as the wait ran out; take it
+                return True
+            self._waiters.remove(waiter)
+            self.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        return True
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the next queued request"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self.admitted += 1
+                return
+        self.active -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "queue_limit": self.queue_limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+def _build_lanes() -> dict[str, Lane]:
+    timeout = settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+    return {
+        POS: Lane(POS, settings.ADMISSION_POS_CONCURRENCY, None, timeout),
+        CRUD: Lane(
+            CRUD,
+            settings.ADMISSION_CRUD_CONCURRENCY,
+            settings.ADMISSION_CRUD_QUEUE,
+            timeout,
+        ),
+        REPORTS: Lane(
+            REPORTS,
+            settings.ADMISSION_REPORTS_CONCURRENCY,
+            settings.ADMISSION_REPORTS_QUEUE,
+            timeout,
+        ),
+        BULK: Lane(
+            BULK,
+            settings.ADMISSION_BULK_CONCURRENCY,
+            settings.ADMISSION_BULK_QUEUE,
+            timeout,
+        ),
+    }
+
+
+lanes = _build_lanes()
+
+
+def admission_stats() -> dict[str, Any]:
+    return {name: lane.stats() for name, lane in lanes.items()}
+
+
+async def _send_busy(send: Send, lane: str) -> None:
+    body = json.dumps({"detail": f"Server busy ({lane}), please retry shortly"})
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.ADMISSION_RETRY_AFTER_SECONDS).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body.encode()})
+
+
+class AdmissionControlMiddleware:
+    """Holds a lane slot for the whole request, shedding it when the lane is full"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.ADMISSION_CONTROL_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        name = classify(scope["method"], scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        lane = lanes[name]
+        if not await lane.acquire():
+            logger.warning(f"Shed {scope['method']} {scope['path']} ({name} lane full)")
+            await _send_busy(send, name)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
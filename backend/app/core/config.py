@@ -69,6 +69,118 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Where LISTEN connections go when POSTGRES_SERVER/PORT point at PgBouncer
+    # in transaction pooling mode (LISTEN needs a session of its own)
+    POSTGRES_LISTEN_SERVER: str | None = None
+    POSTGRES_LISTEN_PORT: int | None = None
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def LISTEN_DATABASE_URI(self) -> PostgresDsn:
+        return PostgresDsn.build(
+            scheme="postgresql",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_LISTEN_SERVER or self.POSTGRES_SERVER,
+            port=self.POSTGRES_LISTEN_PORT or self.POSTGRES_PORT,
+            path=self.POSTGRES_DB,
+        )
+
+    # Admission control: concurrent requests and queue length per lane, per
+    # worker. The POS lane is reserved capacity and is never shed. The other
+    # lanes together may admit at most DB_POOL_SIZE + DB_MAX_OVERFLOW minus
+    # ADMISSION_POS_RESERVED_CONNECTIONS, so POS requests never wait on the
+    # pool behind them (checked when settings load).
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_POS_CONCURRENCY: int = 16
+    ADMISSION_POS_RESERVED_CONNECTIONS: int = 4
+    ADMISSION_CRUD_CONCURRENCY: int = 8
+    ADMISSION_CRUD_QUEUE: int = 64
+    ADMISSION_REPORTS_CONCURRENCY: int = 2
+    ADMISSION_REPORTS_QUEUE: int = 8
+    ADMISSION_BULK_CONCURRENCY: int = 1
+    ADMISSION_BULK_QUEUE: int = 2
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+
+    # Executors for work async routes must keep off the event loop: processes
+    # for CPU-bound parsing (0 runs it in a thread instead) and threads for
+    # blocking file I/O. Loop stalls longer than LOOP_LAG_WARN_MS are logged.
+    CPU_POOL_WORKERS: int = 2
+    FILE_IO_THREADS: int = 4
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    LOOP_LAG_WARN_MS: float = 200.0
+
+    # Optional streaming replica for reports and list endpoints; reads fall
+    # back to the primary while it lags more than REPLICA_MAX_LAG_SECONDS
+    REPLICA_POSTGRES_SERVER: str | None = None
+    REPLICA_POSTGRES_PORT: int | None = None
+    REPLICA_MAX_LAG_SECONDS: float = 10.0
+    REPLICA_CHECK_SECONDS: float = 5.0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def REPLICA_DATABASE_URI(self) -> PostgresDsn | None:
+        if not self.REPLICA_POSTGRES_SERVER:
+            return None
+        return PostgresDsn.build(
+            scheme="postgresql+psycopg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.REPLICA_POSTGRES_SERVER,
+            port=self.REPLICA_POSTGRES_PORT or self.POSTGRES_PORT,
+            path=self.POSTGRES_DB,
+        )
+
+    # Connection pools, per worker process. Each worker may open up to
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW (sync routes)
+    # + DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW (async routes)
+    # + one LISTEN connection (catalog, live events and user cache share it)
+    # to the primary, the same again to a replica if configured; workers times
+    # that must stay under the server's max_connections (or PgBouncer's pool).
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Only the report routes are async, so their pool is smaller
+    DB_ASYNC_POOL_SIZE: int = 2
+    DB_ASYNC_MAX_OVERFLOW: int = 3
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    # Replace connections older than this; -1 keeps them indefinitely
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Test each connection on checkout (one extra round trip per checkout)
+    DB_POOL_PRE_PING: bool = False
+    # Server-side limits for every session, in milliseconds; 0 disables
+    DB_STATEMENT_TIMEOUT_MS: int = 60000
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 60000
+    # Safe behind PgBouncer transaction pooling: no server-side prepared
+    # statements, and the limits above are set per transaction
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Timezone the shop trades in; business dates ("today", date filters) use it
+    BUSINESS_TIMEZONE: str = "Africa/Nairobi"
+
+    # Shared response cache for report endpoints (stored in Postgres)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    # Cache hits are counted per worker and written out at most this often
+    RESPONSE_CACHE_HIT_FLUSH_SECONDS: int = 30
+    # ETag / 304 on list and reference endpoints, from the same table versions
+    CONDITIONAL_GET_ENABLED: bool = True
+
+    # Per-worker POS catalog cache, invalidated through LISTEN/NOTIFY
+    CATALOG_CACHE_ENABLED: bool = True
+    CATALOG_CACHE_MAX_ENTRIES: int = 5000
+
+    # Per-worker cache of authenticated users, invalidated through LISTEN/NOTIFY
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_MAX_ENTRIES: int = 1000
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    # Server-sent events stream, fanned out across workers through LISTEN/NOTIFY
+    LIVE_EVENTS_ENABLED: bool = True
+    LIVE_EVENTS_HEARTBEAT_SECONDS: int = 15
+    # Recent events each worker keeps to resume reconnecting streams from
+    LIVE_EVENTS_HISTORY: int = 1000
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -106,6 +218,29 @@ class Settings(BaseSettings):
             else:
                 raise ValueError(message)
 
+    @model_validator(mode="after")
+    def _check_admission_budget(self) -> Self:
+        if not self.ADMISSION_CONTROL_ENABLED:
+            return self
+        non_pos = (
+            self.ADMISSION_CRUD_CONCURRENCY
+            + self.ADMISSION_REPORTS_CONCURRENCY
+            + self.ADMISSION_BULK_CONCURRENCY
+        )
+        budget = (
+            self.DB_POOL_SIZE
+            + self.DB_MAX_OVERFLOW
+            - self.ADMISSION_POS_RESERVED_CONNECTIONS
+        )
+        if non_pos > budget:
+            raise ValueError(
+                f"The CRUD, reports and bulk lanes admit {non_pos} requests at "
+                f"once, but only {budget} pool connections are left after the "
+                f"{self.ADMISSION_POS_RESERVED_CONNECTIONS} reserved for POS; "
+                "lower their concurrency or raise DB_POOL_SIZE/DB_MAX_OVERFLOW"
+            )
+        return self
+
     @model_validator(mode="after")
     def _enforce_non_default_secrets(self) -> Self:
         self._check_default_secret("SECRET_KEY", self.SECRET_KEY)
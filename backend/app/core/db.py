@@ -1,18 +1,256 @@
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import Connection, Engine, event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm import SessionTransaction
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
 from app.core.logging_config import get_logger
+from app.core.pool_metrics import async_pool_metrics, pool_metrics
 from app.models import PaymentMethod, ProductCategory, ProductStatus, User, UserCreate
 
 logger = get_logger(__name__)
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+
+def _session_limits() -> dict[str, int]:
+    limits = {
+        "statement_timeout": settings.DB_STATEMENT_TIMEOUT_MS,
+        "idle_in_transaction_session_timeout": settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS,
+    }
+    return {name: value for name, value in limits.items() if value > 0}
+
+
+def _connect_args() -> dict[str, Any]:
+    if settings.DB_PGBOUNCER_MODE:
+        # Prepared statements live on a server connection PgBouncer may swap
+        # out between transactions, and startup options aren't passed through
+        return {"prepare_threshold": None}
+    options = " ".join(
+        f"-c {name}={value}" for name, value in _session_limits().items()
+    )
+    return {"options": options} if options else {}
+
+
+def _engine_options(pool_size: int, max_overflow: int) -> dict[str, Any]:
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": _connect_args(),
+    }
+
+
+def _apply_transaction_limits(created: Engine) -> None:
+    limits = _session_limits()
+    if not (settings.DB_PGBOUNCER_MODE and limits):
+        return
+    statement = "; ".join(
+        f"SET LOCAL {name} = {value}" for name, value in limits.items()
+    )
+
+    @event.listens_for(created, "begin")
+    def _set_transaction_limits(connection: Connection) -> None:
+        # SET would leak onto other clients' transactions through PgBouncer
+        connection.exec_driver_sql(statement)
+
+
+def _create_engine(url: str) -> Engine:
+    created = create_engine(
+        url, **_engine_options(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+    )
+    _apply_transaction_limits(created)
+    return created
+
+
+def _create_async_engine(url: str) -> AsyncEngine:
+    """Engine for async def routes (psycopg's async driver), with its own pool size"""
+    created = create_async_engine(
+        url,
+        **_engine_options(settings.DB_ASYNC_POOL_SIZE, settings.DB_ASYNC_MAX_OVERFLOW),
+    )
+    _apply_transaction_limits(created.sync_engine)
+    return created
+
+
+engine = _create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+pool_metrics.install(engine)
+# A pool of its own, so async routes never wait on the sync routes' threads
+async_engine = _create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+async_pool_metrics.install(async_engine.sync_engine)
 logger.info(
     f"Database engine created: {settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 )
 
 
+# ==================== READ REPLICA ====================
+
+# Zero while the replica has replayed everything it received, otherwise the
+# age of the last replayed transaction
+_REPLICA_LAG = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()),
+            'Infinity'
+        )
+    END::float8
+    """
+)
+
+
+class Replica:
+    """Optional streaming replica, used for reads only while it keeps up"""
+
+    def __init__(
+        self,
+        replica_engine: Engine,
+        max_lag_seconds: float,
+        check_seconds: float,
+        async_engine: AsyncEngine | None = None,
+    ) -> None:
+        self.engine = replica_engine
+        self.async_engine = async_engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.lag_seconds: float | None = None
+        self._fresh = False
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def is_fresh(self) -> bool:
+        """Whether reads may go to the replica; re-checked every few seconds"""
+        if self._check_due():
+            self._record(self._measure_lag())
+        return self._fresh
+
+    async def is_fresh_async(self) -> bool:
+        """is_fresh() for async routes, measuring through the async engine"""
+        if self._check_due():
+            self._record(await self._measure_lag_async())
+        return self._fresh
+
+    def _check_due(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_check:
+                return False
+            # Other requests keep the previous answer while this one checks
+            self._next_check = now + self.check_seconds
+            return True
+
+    def _record(self, lag: float | None) -> None:
+        fresh = lag is not None and lag <= self.max_lag_seconds
+        if fresh != self._fresh:
+            logger.warning(
+                f"Read replica {'back in use' if fresh else 'bypassed'} "
+                f"(lag: {'unreachable' if lag is None else f'{lag:.1f}s'})"
+            )
+        with self._lock:
+            self.lag_seconds = lag
+            self._fresh = fresh
+
+    def _measure_lag(self) -> float | None:
+        try:
+            with self.engine.connect() as connection:
+                return float(connection.execute(_REPLICA_LAG).scalar_one())
+        except DBAPIError as e:
+            logger.warning(f"Read replica check failed: {e}")
+            return None
+
+    async def _measure_lag_async(self) -> float | None:
+        assert self.async_engine is not None
+        try:
+            async with self.async_engine.connect() as connection:
+                result = await connection.execute(_REPLICA_LAG)
+                return float(result.scalar_one())
+        except DBAPIError as e:
+            logger.warning(f"Read replica check failed: {e}")
+            return None
+
+
+replica: Replica | None = None
+if settings.REPLICA_DATABASE_URI is not None:
+    replica = Replica(
+        _create_engine(str(settings.REPLICA_DATABASE_URI)),
+        settings.REPLICA_MAX_LAG_SECONDS,
+        settings.REPLICA_CHECK_SECONDS,
+        async_engine=_create_async_engine(str(settings.REPLICA_DATABASE_URI)),
+    )
+
+
+def read_engine() -> Engine:
+    """The replica while it is configured and fresh, otherwise the primary"""
+    if replica is not None and replica.is_fresh():
+        return replica.engine
+    return engine
+
+
+async def async_read_engine() -> AsyncEngine:
+    """read_engine() for async routes"""
+    if (
+        replica is not None
+        and replica.async_engine is not None
+        and await replica.is_fresh_async()
+    ):
+        return replica.async_engine
+    return async_engine
+
+
+async def dispose_async_engines() -> None:
+    """Close pooled async connections; they belong to the event loop that made them"""
+    await async_engine.dispose()
+    if replica is not None and replica.async_engine is not None:
+        await replica.async_engine.dispose()
+
+
+def listen_conninfo() -> str:
+    """libpq connection string for the LISTEN threads"""
+    return str(settings.LISTEN_DATABASE_URI)
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _mark_written(session: OrmSession, _flush_context: Any) -> None:
+    session.info["flushed_writes"] = True
+
+
+@event.listens_for(OrmSession, "after_transaction_end")
+def _clear_written(session: OrmSession, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("flushed_writes", None)
+
+
+def release_connection(session: Session) -> None:
+    """
+    Return the session's connection to the pool, keeping loaded objects usable.
+
+    Sessions only check out a connection on their first query, then hold it
+    until commit, rollback or close. When a read is done and the rest of the
+    request may not touch the database, ending the (read-only) transaction here
+    frees the connection; the next query checks one out again. Sessions with
+    pending or flushed changes are left alone.
+    """
+    if session.new or session.dirty or session.deleted:
+        return
+    if session.info.get("flushed_writes"):
+        return
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
+
+
 # make sure all SQLModel models are imported (app.models) before initializing DB
 # otherwise, SQLModel might fail to initialize relationships properly
 # for more details: https://github.com/fastapi/full-stack-fastapi-template/issues/28
@@ -0,0 +1,123 @@
+"""
+One LISTEN connection per worker, shared by everything fed by NOTIFY.
+
+The catalog cache, the user cache and the live events broker each register a
+channel with listen() at startup. A single thread then holds one connection
+that LISTENs on all of them and hands each notification to its channel's
+callback, so a worker costs the database one extra connection however many
+channels it follows.
+
+Whenever the connection is (re)established or lost, every channel's
+`on_listening` callback is told: notifications sent while nobody was listening
+are gone, so consumers have to drop or resync whatever they derived from them.
+"""
+
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import psycopg
+
+from app.core.db import listen_conninfo
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Channel:
+    name: str
+    # Called with each notification's payload, on the listener thread
+    on_notify: Callable[[str], None]
+    # Called with True once LISTEN is in effect, False when the connection is lost
+    on_listening: Callable[[bool], None]
+
+
+_lock = threading.Lock()
+_channels: dict[str, Channel] = {}
+
+
+def listen(
+    channel: str,
+    on_notify: Callable[[str], None],
+    on_listening: Callable[[bool], None],
+) -> None:
+    """Register a channel; takes effect when the listener (re)connects"""
+    with _lock:
+        _channels[channel] = Channel(channel, on_notify, on_listening)
+
+
+class NotifyListener(threading.Thread):
+    """Per-worker thread that LISTENs on every registered channel"""
+
+    def __init__(self, channels: list[Channel], poll_seconds: float = 1.0) -> None:
+        super().__init__(name="notify-listener", daemon=True)
+        self.channels = {channel.name: channel for channel in channels}
+        self.poll_seconds = poll_seconds
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        conninfo = listen_conninfo()
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                with psycopg.connect(conninfo, autocommit=True) as connection:
+                    for name in self.channels:
+                        connection.execute(f"LISTEN {name}")
+                    self._set_listening(True)
+                    backoff = 1.0
+                    logger.info(
+                        f"Notify listener connected ({', '.join(self.channels)})"
+                    )
+                    while not self._stop_event.is_set():
+                        for notify in connection.notifies(timeout=self.poll_seconds):
+                            self._dispatch(notify.channel, notify.payload)
+            except psycopg.Error as e:
+                logger.warning(f"Notify listener disconnected: {e}")
+            finally:
+                # Notifications may be missed until we reconnect
+                self._set_listening(False)
+            self._stop_event.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _dispatch(self, name: str, payload: str) -> None:
+        channel = self.channels.get(name)
+        if channel is None:
+            return
+        try:
+            channel.on_notify(payload)
+        except Exception:
+            # One consumer's bug must not take the others' notifications down
+            logger.exception(f"Error handling {name} notification")
+
+    def _set_listening(self, listening: bool) -> None:
+        for channel in self.channels.values():
+            try:
+                channel.on_listening(listening)
+            except Exception:
+                logger.exception(f"Error switching {channel.name} listening state")
+
+
+_listener: NotifyListener | None = None
+
+
+def start_notify_listener() -> None:
+    global _listener
+    with _lock:
+        channels = list(_channels.values())
+    if not channels or _listener is not None:
+        return
+    _listener = NotifyListener(channels)
+    _listener.start()
+
+
+def stop_notify_listener() -> None:
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener.join(timeout=5)
+    _listener = None
@@ -0,0 +1,158 @@
+"""
+Keeping CPU-bound work and blocking I/O off the event loop.
+
+``async def`` routes run on the worker's event loop, so anything slow they do
+inline stalls every other request on that worker. Two executors take that
+work instead:
+
+- ``run_cpu_bound``: a process pool for CPU-heavy work such as parsing a
+  spreadsheet upload. It sidesteps the GIL, so parsing doesn't slow the
+  worker's threads either. Functions and arguments must be picklable, and the
+  functions must live in modules that import without the app (children are
+  spawned, not forked).
+- ``run_blocking_io``: a small thread pool for blocking file I/O. It is kept
+  apart from AnyIO's threadpool, which serves the sync routes.
+
+A loop lag monitor logs whenever the loop was blocked for longer than
+LOOP_LAG_WARN_MS, to catch what still slips through.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, TypeVar
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_process_pool: ProcessPoolExecutor | None = None
+_io_pool: ThreadPoolExecutor | None = None
+
+
+# ==================== EXECUTORS ====================
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.CPU_POOL_WORKERS,
+                # Forking would copy the worker's threads and pooled connections
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def _get_io_pool() -> ThreadPoolExecutor:
+    global _io_pool
+    with _lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(
+                max_workers=settings.FILE_IO_THREADS, thread_name_prefix="file-io"
+            )
+        return _io_pool
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any) -> T:
+    """Run `func(*args)` in the process pool (in a thread when it is disabled)"""
+    if settings.CPU_POOL_WORKERS <= 0:
+        return await run_blocking_io(func, *args)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_process_pool(), partial(func, *args))
+    except BrokenProcessPool:
+        # A child died (e.g. killed for memory); start a fresh pool next time
+        global _process_pool
+        with _lock:
+            _process_pool = None
+        raise
+
+
+async def run_blocking_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run `func(*args, **kwargs)` in the file I/O thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_io_pool(), partial(func, *args, **kwargs))
+
+
+def write_file(path: Any, content: bytes) -> None:
+    """Blocking file write, for run_blocking_io"""
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def shutdown_executors() -> None:
+    global _process_pool, _io_pool
+    with _lock:
+        pools = [_process_pool, _io_pool]
+        _process_pool = _io_pool = None
+    for pool in pools:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ==================== EVENT LOOP LAG ====================
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a short sleep"""
+
+    def __init__(self, interval_seconds: float, warn_ms: float) -> None:
+        self.interval_seconds = interval_seconds
+        self.warn_ms = warn_ms
+        self.stalls = 0
+        self.max_lag_ms = 0.0
+        self.last_lag_ms = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval_seconds)
+            lag_ms = (time.perf_counter() - started - self.interval_seconds) * 1000
+            self.record(lag_ms)
+
+    def record(self, lag_ms: float) -> None:
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if lag_ms > self.warn_ms:
+            self.stalls += 1
+            logger.warning(f"Event loop stalled for {lag_ms:.0f}ms")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "interval_ms": self.interval_seconds * 1000,
+            "warn_ms": self.warn_ms,
+            "last_lag_ms": round(self.last_lag_ms, 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+            "stalls": self.stalls,
+        }
+
+
+loop_lag_monitor = LoopLagMonitor(
+    settings.LOOP_LAG_INTERVAL_SECONDS, settings.LOOP_LAG_WARN_MS
+)
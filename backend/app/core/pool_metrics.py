@@ -0,0 +1,92 @@
+"""
+Per-worker connection pool metrics.
+
+Reports the pool's size and occupancy and records how long each pooled
+connection stays checked out, so the effect of releasing connections early
+(or of a pool resize) can be compared across workers. Hold-time samples are
+kept for the most recent checkouts only.
+"""
+
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+# Checkouts kept for the hold-time percentiles
+_SAMPLES = 10_000
+
+
+class PoolMetrics:
+    """Checkout counts and hold times for one engine's pool"""
+
+    def __init__(self, samples: int = _SAMPLES) -> None:
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.total_hold_seconds = 0.0
+        self._holds: deque[float] = deque(maxlen=samples)
+        self._lock = threading.Lock()
+        self._pool: Pool | None = None
+
+    def install(self, engine: Engine) -> None:
+        self._pool = engine.pool
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_checkout(self, _dbapi_connection: Any, record: Any, _proxy: Any) -> None:
+        record.info["checked_out_at"] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, _dbapi_connection: Any, record: Any) -> None:
+        started = record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+        held = time.perf_counter() - started
+        with self._lock:
+            self.checked_out -= 1
+            self.total_hold_seconds += held
+            self._holds.append(held)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.peak_checked_out = self.checked_out
+            self.total_hold_seconds = 0.0
+            self._holds.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            holds = sorted(self._holds)
+        hold_ms = [held * 1000 for held in holds]
+        pool = self._pool
+        return {
+            "pid": os.getpid(),
+            "pool": pool.status() if pool is not None else None,
+            "pool_size": pool.size() if isinstance(pool, QueuePool) else None,
+            "checked_in": pool.checkedin() if isinstance(pool, QueuePool) else None,
+            "overflow": pool.overflow() if isinstance(pool, QueuePool) else None,
+            "checkouts": self.checkouts,
+            "checked_out": self.checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            "total_hold_seconds": round(self.total_hold_seconds, 3),
+            "hold_ms_median": round(statistics.median(hold_ms), 3) if hold_ms else 0.0,
+            "hold_ms_p95": (
+                round(hold_ms[min(len(hold_ms) - 1, int(len(hold_ms) * 0.95))], 3)
+                if hold_ms
+                else 0.0
+            ),
+            "hold_ms_max": round(hold_ms[-1], 3) if hold_ms else 0.0,
+        }
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
@@ -5,6 +5,7 @@ from typing import Any, Generic, TypeVar
 from sqlalchemy import func
 from sqlmodel import Session, select
 
+from app.api.utils.stock import add_stock
 from app.core.security import get_password_hash, verify_password
 from app.models import (
     GRN,
@@ -27,6 +28,7 @@ from app.models import (
     UserCreate,
     UserUpdate,
 )
+from app.utils.date_ranges import business_today, date_range_conditions
 from app.utils.sqlalchemy_helpers import qload, qload_chain
 
 
@@ -222,17 +224,22 @@ transporter = CRUDTransporter(Transporter)
 class CRUDGRN(CRUDBase[GRN, GRNCreate, GRNUpdate]):
     def generate_grn_number(self, db: Session) -> str:
         """Generate unique GRN number in format GRN-YYYYMMDD-XXXX"""
-        today = datetime.now(timezone.utc)
+        today = business_today()
         date_prefix = today.strftime("GRN-%Y%m%d")
 
         # Get count of GRNs created today
         statement = select(func.count(GRN.id)).where(
-            func.date(GRN.created_at) == today.date()
+            *date_range_conditions(GRN.created_at, today, today)
         )
         count = db.exec(statement).one() + 1
 
         return f"{date_prefix}-{count:04d}"
 
+    def _receive_stock(self, db: Session, items: list[tuple[uuid.UUID, int]]) -> None:
+        """Add received quantities to stock, in product id order to avoid deadlocks"""
+        for product_id, quantity in sorted(items):
+            add_stock(db, product_id, quantity)
+
     def create(
         self, db: Session, *, obj_in: GRNCreate, created_by_id: uuid.UUID
     ) -> GRN:
@@ -255,14 +262,12 @@ class CRUDGRN(CRUDBase[GRN, GRNCreate, GRNUpdate]):
             grn_item = GRNItem.model_validate(item_data, update={"grn_id": db_obj.id})
             db.add(grn_item)
 
-            # Update product stock if approved
-            if obj_in.is_approved:
-                product = db.get(Product, item_data.product_id)
-                if product:
-                    product.current_stock = (
-                        product.current_stock or 0
-                    ) + item_data.received_quantity
-                    db.add(product)
+        # Update product stock if approved
+        if obj_in.is_approved:
+            self._receive_stock(
+                db,
+                [(item.product_id, item.received_quantity) for item in items_data],
+            )
 
         db.commit()
         db.refresh(db_obj)
@@ -290,13 +295,9 @@ class CRUDGRN(CRUDBase[GRN, GRNCreate, GRNUpdate]):
         if will_be_approved and not was_approved:
             # Update stock for all items when approving
             obj_data["approved_at"] = datetime.now(timezone.utc)
-            for item in db_obj.items:
-                product = db.get(Product, item.product_id)
-                if product:
-                    product.current_stock = (
-                        product.current_stock or 0
-                    ) + item.received_quantity
-                    db.add(product)
+            self._receive_stock(
+                db, [(item.product_id, item.received_quantity) for item in db_obj.items]
+            )
 
         db_obj.sqlmodel_update(obj_data)
         db_obj.updated_at = datetime.now(timezone.utc)
@@ -448,6 +449,19 @@ def mark_notification_read(
     return notification
 
 
+def count_unread_notifications(*, session: Session, user_id: uuid.UUID) -> int:
+    """Number of unread notifications for a user"""
+    from app.models import Notification
+
+    statement = (
+        select(func.count())
+        .select_from(Notification)
+        .where(Notification.user_id == user_id)
+        .where(Notification.is_read.is_(False))
+    )
+    return session.exec(statement).one()
+
+
 def delete_old_notifications(*, session: Session, days: int = 30) -> int:
     """Delete read notifications older than specified days"""
     from datetime import timedelta
@@ -12,8 +12,15 @@ from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import Response
 
 from app.api.main import api_router
+from app.api.utils.catalog_cache import listen_for_catalog_changes
+from app.api.utils.live_events import listen_for_live_events
+from app.api.utils.user_cache import listen_for_user_changes
+from app.core.admission import AdmissionControlMiddleware
 from app.core.config import settings
+from app.core.db import dispose_async_engines
 from app.core.logging_config import get_logger, setup_logging
+from app.core.notify_listener import start_notify_listener, stop_notify_listener
+from app.core.offload import loop_lag_monitor, shutdown_executors
 
 # Setup logging
 setup_logging(
@@ -86,10 +93,19 @@ async def lifespan(app: FastAPI) -> Any:
         f"Database: {settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
     )
     logger.info("=" * 60)
+    listen_for_catalog_changes()
+    listen_for_live_events()
+    listen_for_user_changes()
+    start_notify_listener()
+    loop_lag_monitor.start()
 
     yield
 
     # Shutdown
+    stop_notify_listener()
+    await loop_lag_monitor.stop()
+    shutdown_executors()
+    await dispose_async_engines()
     logger.info("=" * 60)
     logger.info(f"Shutting down {settings.PROJECT_NAME}")
     logger.info("=" * 60)
@@ -111,6 +127,9 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Innermost, so shed requests still get CORS headers and are logged
+app.add_middleware(AdmissionControlMiddleware)
+
 # Always enable CORS - use configured origins or allow all in local development
 cors_origins = (
     settings.all_cors_origins
@@ -0,0 +1,56 @@
+"""add_response_cache_tables
+
+Revision ID: 2f8a6c1d9e37
+Revises: 7c2e9d4b1a60
+Create Date: 2026-01-19 11:02:45.530913
+
+"""
+
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "2f8a6c1d9e37"
+down_revision = "7c2e9d4b1a60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "table_version",
+        sa.Column(
+            "table_name", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False
+        ),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+    op.create_table(
+        "response_cache",
+        sa.Column(
+            "cache_key", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False
+        ),
+        sa.Column(
+            "route", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False
+        ),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column(
+            "versions", sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=False
+        ),
+        sa.Column("hits", sa.Integer(), nullable=False),
+        sa.Column("misses", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+    op.create_index(
+        op.f("ix_response_cache_route"), "response_cache", ["route"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_response_cache_route"), table_name="response_cache")
+    op.drop_table("response_cache")
+    op.drop_table("table_version")
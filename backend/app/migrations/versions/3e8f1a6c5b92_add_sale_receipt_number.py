@@ -0,0 +1,54 @@
+"""add_sale_receipt_number
+
+Revision ID: 3e8f1a6c5b92
+Revises: 9b4c2e7a1f05
+Create Date: 2026-02-09 11:42:03.557190
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3e8f1a6c5b92"
+down_revision = "9b4c2e7a1f05"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE SEQUENCE sale_receipt_number_seq AS BIGINT")
+    op.add_column("sale", sa.Column("receipt_number", sa.BigInteger(), nullable=True))
+
+    # Number existing sales in the order they were made
+    op.execute(
+        """
+        UPDATE sale
+        SET receipt_number = numbered.receipt_number
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (ORDER BY sale_date, created_at, id)
+                AS receipt_number
+            FROM sale
+        ) AS numbered
+        WHERE sale.id = numbered.id
+        """
+    )
+    op.execute(
+        "SELECT setval('sale_receipt_number_seq', "
+        "COALESCE((SELECT MAX(receipt_number) FROM sale), 0) + 1, false)"
+    )
+
+    op.alter_column(
+        "sale",
+        "receipt_number",
+        nullable=False,
+        server_default=sa.text("nextval('sale_receipt_number_seq')"),
+    )
+    op.execute("ALTER SEQUENCE sale_receipt_number_seq OWNED BY sale.receipt_number")
+    op.create_index("ix_sale_receipt_number", "sale", ["receipt_number"], unique=True)
+
+
+def downgrade():
+    op.drop_index("ix_sale_receipt_number", table_name="sale")
+    # Dropping the column also drops the sequence it owns
+    op.drop_column("sale", "receipt_number")
@@ -0,0 +1,54 @@
+"""rebuild_sales_rollup_in_business_tz
+
+Revision ID: 5d1b7e3f2a84
+Revises: 2f8a6c1d9e37
+Create Date: 2026-01-26 08:41:12.604227
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision = "5d1b7e3f2a84"
+down_revision = "2f8a6c1d9e37"
+branch_labels = None
+depends_on = None
+
+
+def _rebuild(business_date_sql: str, params: dict[str, str]) -> None:
+    op.execute("DELETE FROM sales_daily_rollup")
+    op.get_bind().execute(
+        sa.text(
+            f"""
+            INSERT INTO sales_daily_rollup (
+                business_date, cashier_id, payment_method_id, category_id,
+                sale_count, item_count, total_amount
+            )
+            SELECT {business_date_sql}, sale.created_by_id,
+                   sale.payment_method_id, product.category_id,
+                   COUNT(sale.id), SUM(sale.quantity), SUM(sale.total_amount)
+            FROM sale
+            JOIN product ON product.id = sale.product_id
+            WHERE sale.voided IS FALSE
+            GROUP BY 1, sale.created_by_id, sale.payment_method_id,
+                     product.category_id
+            """
+        ),
+        params,
+    )
+
+
+def upgrade():
+    # Business dates were computed in the database timezone; recompute them in
+    # the configured business timezone
+    _rebuild(
+        "CAST(timezone(:tz, CAST(sale.sale_date AS TIMESTAMP WITH TIME ZONE)) AS DATE)",
+        {"tz": settings.BUSINESS_TIMEZONE},
+    )
+
+
+def downgrade():
+    _rebuild("CAST(sale.sale_date AS DATE)", {})
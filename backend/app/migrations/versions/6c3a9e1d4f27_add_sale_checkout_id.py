@@ -0,0 +1,26 @@
+"""add_sale_checkout_id
+
+Revision ID: 6c3a9e1d4f27
+Revises: a41d7c9e2b63
+Create Date: 2026-02-18 10:05:41.118204
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6c3a9e1d4f27"
+down_revision = "a41d7c9e2b63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("sale", sa.Column("checkout_id", sa.Uuid(), nullable=True))
+    op.create_index(op.f("ix_sale_checkout_id"), "sale", ["checkout_id"], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f("ix_sale_checkout_id"), table_name="sale")
+    op.drop_column("sale", "checkout_id")
@@ -0,0 +1,65 @@
+"""add_sales_daily_rollup_table
+
+Revision ID: 7c2e9d4b1a60
+Revises: f0ca4430182b
+Create Date: 2026-01-12 09:14:27.118402
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7c2e9d4b1a60"
+down_revision = "f0ca4430182b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "sales_daily_rollup",
+        sa.Column("business_date", sa.Date(), nullable=False),
+        sa.Column("cashier_id", sa.Uuid(), nullable=False),
+        sa.Column("payment_method_id", sa.Uuid(), nullable=False),
+        sa.Column("category_id", sa.Uuid(), nullable=False),
+        sa.Column("sale_count", sa.Integer(), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.Numeric(scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["cashier_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["payment_method_id"], ["payment_method.id"]),
+        sa.ForeignKeyConstraint(["category_id"], ["product_category.id"]),
+        sa.PrimaryKeyConstraint(
+            "business_date", "cashier_id", "payment_method_id", "category_id"
+        ),
+    )
+    # Cashier-scoped reports filter on cashier first, then the date range
+    op.create_index(
+        "ix_sales_daily_rollup_cashier_date",
+        "sales_daily_rollup",
+        ["cashier_id", "business_date"],
+        unique=False,
+    )
+
+    # Backfill from existing non-voided sales
+    op.execute(
+        """
+        INSERT INTO sales_daily_rollup (
+            business_date, cashier_id, payment_method_id, category_id,
+            sale_count, item_count, total_amount
+        )
+        SELECT CAST(sale.sale_date AS DATE), sale.created_by_id,
+               sale.payment_method_id, product.category_id,
+               COUNT(sale.id), SUM(sale.quantity), SUM(sale.total_amount)
+        FROM sale
+        JOIN product ON product.id = sale.product_id
+        WHERE sale.voided IS FALSE
+        GROUP BY CAST(sale.sale_date AS DATE), sale.created_by_id,
+                 sale.payment_method_id, product.category_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_index("ix_sales_daily_rollup_cashier_date", table_name="sales_daily_rollup")
+    op.drop_table("sales_daily_rollup")
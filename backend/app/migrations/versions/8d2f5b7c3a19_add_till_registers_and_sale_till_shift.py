@@ -0,0 +1,78 @@
+"""add_till_registers_and_sale_till_shift
+
+Revision ID: 8d2f5b7c3a19
+Revises: 6c3a9e1d4f27
+Create Date: 2026-02-20 09:12:27.640351
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8d2f5b7c3a19"
+down_revision = "6c3a9e1d4f27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "till_shift",
+        sa.Column(
+            "register", sa.String(length=50), nullable=False, server_default="main"
+        ),
+    )
+    # Only one till could be open before, but give any stray extra open shifts
+    # a register of their own so the unique index can be built
+    op.execute(
+        """
+        UPDATE till_shift
+        SET register = 'main-' || left(id::text, 8)
+        WHERE status = 'open'
+          AND id <> (
+              SELECT id FROM till_shift
+              WHERE status = 'open'
+              ORDER BY opening_time DESC
+              LIMIT 1
+          )
+        """
+    )
+    op.create_index(
+        "ix_till_shift_open_register",
+        "till_shift",
+        ["register"],
+        unique=True,
+        postgresql_where=sa.text("status = 'open'"),
+    )
+
+    op.add_column("sale", sa.Column("till_shift_id", sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        "sale_till_shift_id_fkey", "sale", "till_shift", ["till_shift_id"], ["id"]
+    )
+    # Attribute existing sales the way shift counts used to: by the cashier
+    # who opened the shift, within its opening and closing time
+    op.execute(
+        """
+        UPDATE sale
+        SET till_shift_id = till_shift.id
+        FROM till_shift
+        WHERE sale.created_by_id = till_shift.opened_by_id
+          AND sale.sale_date >= till_shift.opening_time
+          AND (
+              till_shift.closing_time IS NULL
+              OR sale.sale_date <= till_shift.closing_time
+          )
+        """
+    )
+    op.create_index(
+        op.f("ix_sale_till_shift_id"), "sale", ["till_shift_id"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_sale_till_shift_id"), table_name="sale")
+    op.drop_constraint("sale_till_shift_id_fkey", "sale", type_="foreignkey")
+    op.drop_column("sale", "till_shift_id")
+    op.drop_index("ix_till_shift_open_register", table_name="till_shift")
+    op.drop_column("till_shift", "register")
@@ -0,0 +1,31 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 9b4c2e7a1f05
+Revises: 5d1b7e3f2a84
+Create Date: 2026-02-02 10:27:51.180644
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9b4c2e7a1f05"
+down_revision = "5d1b7e3f2a84"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Cursor pages on the sales list compare (sale_date, id) row values
+    op.create_index("ix_sale_sale_date_id", "sale", ["sale_date", "id"], unique=False)
+    op.create_index(
+        "ix_sale_user_date_id",
+        "sale",
+        ["created_by_id", "sale_date", "id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_sale_user_date_id", table_name="sale")
+    op.drop_index("ix_sale_sale_date_id", table_name="sale")
@@ -0,0 +1,43 @@
+"""add_product_name_trigram_index
+
+Revision ID: a41d7c9e2b63
+Revises: 3e8f1a6c5b92
+Create Date: 2026-02-16 14:05:38.902117
+
+"""
+
+import logging
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a41d7c9e2b63"
+down_revision = "3e8f1a6c5b92"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade():
+    connection = op.get_bind()
+    available = connection.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).first()
+    if not available:
+        # Product search falls back to plain ILIKE ranking without the extension
+        logger.warning("pg_trgm is not available; skipping product name trigram index")
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Serves ILIKE '%q%' and the similarity operator used by product search
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_product_name_trgm "
+        "ON product USING gin (name gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    # The extension is left installed; other objects may depend on it
+    op.execute("DROP INDEX IF EXISTS ix_product_name_trgm")
@@ -0,0 +1,36 @@
+"""add_sale_category_id
+
+Revision ID: a8f3d61c2b95
+Revises: c7d3e9a1f4b6
+Create Date: 2026-10-17 14:06:52.318740
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a8f3d61c2b95"
+down_revision = "c7d3e9a1f4b6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("sale", sa.Column("category_id", sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        "sale_category_id_fkey", "sale", "product_category", ["category_id"], ["id"]
+    )
+    # Existing rollup rows were built from the products' current categories
+    op.execute(
+        """
+        UPDATE sale SET category_id = product.category_id
+        FROM product
+        WHERE product.id = sale.product_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_constraint("sale_category_id_fkey", "sale", type_="foreignkey")
+    op.drop_column("sale", "category_id")
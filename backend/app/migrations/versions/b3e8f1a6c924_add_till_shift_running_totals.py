@@ -0,0 +1,87 @@
+"""add_till_shift_running_totals
+
+Revision ID: b3e8f1a6c924
+Revises: 8d2f5b7c3a19
+Create Date: 2026-02-23 10:41:08.215730
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b3e8f1a6c924"
+down_revision = "8d2f5b7c3a19"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "till_shift",
+        sa.Column("sale_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "till_shift",
+        sa.Column("item_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "till_shift",
+        sa.Column(
+            "total_sales", sa.Numeric(scale=2), nullable=False, server_default="0"
+        ),
+    )
+    op.create_table(
+        "till_shift_payment_total",
+        sa.Column("till_shift_id", sa.Uuid(), nullable=False),
+        sa.Column("payment_method_id", sa.Uuid(), nullable=False),
+        sa.Column("amount", sa.Numeric(scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["till_shift_id"], ["till_shift.id"]),
+        sa.ForeignKeyConstraint(["payment_method_id"], ["payment_method.id"]),
+        sa.PrimaryKeyConstraint("till_shift_id", "payment_method_id"),
+    )
+
+    # Backfill from the sales already stamped with a shift
+    op.execute(
+        """
+        UPDATE till_shift
+        SET sale_count = totals.sale_count,
+            item_count = totals.item_count,
+            total_sales = totals.total_sales
+        FROM (
+            SELECT till_shift_id,
+                   count(*) AS sale_count,
+                   sum(quantity) AS item_count,
+                   sum(total_amount) AS total_sales
+            FROM sale
+            WHERE till_shift_id IS NOT NULL AND NOT voided
+            GROUP BY till_shift_id
+        ) AS totals
+        WHERE till_shift.id = totals.till_shift_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO till_shift_payment_total (till_shift_id, payment_method_id, amount)
+        SELECT till_shift_id, payment_method_id, sum(amount)
+        FROM (
+            SELECT s.till_shift_id, sp.payment_method_id, sp.amount
+            FROM sale_payment sp
+            JOIN sale s ON s.id = sp.sale_id
+            WHERE s.till_shift_id IS NOT NULL AND NOT s.voided
+            UNION ALL
+            SELECT s.till_shift_id, s.payment_method_id, s.total_amount
+            FROM sale s
+            WHERE s.till_shift_id IS NOT NULL AND NOT s.voided
+              AND NOT EXISTS (SELECT 1 FROM sale_payment sp WHERE sp.sale_id = s.id)
+        ) AS payments
+        GROUP BY till_shift_id, payment_method_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("till_shift_payment_total")
+    op.drop_column("till_shift", "total_sales")
+    op.drop_column("till_shift", "item_count")
+    op.drop_column("till_shift", "sale_count")
@@ -0,0 +1,60 @@
+"""add_bulk_import_row_table
+
+Revision ID: c7d3e9a1f4b6
+Revises: e4a7c2d9b815
+Create Date: 2026-10-17 09:12:31.604217
+
+"""
+
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c7d3e9a1f4b6"
+down_revision = "e4a7c2d9b815"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("bulk_import_session", sa.Column("columns", sa.JSON(), nullable=True))
+    op.add_column(
+        "bulk_import_session",
+        sa.Column("default_category_id", sa.Uuid(), nullable=True),
+    )
+    op.add_column(
+        "bulk_import_session", sa.Column("default_status_id", sa.Uuid(), nullable=True)
+    )
+    op.add_column(
+        "bulk_import_session",
+        sa.Column(
+            "file_path", sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True
+        ),
+    )
+    # Rows of an upload, shared by all workers instead of held in one's memory
+    op.create_table(
+        "bulk_import_row",
+        sa.Column("session_id", sa.Uuid(), nullable=False),
+        sa.Column("row_number", sa.Integer(), nullable=False),
+        sa.Column("raw_data", sa.JSON(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("mapped_data", sa.JSON(), nullable=True),
+        sa.Column("errors", sa.JSON(), nullable=True),
+        sa.Column("warnings", sa.JSON(), nullable=True),
+        sa.Column("is_duplicate", sa.Boolean(), nullable=False),
+        sa.Column("duplicate_product_id", sa.Uuid(), nullable=True),
+        sa.Column("status", sqlmodel.sql.sqltypes.AutoString(length=20), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["session_id"], ["bulk_import_session.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("session_id", "row_number"),
+    )
+
+
+def downgrade():
+    op.drop_table("bulk_import_row")
+    op.drop_column("bulk_import_session", "file_path")
+    op.drop_column("bulk_import_session", "default_status_id")
+    op.drop_column("bulk_import_session", "default_category_id")
+    op.drop_column("bulk_import_session", "columns")
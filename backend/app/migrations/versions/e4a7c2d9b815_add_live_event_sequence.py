@@ -0,0 +1,24 @@
+"""add_live_event_sequence
+
+Revision ID: e4a7c2d9b815
+Revises: b3e8f1a6c924
+Create Date: 2026-02-24 15:06:52.118402
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4a7c2d9b815"
+down_revision = "b3e8f1a6c924"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Ids for the live events sent over LISTEN/NOTIFY (resume points for streams)
+    op.execute("CREATE SEQUENCE live_event_seq")
+
+
+def downgrade():
+    op.execute("DROP SEQUENCE live_event_seq")
@@ -1,15 +1,18 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Literal, Optional
 
 from pydantic import EmailStr, field_validator, model_validator
-from sqlalchemy import JSON
+from sqlalchemy import JSON, BigInteger, Index, Sequence, text
 from sqlmodel import Column, Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
     pass
 
+# How list endpoints computed `count` (see app.api.utils.pagination.count_rows)
+CountMode = Literal["exact", "estimated", "none"]
+
 
 # Shared properties
 class UserBase(SQLModel):
@@ -124,7 +127,8 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
 
 
 # ==================== MEDIA MODELS ====================
@@ -332,7 +336,8 @@ class ProductPublic(ProductBase):
 
 class ProductsPublic(SQLModel):
     data: list[ProductPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
 
 
 # ==================== STOCK ENTRY MODELS ====================
@@ -415,7 +420,9 @@ class StockEntryPublic(StockEntryBase):
 
 class StockEntriesPublic(SQLModel):
     data: list[StockEntryPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None  # Pass back as `cursor` for the next page
 
 
 # ==================== TOKEN MODELS ====================
@@ -573,12 +580,40 @@ class SaleUpdate(SQLModel):
     notes: str | None = None
 
 
+# Receipt numbers are issued by Postgres so they stay unique across workers
+sale_receipt_number_seq = Sequence(
+    "sale_receipt_number_seq", metadata=SQLModel.metadata
+)
+
+
 class Sale(SaleBase, table=True):
     __tablename__ = "sale"
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    receipt_number: int | None = Field(
+        default=None,
+        sa_column=Column(
+            BigInteger,
+            sale_receipt_number_seq,
+            server_default=sale_receipt_number_seq.next_value(),
+            nullable=False,
+            unique=True,
+            index=True,
+        ),
+    )
     sale_date: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc), index=True
     )
+    # Groups the lines of one cart checkout (None for single-product sales)
+    checkout_id: uuid.UUID | None = Field(default=None, index=True)
+    # Till shift the sale was rung up on (None for sales before registers)
+    till_shift_id: uuid.UUID | None = Field(
+        default=None, foreign_key="till_shift.id", index=True
+    )
+    # Product category the sale is booked under in the daily rollup, stamped
+    # when it is added so a void removes it from the same row
+    category_id: uuid.UUID | None = Field(
+        default=None, foreign_key="product_category.id"
+    )
     created_by_id: uuid.UUID = Field(foreign_key="user.id")
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -598,16 +633,52 @@ class Sale(SaleBase, table=True):
 
 class SalePublic(SaleBase):
     id: uuid.UUID
+    receipt_number: int
     sale_date: datetime
+    checkout_id: uuid.UUID | None = None
+    till_shift_id: uuid.UUID | None = None
     product: ProductPublic
     payment_method: PaymentMethodPublic
     created_by: UserPublic
     voided: bool
 
 
+class CheckoutReceipt(SQLModel):
+    """Receipt for a multi-line cart checkout"""
+
+    checkout_id: uuid.UUID
+    receipt_number: int  # Receipt number of the first line
+    lines: list[SalePublic]
+    total_amount: Decimal
+    amount_paid: Decimal
+    change: Decimal
+    debt_amount: Decimal
+
+
+SaleSyncStatus = Literal["accepted", "duplicate", "rejected"]
+
+
+class SaleSyncResult(SQLModel):
+    """Outcome of one offline checkout in a sync batch"""
+
+    checkout_id: uuid.UUID
+    status: SaleSyncStatus
+    receipt_number: int | None = None  # Set for accepted and duplicate checkouts
+    detail: str | None = None  # Why a checkout was rejected
+
+
+class SaleSyncResults(SQLModel):
+    results: list[SaleSyncResult]
+    accepted: int
+    duplicates: int
+    rejected: int
+
+
 class SalesPublic(SQLModel):
     data: list[SalePublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None  # Pass back as `cursor` for the next page
 
 
 # ==================== SALE PAYMENT MODELS (Multiple Payment Methods) ====================
@@ -643,6 +714,29 @@ class SalePaymentPublic(SalePaymentBase):
     created_at: datetime
 
 
+# ==================== SALES DAILY ROLLUP MODELS ====================
+
+
+class SalesDailyRollup(SQLModel, table=True):
+    """
+    Per-day sales totals, maintained in the same transaction as the sale writes.
+
+    One row per (business date, cashier, primary payment method, product category).
+    Voided sales are removed from the rollup when they are voided.
+    """
+
+    __tablename__ = "sales_daily_rollup"
+    business_date: date = Field(primary_key=True)
+    cashier_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    payment_method_id: uuid.UUID = Field(
+        foreign_key="payment_method.id", primary_key=True
+    )
+    category_id: uuid.UUID = Field(foreign_key="product_category.id", primary_key=True)
+    sale_count: int = Field(default=0)
+    item_count: int = Field(default=0)
+    total_amount: Decimal = Field(default=Decimal("0"), decimal_places=2)
+
+
 # ==================== EXPENSE CATEGORY MODELS ====================
 
 
@@ -729,7 +823,9 @@ class ExpensePublic(ExpenseBase):
 
 class ExpensesPublic(SQLModel):
     data: list[ExpensePublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None  # Pass back as `cursor` for the next page
 
 
 # ==================== DEBT/CREDIT MODELS ====================
@@ -812,7 +908,9 @@ class DebtPublic(DebtBase):
 
 class DebtsPublic(SQLModel):
     data: list[DebtPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None  # Pass back as `cursor` for the next page
 
 
 # ==================== DEBT PAYMENT MODELS ====================
@@ -859,7 +957,8 @@ class DebtPaymentPublic(DebtPaymentBase):
 
 class DebtPaymentsPublic(SQLModel):
     data: list[DebtPaymentPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
 
 
 # ==================== SHIFT RECONCILIATION MODELS ====================
@@ -938,7 +1037,8 @@ class ShiftReconciliationPublic(ShiftReconciliationBase):
 
 class ShiftReconciliationsPublic(SQLModel):
     data: list[ShiftReconciliationPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
 
 
 # ==================== TILL/SHIFT MODELS ====================
@@ -948,6 +1048,7 @@ class TillShiftBase(SQLModel):
     """Base model for till shift (opening/closing)"""
 
     shift_type: str = Field(max_length=20)  # "day" or "night"
+    register: str = Field(default="main", max_length=50)  # Register/terminal name
     opening_cash_float: Decimal = Field(decimal_places=2, ge=0)
     opening_balance: Decimal | None = Field(
         default=None, decimal_places=2, ge=0
@@ -982,9 +1083,22 @@ class TillShift(TillShiftBase, table=True):
     """Till shift tracking"""
 
     __tablename__ = "till_shift"
+    __table_args__ = (
+        # At most one open shift per register; also serves the POS-lock lookup
+        Index(
+            "ix_till_shift_open_register",
+            "register",
+            unique=True,
+            postgresql_where=text("status = 'open'"),
+        ),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     opened_by_id: uuid.UUID = Field(foreign_key="user.id")
     closed_by_id: uuid.UUID | None = Field(default=None, foreign_key="user.id")
+    # Running totals of the non-voided sales rung up on the shift
+    sale_count: int = Field(default=0)
+    item_count: int = Field(default=0)
+    total_sales: Decimal = Field(default=Decimal("0"), decimal_places=2)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -1007,6 +1121,23 @@ class TillShift(TillShiftBase, table=True):
     variances: list["CashierVariance"] = Relationship(back_populates="till_shift")
 
 
+class TillShiftPaymentTotal(SQLModel, table=True):
+    """
+    Amount taken per payment method on a till shift.
+
+    Maintained in the same transaction as the sale and void writes. A sale
+    counts under its SalePayment rows when it has any, otherwise under its
+    primary payment method for the full total.
+    """
+
+    __tablename__ = "till_shift_payment_total"
+    till_shift_id: uuid.UUID = Field(foreign_key="till_shift.id", primary_key=True)
+    payment_method_id: uuid.UUID = Field(
+        foreign_key="payment_method.id", primary_key=True
+    )
+    amount: Decimal = Field(default=Decimal("0"), decimal_places=2)
+
+
 class TillShiftPublic(TillShiftBase):
     """Public model for till shift"""
 
@@ -1021,7 +1152,8 @@ class TillShiftPublic(TillShiftBase):
 
 class TillShiftsPublic(SQLModel):
     data: list[TillShiftPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
 
 
 # ==================== PAYMENT METHOD RECONCILIATION MODELS ====================
@@ -1114,7 +1246,8 @@ class CashierVariancePublic(CashierVarianceBase):
 
 class CashierVariancesPublic(SQLModel):
     data: list[CashierVariancePublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
     total_shortage: Decimal = Field(default=Decimal(0), decimal_places=2)
     total_overage: Decimal = Field(default=Decimal(0), decimal_places=2)
 
@@ -1201,6 +1334,32 @@ class BulkImportSession(BulkImportSessionBase, table=True):
     column_mapping: dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
     import_options: dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
 
+    # Kept between steps so any worker can serve any of them
+    columns: list[str] | None = Field(default=None, sa_column=Column(JSON))
+    default_category_id: uuid.UUID | None = None
+    default_status_id: uuid.UUID | None = None
+    file_path: str | None = Field(default=None, max_length=500)
+
+
+class BulkImportRow(SQLModel, table=True):
+    """A row of an uploaded file, staged until the import completes."""
+
+    __tablename__ = "bulk_import_row"
+    session_id: uuid.UUID = Field(
+        foreign_key="bulk_import_session.id", primary_key=True, ondelete="CASCADE"
+    )
+    row_number: int = Field(primary_key=True)
+    # As uploaded; column mapping (or fix-row) sets the rest
+    raw_data: dict[str, Any] = Field(sa_column=Column(JSON, nullable=False))
+    data: dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
+    mapped_data: dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
+    errors: list[dict[str, Any]] | None = Field(default=None, sa_column=Column(JSON))
+    warnings: list[str] | None = Field(default=None, sa_column=Column(JSON))
+    is_duplicate: bool = False
+    duplicate_product_id: uuid.UUID | None = None
+    # None until the row has been validated
+    status: str | None = Field(default=None, max_length=20)
+
 
 class BulkImportSessionPublic(BulkImportSessionBase):
     id: uuid.UUID
@@ -1339,7 +1498,8 @@ class SupplierPublic(SupplierBase):
 
 class SuppliersPublic(SQLModel):
     data: list[SupplierPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
 
 
 # ==================== TRANSPORTER MODELS ====================
@@ -1381,7 +1541,8 @@ class TransporterPublic(TransporterBase):
 
 class TransportersPublic(SQLModel):
     data: list[TransporterPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
 
 
 # ==================== GRN (GOODS RECEIVED NOTE) MODELS ====================
@@ -1505,7 +1666,9 @@ class GRNPublicWithItems(GRNPublic):
 
 class GRNsPublic(SQLModel):
     data: list[GRNPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None  # Pass back as `cursor` for the next page
 
 
 # ==================== GRN ITEM MODELS ====================
@@ -1666,7 +1829,9 @@ class SupplierDebtPublic(SupplierDebtBase):
 
 class SupplierDebtsPublic(SQLModel):
     data: list[SupplierDebtPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None  # Pass back as `cursor` for the next page
 
 
 class SupplierDebtPublicWithDetails(SupplierDebtPublic):
@@ -1850,8 +2015,10 @@ class NotificationPublic(NotificationBase):
 
 class NotificationsPublic(SQLModel):
     data: list[NotificationPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
     unread_count: int = 0
+    next_cursor: str | None = None  # Pass back as `cursor` for the next page
 
 
 # ==================== REMINDER SETTING MODELS ====================
@@ -1958,7 +2125,8 @@ class ReminderLogPublic(ReminderLogBase):
 
 class ReminderLogsPublic(SQLModel):
     data: list[ReminderLogPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = "exact"
 
 
 # ==================== SUPPLIER PRODUCT REORDER MODELS ====================
@@ -2004,3 +2172,44 @@ class SupplierProductReorderPublic(SupplierProductReorderBase):
 class SupplierProductReordersPublic(SQLModel):
     data: list[SupplierProductReorderPublic]
     count: int
+
+
+# ==================== RESPONSE CACHE MODELS ====================
+
+
+class TableVersion(SQLModel, table=True):
+    """Write counter per table, bumped after every commit that changes it"""
+
+    __tablename__ = "table_version"
+    table_name: str = Field(primary_key=True, max_length=100)
+    version: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class ResponseCacheEntry(SQLModel, table=True):
+    """Cached JSON response shared by all workers"""
+
+    __tablename__ = "response_cache"
+    cache_key: str = Field(primary_key=True, max_length=64)
+    route: str = Field(max_length=255, index=True)
+    payload: Any = Field(default=None, sa_column=Column(JSON))
+    # Versions of the tables the response was computed from, e.g. "debt:3,sale:41"
+    versions: str = Field(max_length=1000)
+    hits: int = Field(default=0)
+    misses: int = Field(default=0)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    expires_at: datetime
+
+
+class CacheRouteStats(SQLModel):
+    route: str
+    entries: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class CacheStatsPublic(SQLModel):
+    data: list[CacheRouteStats]
+    hits: int
+    misses: int
@@ -0,0 +1,40 @@
+import argparse
+import logging
+import sys
+from datetime import date
+
+from sqlmodel import Session
+
+from app.api.utils.sales_rollup import check_sales_rollup, rebuild_sales_rollup
+from app.core.db import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild or verify the sales daily rollup against the sale table."
+    )
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        if args.command == "rebuild":
+            rows = rebuild_sales_rollup(session, args.start_date, args.end_date)
+            logger.info(f"Sales daily rollup rebuilt: {rows} rows written")
+            return
+
+        discrepancies = check_sales_rollup(session, args.start_date, args.end_date)
+        for entry in discrepancies:
+            logger.warning(f"Rollup mismatch: {entry}")
+        if discrepancies:
+            logger.error(f"Sales daily rollup has {len(discrepancies)} mismatched rows")
+            sys.exit(1)
+        logger.info("Sales daily rollup is consistent with sales")
+
+
+if __name__ == "__main__":
+    main()
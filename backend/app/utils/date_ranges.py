@@ -0,0 +1,72 @@
+"""
+Business-date helpers.
+
+Timestamps are stored as UTC instants, but the shop thinks in local business
+days (settings.BUSINESS_TIMEZONE). Filters built here compare the raw column
+against half-open [start, end) timestamp bounds, so they stay sargable and
+can use the timestamp indexes, instead of casting every row to a date.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, DateTime, cast, func
+from sqlalchemy.sql import ColumnElement
+
+from app.core.config import settings
+
+
+def business_timezone() -> ZoneInfo:
+    return ZoneInfo(settings.BUSINESS_TIMEZONE)
+
+
+def business_today() -> date:
+    """Current date in the business timezone"""
+    return datetime.now(business_timezone()).date()
+
+
+def business_day_start(day: date) -> datetime:
+    """Timezone-aware instant at which a business day starts"""
+    return datetime.combine(day, time.min, tzinfo=business_timezone())
+
+
+def business_date_bounds(
+    start_date: date | None, end_date: date | None
+) -> tuple[datetime | None, datetime | None]:
+    """
+    Convert an inclusive business-date range into half-open timestamp bounds.
+
+    Returns (lower, upper) where lower is the start of start_date and upper is
+    the start of the day after end_date; either is None when the date is None.
+    """
+    lower = business_day_start(start_date) if start_date else None
+    upper = business_day_start(end_date + timedelta(days=1)) if end_date else None
+    return lower, upper
+
+
+def date_range_conditions(
+    column: Any, start_date: date | None, end_date: date | None
+) -> list[ColumnElement[bool]]:
+    """Sargable conditions matching rows of `column` within the business-date range"""
+    lower, upper = business_date_bounds(start_date, end_date)
+    conditions: list[ColumnElement[bool]] = []
+    if lower is not None:
+        conditions.append(column >= lower)
+    if upper is not None:
+        conditions.append(column < upper)
+    return conditions
+
+
+def business_date(column: Any) -> Any:
+    """
+    SQL expression for the business date of a timestamp column.
+
+    Only for grouping/labelling; filter with date_range_conditions instead.
+    """
+    return cast(
+        func.timezone(
+            settings.BUSINESS_TIMEZONE, cast(column, DateTime(timezone=True))
+        ),
+        Date,
+    )
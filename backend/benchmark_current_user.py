@@ -0,0 +1,93 @@
+"""
+Cost of resolving the current user per authenticated request, with and without the user cache.
+
+Resolves the first superuser's access token through get_current_user() the
+way every request does, once with the per-worker user cache bypassed and once
+with it warm, and reports the latency and the queries each resolution ran:
+
+    python benchmark_current_user.py --runs 2000
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.api.deps import get_current_user
+from app.api.utils.user_cache import start_user_listener, stop_user_listener, user_cache
+from app.core import security
+from app.core.config import settings
+from app.core.db import engine
+from app.models import User
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Counts the statements sent to the database"""
+
+    def __init__(self) -> None:
+        self.queries = 0
+
+    def __call__(self, *_args: Any) -> None:
+        self.queries += 1
+
+
+def time_resolutions(
+    token: str, runs: int, cached: bool, counter: QueryCounter
+) -> tuple[float, float, float]:
+    """(median ms, p95 ms, queries per resolution) over `runs` requests"""
+    timings = []
+    counter.queries = 0
+    for _ in range(runs):
+        if not cached:
+            user_cache.invalidate()
+        # A fresh session per resolution, as each request gets one
+        with Session(engine) as session:
+            started = time.perf_counter()
+            get_current_user(session, token)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95, counter.queries / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=1000)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        user = session.exec(
+            select(User).where(User.email == settings.FIRST_SUPERUSER)
+        ).one()
+    token = security.create_access_token(user.id, expires_delta=timedelta(hours=1))
+
+    start_user_listener()
+    started = time.monotonic()
+    while not user_cache.listening and time.monotonic() - started < 10:
+        time.sleep(0.05)
+    if not user_cache.listening:
+        logger.warning("User cache listener didn't connect; cached runs will miss")
+
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        logger.info(f"{'mode':<10}{'median ms':>10}{'p95 ms':>10}{'queries':>9}")
+        for mode, cached in (("uncached", False), ("cached", True)):
+            median, p95, queries = time_resolutions(token, args.runs, cached, counter)
+            logger.info(f"{mode:<10}{median:>10.3f}{p95:>10.3f}{queries:>9.2f}")
+        logger.info(f"Cache: {user_cache.stats()}")
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+        stop_user_listener()
+
+
+if __name__ == "__main__":
+    main()
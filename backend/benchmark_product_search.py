@@ -0,0 +1,143 @@
+"""
+Per-keystroke latency of the product typeahead searches over a large catalog.
+
+Seeds a synthetic catalog inside a transaction, replays each query one
+keystroke at a time against the POS and stock entry search endpoints, and
+rolls everything back so the database is left untouched:
+
+    python benchmark_product_search.py --products 50000
+"""
+
+import argparse
+import logging
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.api.routes.sales import search_products_for_sale
+from app.api.routes.stock_entries import search_products_for_stock_entry
+from app.api.utils.product_search import trigram_search_available
+from app.core.config import settings
+from app.core.db import engine
+from app.models import User
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+BRANDS = [
+    "Jameson", "Tusker", "Smirnoff", "Johnnie Walker", "Gilbey's", "Captain Morgan",
+    "Guinness", "Heineken", "Jack Daniel's", "Baileys", "Hennessy", "Absolut",
+    "Chrome", "Kenya Cane", "White Cap", "Balozi", "Four Cousins", "Nederburg",
+    "Coca-Cola", "Sprite", "Fanta", "Schweppes", "Red Bull", "Monster",
+]  # fmt: skip
+VARIANTS = [
+    "Original", "Black", "Gold", "Lite", "Lager", "Reserve", "Select", "Red",
+    "Dry", "Sweet", "Zero", "Classic", "Special", "Export", "Premium", "Cider",
+]  # fmt: skip
+SIZES = ["250ml", "330ml", "350ml", "500ml", "750ml", "1L", "1.75L", "6-pack"]
+
+DEFAULT_QUERIES = ["jameson", "tusker lager", "smirnof", "red bull 250"]
+
+
+def seed_catalog(session: Session, products: int) -> None:
+    """Insert `products` synthetic products named '<brand> <variant> <size> #n'"""
+    session.execute(
+        text(
+            """
+            INSERT INTO product (
+                id, name, buying_price, selling_price, current_stock,
+                enable_reorder_alerts, category_id, status_id, created_by_id,
+                created_at, updated_at, consecutive_reorder_alerts,
+                max_consecutive_alerts
+            )
+            SELECT gen_random_uuid(),
+                   brands[1 + n % cardinality(brands)] || ' '
+                   || variants[1 + (n / 7) % cardinality(variants)] || ' '
+                   || sizes[1 + (n / 3) % cardinality(sizes)] || ' #' || n,
+                   100, 150, 1 + n % 50, false,
+                   (SELECT id FROM product_category ORDER BY name LIMIT 1),
+                   (SELECT id FROM product_status WHERE name = 'Active'),
+                   (SELECT id FROM "user" WHERE email = :email),
+                   now(), now(), 0, 5
+            FROM generate_series(1, :products) AS n,
+                 CAST(:brands AS text[]) AS brands,
+                 CAST(:variants AS text[]) AS variants,
+                 CAST(:sizes AS text[]) AS sizes
+            """
+        ),
+        {
+            "brands": BRANDS,
+            "variants": VARIANTS,
+            "sizes": SIZES,
+            "email": settings.FIRST_SUPERUSER,
+            "products": products,
+        },
+    )
+    session.execute(text("ANALYZE product"))
+
+
+def time_keystrokes(
+    session: Session, user: User, query: str, runs: int
+) -> list[tuple[str, float, float, int]]:
+    """(prefix, median ms, p95 ms, results) for each keystroke of `query`"""
+    searches = {
+        "pos": lambda q: search_products_for_sale(
+            session=session, current_user=user, q=q, category_id=None, limit=50
+        ),
+        "stock": lambda q: search_products_for_stock_entry(
+            session=session, current_user=user, q=q, limit=50
+        ),
+    }
+    rows = []
+    for length in range(1, len(query) + 1):
+        prefix = query[:length]
+        for name, search in searches.items():
+            timings = []
+            results = 0
+            for _ in range(runs):
+                started = time.perf_counter()
+                results = len(search(prefix))
+                timings.append((time.perf_counter() - started) * 1000)
+                # Drop loaded products so every run pays for the full query
+                session.expunge_all()
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            rows.append((f"{name}:{prefix}", statistics.median(timings), p95, results))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("queries", nargs="*", default=DEFAULT_QUERIES)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        user = session.exec(
+            select(User).where(User.email == settings.FIRST_SUPERUSER)
+        ).one()
+        try:
+            started = time.perf_counter()
+            seed_catalog(session, args.products)
+            logger.info(
+                f"Seeded {args.products} products in "
+                f"{time.perf_counter() - started:.1f}s "
+                f"(pg_trgm {'on' if trigram_search_available(session) else 'off'})"
+            )
+            logger.info(f"{'keystroke':<32}{'median ms':>10}{'p95 ms':>10}{'rows':>6}")
+            for query in args.queries:
+                for keystroke, median, p95, results in time_keystrokes(
+                    session, user, query, args.runs
+                ):
+                    logger.info(
+                        f"{keystroke:<32}{median:>10.2f}{p95:>10.2f}{results:>6}"
+                    )
+        finally:
+            session.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+POS latency while report endpoints are hammered, against a running API server.
+
+Measures a POS request (till status) on an idle server, then again while
+worker threads keep firing uncached report requests (analytics, customers,
+aging report) with varying date ranges. With the reports on async routes the
+two should stay close, because reports no longer fill the threadpool:
+
+    python benchmark_report_concurrency.py --base-url http://localhost:8000 --reports 60
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+REPORT_PATHS = [
+    "/analytics/sales-summary",
+    "/analytics/balance-sheet",
+    "/analytics/dashboard-stats",
+    "/analytics/stock-summary",
+    "/customers/",
+    "/supplier-debts/aging-report",
+]
+
+
+def login(client: httpx.Client) -> dict[str, str]:
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        },
+    )
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def time_pos_requests(
+    client: httpx.Client, headers: dict[str, str], samples: int
+) -> tuple[float, float]:
+    """(median ms, p95 ms) of the till status request"""
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        client.get(f"{settings.API_V1_STR}/till/status", headers=headers)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95
+
+
+def fire_reports(base_url: str, headers: dict[str, str], stop: threading.Event) -> None:
+    with httpx.Client(base_url=base_url, timeout=120) as client:
+        while not stop.is_set():
+            # A fresh date range per request so the response cache can't help
+            start = date.today() - timedelta(days=random.randint(30, 3650))
+            client.get(
+                f"{settings.API_V1_STR}{random.choice(REPORT_PATHS)}",
+                params={"start_date": start.isoformat()},
+                headers=headers,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--reports", type=int, default=60)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.base_url, timeout=120) as client:
+        headers = login(client)
+        logger.info(f"{'phase':<12}{'median ms':>10}{'p95 ms':>10}")
+        median, p95 = time_pos_requests(client, headers, args.samples)
+        logger.info(f"{'idle':<12}{median:>10.2f}{p95:>10.2f}")
+
+        stop = threading.Event()
+        workers = [
+            threading.Thread(
+                target=fire_reports, args=(args.base_url, headers, stop), daemon=True
+            )
+            for _ in range(args.reports)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            # Let the report load build up first
+            time.sleep(2)
+            median, p95 = time_pos_requests(client, headers, args.samples)
+            logger.info(f"{'reports':<12}{median:>10.2f}{p95:>10.2f}")
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join(timeout=120)
+
+
+if __name__ == "__main__":
+    main()
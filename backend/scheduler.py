@@ -2,7 +2,8 @@
 Background Job Scheduler Configuration
 
 Sets up APScheduler to run background services at specified intervals.
-This handles automated email reminders, reorder alerts, and notification cleanup.
+This handles automated email reminders, reorder alerts, notification cleanup,
+the till shift totals check and response cache cleanup.
 
 Production Deployment:
 1. Install APScheduler: pip install apscheduler
@@ -24,9 +25,12 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from app.background_services import (
     cleanup_old_notifications,
+    cleanup_response_cache,
     send_debt_reminder_emails,
     send_reorder_alerts,
+    verify_shift_totals,
 )
+from app.core.config import settings
 
 # Configure logging - use stdout/stderr which supervisor captures
 # Supervisor already logs to /var/log/supervisor/scheduler.log
@@ -57,7 +61,7 @@ def job_wrapper(job_name: str, job_func):
 def main():
     """Initialize and start the scheduler"""
     # Initialize scheduler
-    scheduler = BlockingScheduler(timezone="Africa/Nairobi")  # Adjust timezone as needed
+    scheduler = BlockingScheduler(timezone=settings.BUSINESS_TIMEZONE)
 
     logger.info("Initializing background job scheduler...")
 
@@ -94,6 +98,28 @@ def main():
     )
     logger.info("✓ Scheduled: Notification Cleanup (Weekly on Sunday at 12:00 AM)")
 
+    # Job 4: Verify Till Shift Totals
+    # Runs daily at 5:00 AM business time, after closing and before opening
+    scheduler.add_job(
+        job_wrapper("shift_totals_check", verify_shift_totals),
+        trigger=CronTrigger(hour=5, minute=0, timezone=settings.BUSINESS_TIMEZONE),
+        id="shift_totals_check",
+        name="Verify Till Shift Totals",
+        replace_existing=True,
+    )
+    logger.info("✓ Scheduled: Shift Totals Check (Daily at 5:00 AM)")
+
+    # Job 5: Cleanup Expired Response Cache Entries
+    # Runs hourly at half past
+    scheduler.add_job(
+        job_wrapper("response_cache_cleanup", cleanup_response_cache),
+        trigger=CronTrigger(minute=30),
+        id="response_cache_cleanup",
+        name="Cleanup Expired Response Cache",
+        replace_existing=True,
+    )
+    logger.info("✓ Scheduled: Response Cache Cleanup (Hourly at :30)")
+
     # Optional: Run jobs immediately on startup (for testing)
     # Uncomment the lines below to test jobs when starting the scheduler
     # logger.info("Running initial jobs...")
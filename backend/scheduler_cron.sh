@@ -9,6 +9,8 @@
 # 0 8 * * * /path/to/wiseman-pub-prj/backend/scheduler_cron.sh debt_reminders >> /var/log/wiseman/scheduler.log 2>&1
 # 0 9 * * * /path/to/wiseman-pub-prj/backend/scheduler_cron.sh reorder_alerts >> /var/log/wiseman/scheduler.log 2>&1
 # 0 0 * * 0 /path/to/wiseman-pub-prj/backend/scheduler_cron.sh notification_cleanup >> /var/log/wiseman/scheduler.log 2>&1
+# 0 5 * * * /path/to/wiseman-pub-prj/backend/scheduler_cron.sh shift_totals_check >> /var/log/wiseman/scheduler.log 2>&1
+# 30 * * * * /path/to/wiseman-pub-prj/backend/scheduler_cron.sh response_cache_cleanup >> /var/log/wiseman/scheduler.log 2>&1
 
 # Change to script directory
 cd "$(dirname "$0")" || exit 1
@@ -20,7 +22,7 @@ source .venv/bin/activate
 JOB_NAME=$1
 
 if [ -z "$JOB_NAME" ]; then
-    echo "Usage: $0 {debt_reminders|reorder_alerts|notification_cleanup}"
+    echo "Usage: $0 {debt_reminders|reorder_alerts|notification_cleanup|shift_totals_check|response_cache_cleanup}"
     exit 1
 fi
 
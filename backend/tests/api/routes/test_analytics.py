@@ -0,0 +1,283 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, delete, select
+
+from app.api.utils.sales_rollup import (
+    apply_sale_to_rollup,
+    check_sales_rollup,
+    rebuild_sales_rollup,
+)
+from app.core.config import settings
+from app.models import ProductCategory, Sale, SalesDailyRollup, User
+from tests.utils.sale import (
+    create_random_product,
+    create_sale,
+    create_unpaid_debt,
+    get_payment_method,
+)
+from tests.utils.user import user_authentication_headers
+from tests.utils.utils import random_lower_string
+
+
+def test_sales_summary_excludes_unpaid_debt_sales(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    product = create_random_product(db, created_by=user)
+    sale_date = datetime(2021, 3, 15, 10, 0, tzinfo=timezone.utc)
+    cash = get_payment_method(db, "POS Cash Acc")
+    mpesa = get_payment_method(db, "POS Mpesa")
+
+    create_sale(db, product=product, cashier=user, quantity=2, sale_date=sale_date)
+    create_sale(
+        db,
+        product=product,
+        cashier=user,
+        quantity=1,
+        sale_date=sale_date,
+        payment_method=mpesa,
+    )
+    credit_sale = create_sale(
+        db, product=product, cashier=user, quantity=5, sale_date=sale_date
+    )
+    create_unpaid_debt(db, sale=credit_sale, cashier=user)
+    # Outside of the requested range
+    create_sale(
+        db,
+        product=product,
+        cashier=user,
+        quantity=1,
+        sale_date=datetime(2021, 4, 1, 10, 0, tzinfo=timezone.utc),
+    )
+
+    r = client.get(
+        f"{settings.API_V1_STR}/analytics/sales-summary",
+        headers=headers,
+        params={"start_date": "2021-03-01", "end_date": "2021-03-31"},
+    )
+    assert r.status_code == 200
+    summary = r.json()
+    assert summary["total_sales"] == 2
+    assert summary["total_items"] == 3
+    assert summary["total_amount"] == float(product.selling_price * 3)
+    assert summary["average_sale"] == float(product.selling_price * 3) / 2
+    breakdown = {
+        row["payment_method"]: (row["count"], row["amount"])
+        for row in summary["payment_method_breakdown"]
+    }
+    assert breakdown == {
+        cash.name: (1, float(product.selling_price * 2)),
+        mpesa.name: (1, float(product.selling_price)),
+    }
+    assert summary["cashier_breakdown"] == [
+        {
+            "cashier_name": user.full_name,
+            "count": 2,
+            "amount": float(product.selling_price * Decimal(3)),
+        }
+    ]
+
+
+def test_sales_summary_empty_range(
+    client: TestClient, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    r = client.get(
+        f"{settings.API_V1_STR}/analytics/sales-summary",
+        headers=headers,
+        params={"start_date": "1999-01-01", "end_date": "1999-01-31"},
+    )
+    assert r.status_code == 200
+    summary = r.json()
+    assert summary["total_sales"] == 0
+    assert summary["total_amount"] == 0.0
+    assert summary["average_sale"] == 0.0
+    assert summary["payment_method_breakdown"] == []
+    assert summary["cashier_breakdown"] == []
+
+
+def test_dashboard_stats_windows(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    url = f"{settings.API_V1_STR}/analytics/dashboard-stats"
+    before = client.get(url, headers=headers).json()
+
+    product = create_random_product(db, created_by=user)
+    create_sale(db, product=product, cashier=user, quantity=2)
+    credit_sale = create_sale(db, product=product, cashier=user, quantity=4)
+    create_unpaid_debt(db, sale=credit_sale, cashier=user)
+
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200
+    after = r.json()
+    amount = float(product.selling_price * 2)
+    assert after["today_revenue"] == before["today_revenue"] + amount
+    assert after["current_month_revenue"] == before["current_month_revenue"] + amount
+    assert after["previous_month_revenue"] == before["previous_month_revenue"]
+    assert after["unpaid_debts_count"] == before["unpaid_debts_count"] + 1
+    assert after["unpaid_debts_total"] == before["unpaid_debts_total"] + float(
+        product.selling_price * 4
+    )
+
+
+def test_voided_sale_leaves_rollup(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    product = create_random_product(db, created_by=user)
+    sale_date = datetime(2020, 7, 10, 9, 0, tzinfo=timezone.utc)
+    create_sale(db, product=product, cashier=user, quantity=1, sale_date=sale_date)
+    voided = create_sale(
+        db, product=product, cashier=user, quantity=3, sale_date=sale_date
+    )
+    apply_sale_to_rollup(db, voided.id, sign=-1)
+    voided.voided = True
+    db.add(voided)
+    db.commit()
+
+    r = client.get(
+        f"{settings.API_V1_STR}/analytics/sales-summary",
+        headers=headers,
+        params={"start_date": "2020-07-10", "end_date": "2020-07-10"},
+    )
+    assert r.status_code == 200
+    summary = r.json()
+    assert summary["total_sales"] == 1
+    assert summary["total_items"] == 1
+    assert check_sales_rollup(db, date(2020, 7, 10), date(2020, 7, 10)) == []
+
+
+def test_void_after_recategorizing_leaves_the_booked_row(
+    db: Session, cashier: tuple[User, str]
+) -> None:
+    user, _ = cashier
+    product = create_random_product(db, created_by=user)
+    booked_category_id = product.category_id
+    day = date(2020, 8, 3)
+    sale_date = datetime(2020, 8, 3, 9, 0, tzinfo=timezone.utc)
+    create_sale(db, product=product, cashier=user, quantity=1, sale_date=sale_date)
+    voided = create_sale(
+        db, product=product, cashier=user, quantity=2, sale_date=sale_date
+    )
+    assert voided.category_id == booked_category_id
+
+    category = ProductCategory(name=f"Recategorized {random_lower_string()[:12]}")
+    db.add(category)
+    db.flush()
+    product.category_id = category.id
+    db.add(product)
+    db.commit()
+    try:
+        apply_sale_to_rollup(db, voided.id, sign=-1)
+        voided.voided = True
+        db.add(voided)
+        db.commit()
+
+        rows = db.exec(
+            select(SalesDailyRollup).where(
+                SalesDailyRollup.business_date == day,
+                SalesDailyRollup.cashier_id == user.id,
+            )
+        ).all()
+        assert [(row.category_id, row.sale_count, row.item_count) for row in rows] == [
+            (booked_category_id, 1, 1)
+        ]
+        assert check_sales_rollup(db, day, day) == []
+    finally:
+        db.rollback()
+        product.category_id = booked_category_id
+        db.add(product)
+        db.commit()
+        db.execute(delete(ProductCategory).where(ProductCategory.id == category.id))  # type: ignore[arg-type]
+        db.commit()
+
+
+def test_rollup_check_and_rebuild(db: Session, cashier: tuple[User, str]) -> None:
+    user, _ = cashier
+    product = create_random_product(db, created_by=user)
+    day = date(2019, 6, 1)
+    create_sale(
+        db,
+        product=product,
+        cashier=user,
+        quantity=2,
+        sale_date=datetime(2019, 6, 1, 12, 0, tzinfo=timezone.utc),
+    )
+    # A sale written without touching the rollup
+    sale = Sale(
+        product_id=product.id,
+        quantity=1,
+        unit_price=product.selling_price,
+        total_amount=product.selling_price,
+        payment_method_id=get_payment_method(db).id,
+        created_by_id=user.id,
+        sale_date=datetime(2019, 6, 1, 13, 0, tzinfo=timezone.utc),
+    )
+    db.add(sale)
+    db.commit()
+
+    discrepancies = check_sales_rollup(db, day, day)
+    assert len(discrepancies) == 1
+    assert discrepancies[0]["expected_sale_count"] == 2
+    assert discrepancies[0]["rollup_sale_count"] == 1
+
+    assert rebuild_sales_rollup(db, day, day) == 1
+    assert check_sales_rollup(db, day, day) == []
+
+
+def test_sales_summary_cache_hit_and_invalidation(
+    client: TestClient,
+    db: Session,
+    cashier: tuple[User, str],
+    superuser_token_headers: dict[str, str],
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    product = create_random_product(db, created_by=user)
+    sale_date = datetime(2018, 2, 5, 10, 0, tzinfo=timezone.utc)
+    create_sale(db, product=product, cashier=user, sale_date=sale_date)
+    url = f"{settings.API_V1_STR}/analytics/sales-summary"
+    params = {"start_date": "2018-02-05", "end_date": "2018-02-05"}
+
+    def route_stats() -> dict[str, int]:
+        r = client.get(
+            f"{settings.API_V1_STR}/utils/cache-stats/",
+            headers=superuser_token_headers,
+        )
+        assert r.status_code == 200
+        for row in r.json()["data"]:
+            if row["route"] == "analytics/sales-summary":
+                return row
+        return {"hits": 0, "misses": 0}
+
+    before = route_stats()
+    first = client.get(url, headers=headers, params=params).json()
+    second = client.get(url, headers=headers, params=params).json()
+    assert first == second
+    assert first["total_sales"] == 1
+    after = route_stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+
+    # A new sale bumps the sale table version and invalidates the entry
+    create_sale(db, product=product, cashier=user, sale_date=sale_date)
+    third = client.get(url, headers=headers, params=params).json()
+    assert third["total_sales"] == 2
+    assert route_stats()["misses"] == before["misses"] + 2
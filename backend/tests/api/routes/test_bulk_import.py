@@ -0,0 +1,132 @@
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, delete, func, select
+
+from app.core.config import settings
+from app.models import (
+    BulkImportRow,
+    BulkImportSession,
+    Product,
+    ProductCategory,
+    ProductStatus,
+)
+from tests.utils.utils import random_lower_string
+
+
+def test_import_steps_read_staged_rows(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    url = f"{settings.API_V1_STR}/products/bulk"
+    prefix = f"Bulk {random_lower_string()[:12]}"
+    content = (
+        "Product Name,Selling Price,Buying Price,Stock\n"
+        f"{prefix} A,10,5,5\n"
+        f"{prefix} B,abc,,5\n"
+        f"{prefix} C,12.50,6,\n"
+    ).encode()
+    category = db.exec(select(ProductCategory)).first()
+    status = db.exec(select(ProductStatus).where(ProductStatus.name == "Active")).one()
+    assert category
+
+    r = client.post(
+        f"{url}/upload",
+        headers=superuser_token_headers,
+        files={"file": ("products.csv", content, "text/csv")},
+    )
+    assert r.status_code == 200
+    session_id = r.json()["id"]
+    product_ids: list[uuid.UUID] = []
+    try:
+        # Rows live in the database, not in the worker that took the upload
+        staged = db.exec(
+            select(func.count())
+            .select_from(BulkImportRow)
+            .where(BulkImportRow.session_id == uuid.UUID(session_id))
+        ).one()
+        assert staged == 3
+
+        r = client.post(
+            f"{url}/map-columns",
+            headers=superuser_token_headers,
+            json={
+                "session_id": session_id,
+                "column_mapping": {
+                    "Product Name": "name",
+                    "Selling Price": "selling_price",
+                    "Buying Price": "buying_price",
+                    "Stock": "current_stock",
+                },
+                "default_category_id": str(category.id),
+                "default_status_id": str(status.id),
+            },
+        )
+        assert r.status_code == 200
+        data = r.json()
+        assert (data["valid_rows"], data["error_rows"]) == (2, 1)
+        assert [row["row_number"] for row in data["preview_rows"]] == [1, 2, 3]
+
+        r = client.get(
+            f"{url}/validate/{session_id}",
+            headers=superuser_token_headers,
+            params={"filter": "errors"},
+        )
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total_count"] == 1
+        assert data["rows"][0]["row_number"] == 2
+
+        r = client.patch(
+            f"{url}/fix-row/{session_id}",
+            headers=superuser_token_headers,
+            json={
+                "session_id": session_id,
+                "row_number": 2,
+                "updated_data": {
+                    "name": f"{prefix} B",
+                    "selling_price": "11",
+                    "buying_price": "5",
+                },
+            },
+        )
+        assert r.status_code == 200
+        assert r.json()["row"]["status"] == "valid"
+
+        r = client.get(
+            f"{url}/validate/{session_id}",
+            headers=superuser_token_headers,
+            params={"skip": 1, "limit": 1},
+        )
+        data = r.json()
+        assert (data["total_count"], data["valid_count"]) == (3, 3)
+        assert data["rows"][0]["mapped_data"]["selling_price"] == "11"
+
+        r = client.post(
+            f"{url}/import/{session_id}",
+            headers=superuser_token_headers,
+            json={"session_id": session_id},
+        )
+        assert r.status_code == 200
+        data = r.json()
+        product_ids = [
+            uuid.UUID(product_id) for product_id in data["imported_product_ids"]
+        ]
+        assert data["success_count"] == 3
+        assert data["errors"] == []
+    finally:
+        db.rollback()
+        if product_ids:
+            db.execute(delete(Product).where(Product.id.in_(product_ids)))  # type: ignore[attr-defined]
+        db.execute(
+            delete(BulkImportSession).where(
+                BulkImportSession.id == uuid.UUID(session_id)  # type: ignore[arg-type]
+            )
+        )
+        db.commit()
@@ -0,0 +1,512 @@
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session, col, func, select
+
+from app.api.utils import pagination
+from app.core.config import settings
+from app.models import Debt, Sale, SalePayment, TillShift, User
+from tests.utils.sale import (
+    create_random_product,
+    create_sale,
+    get_payment_method,
+    open_till_shift,
+)
+from tests.utils.user import user_authentication_headers
+from tests.utils.utils import random_lower_string
+
+
+def test_read_sales_cursor_pages_match_offset_pages(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    product = create_random_product(db, created_by=user)
+    base = datetime(2022, 5, 1, 8, 0, tzinfo=timezone.utc)
+    # Two sales share a timestamp so the id tie-breaker is exercised
+    for offset in [0, 1, 1, 2, 3]:
+        create_sale(
+            db, product=product, cashier=user, sale_date=base + timedelta(hours=offset)
+        )
+    url = f"{settings.API_V1_STR}/sales"
+    params = {"start_date": "2022-05-01", "end_date": "2022-05-01", "limit": 2}
+
+    offset_ids = []
+    for skip in (0, 2, 4):
+        r = client.get(url, headers=headers, params={**params, "skip": skip})
+        assert r.status_code == 200
+        offset_ids += [sale["id"] for sale in r.json()["data"]]
+
+    cursor_ids = []
+    cursor = None
+    while True:
+        r = client.get(
+            url,
+            headers=headers,
+            params={**params, **({"cursor": cursor} if cursor else {})},
+        )
+        assert r.status_code == 200
+        page = r.json()
+        assert page["count"] == 5
+        cursor_ids += [sale["id"] for sale in page["data"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(cursor_ids) == 5
+    assert cursor_ids == offset_ids
+
+
+def test_read_sales_invalid_cursor(
+    client: TestClient, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    r = client.get(
+        f"{settings.API_V1_STR}/sales",
+        headers=headers,
+        params={"cursor": "bm90LWpzb24"},
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+
+def test_read_sales_count_modes(
+    client: TestClient,
+    db: Session,
+    cashier: tuple[User, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    product = create_random_product(db, created_by=user)
+    base = datetime(2022, 6, 1, 8, 0, tzinfo=timezone.utc)
+    for offset in range(3):
+        create_sale(
+            db, product=product, cashier=user, sale_date=base + timedelta(hours=offset)
+        )
+    url = f"{settings.API_V1_STR}/sales"
+    params = {"start_date": "2022-06-01", "end_date": "2022-06-01", "limit": 1}
+
+    r = client.get(url, headers=headers, params={**params, "count_mode": "none"})
+    assert r.status_code == 200
+    assert r.json()["count"] is None
+    assert r.json()["count_mode"] == "none"
+    assert len(r.json()["data"]) == 1
+
+    # Under the cap an estimate is just an exact count
+    r = client.get(url, headers=headers, params={**params, "count_mode": "estimated"})
+    assert r.json()["count"] == 3
+    assert r.json()["count_mode"] == "exact"
+
+    monkeypatch.setattr(pagination, "ESTIMATE_EXACT_UP_TO", 2)
+    r = client.get(url, headers=headers, params={**params, "count_mode": "estimated"})
+    assert r.json()["count_mode"] == "estimated"
+    assert r.json()["count"] >= 3
+
+    r = client.get(url, headers=headers, params={**params, "count_mode": "bogus"})
+    assert r.status_code == 422
+
+
+def test_receipt_numbers_lookup_and_search(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    product = create_random_product(db, created_by=user)
+    base = datetime(2022, 7, 1, 8, 0, tzinfo=timezone.utc)
+    sales = [
+        create_sale(
+            db, product=product, cashier=user, sale_date=base + timedelta(hours=offset)
+        )
+        for offset in range(3)
+    ]
+    numbers = [sale.receipt_number for sale in sales]
+    assert all(number is not None for number in numbers)
+    assert numbers == sorted(numbers)
+    assert len(set(numbers)) == 3
+
+    oldest = sales[0]
+    r = client.get(
+        f"{settings.API_V1_STR}/sales/by-receipt/{oldest.receipt_number}",
+        headers=headers,
+    )
+    assert r.status_code == 200
+    assert r.json()["id"] == str(oldest.id)
+    assert r.json()["receipt_number"] == oldest.receipt_number
+
+    # The oldest sale sits past the first page but search still finds it
+    r = client.get(
+        f"{settings.API_V1_STR}/sales",
+        headers=headers,
+        params={"search": f"#{oldest.receipt_number}", "limit": 1},
+    )
+    assert r.status_code == 200
+    assert [sale["id"] for sale in r.json()["data"]] == [str(oldest.id)]
+    assert r.json()["count"] == 1
+
+    r = client.get(f"{settings.API_V1_STR}/sales/by-receipt/0", headers=headers)
+    assert r.status_code == 404
+
+
+def test_receipt_search_uses_receipt_number_index(db: Session) -> None:
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(
+        row[0]
+        for row in db.execute(
+            text("EXPLAIN SELECT * FROM sale WHERE receipt_number = 42")
+        ).all()
+    )
+    db.rollback()
+    assert "ix_sale_receipt_number" in plan
+
+
+def test_search_products_ranks_prefix_matches_first(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    token = random_lower_string()[:10]
+    names = [f"zz{token} substring", f"zz {token} word", f"{token} prefix"]
+    for name in names:
+        create_random_product(db, created_by=user, name=name)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/sales/search-products",
+        headers=headers,
+        params={"q": token.upper()},
+    )
+    assert r.status_code == 200
+    assert [product["name"] for product in r.json()] == names[::-1]
+
+    # LIKE wildcards in the query are matched literally
+    r = client.get(
+        f"{settings.API_V1_STR}/sales/search-products",
+        headers=headers,
+        params={"q": f"{token}%prefix"},
+    )
+    assert r.json() == []
+
+
+def test_blank_product_search_is_not_a_match_all(
+    client: TestClient, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    for url in ("/sales/search-products", "/stock-entries/search-products"):
+        r = client.get(
+            f"{settings.API_V1_STR}{url}", headers=headers, params={"q": "   "}
+        )
+        assert r.status_code == 422
+
+    # The product list treats a blank name as no filter
+    url = f"{settings.API_V1_STR}/products/"
+    r = client.get(url, headers=headers, params={"name": "  ", "limit": 1})
+    assert r.status_code == 200
+    assert r.json()["count"] == client.get(url, headers=headers).json()["count"]
+
+
+def test_checkout_cart_creates_all_lines_in_one_transaction(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    shift = open_till_shift(db, opened_by=user)
+    headers["X-Register"] = shift.register
+    first = create_random_product(db, created_by=user, current_stock=5)
+    second = create_random_product(db, created_by=user, current_stock=3)
+    cash = get_payment_method(db)
+    mpesa = get_payment_method(db, "POS Mpesa")
+    lines = [
+        {"product_id": str(second.id), "quantity": 2, "unit_price": 100},
+        {"product_id": str(first.id), "quantity": 1, "unit_price": 100},
+        {"product_id": str(second.id), "quantity": 1, "unit_price": 100},
+    ]
+    payments = [
+        {"payment_method_id": str(cash.id), "amount": 350},
+        {"payment_method_id": str(mpesa.id), "amount": 100, "reference_number": "QX1"},
+    ]
+    url = f"{settings.API_V1_STR}/sales/checkout"
+
+    # Stock is checked per product across lines: 5 of `second` > 3 available
+    r = client.post(
+        url,
+        headers=headers,
+        json={
+            "lines": [*lines, lines[0]],
+            "payments": [{"payment_method_id": str(cash.id), "amount": 600}],
+        },
+    )
+    assert r.status_code == 400
+    assert "Insufficient stock" in r.json()["detail"]
+
+    r = client.post(url, headers=headers, json={"lines": lines, "payments": payments})
+    assert r.status_code == 200
+    receipt = r.json()
+    assert Decimal(receipt["total_amount"]) == 400
+    assert Decimal(receipt["amount_paid"]) == 450
+    assert Decimal(receipt["change"]) == 50
+    assert Decimal(receipt["debt_amount"]) == 0
+    assert [line["product"]["id"] for line in receipt["lines"]] == [
+        line["product_id"] for line in lines
+    ]
+    assert {line["checkout_id"] for line in receipt["lines"]} == {
+        receipt["checkout_id"]
+    }
+    assert receipt["receipt_number"] == receipt["lines"][0]["receipt_number"]
+
+    # Each tendered amount is split across the lines without losing cents
+    sale_ids = [line["id"] for line in receipt["lines"]]
+    paid: dict[str, Decimal] = {}
+    for sale_id in sale_ids:
+        for payment in db.exec(
+            select(SalePayment).where(SalePayment.sale_id == sale_id)
+        ).all():
+            key = str(payment.payment_method_id)
+            paid[key] = paid.get(key, Decimal(0)) + payment.amount
+    assert paid == {str(cash.id): Decimal("350"), str(mpesa.id): Decimal("100")}
+
+    db.refresh(first)
+    db.refresh(second)
+    assert (first.current_stock, second.current_stock) == (4, 0)
+
+
+def test_checkout_validates_line_totals(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    shift = open_till_shift(db, opened_by=user)
+    headers["X-Register"] = shift.register
+    product = create_random_product(db, created_by=user, current_stock=5)
+    payments = [{"payment_method_id": str(get_payment_method(db).id), "amount": 100}]
+    url = f"{settings.API_V1_STR}/sales/checkout"
+
+    # Line totals follow the same rules as single sales
+    for total_amount in (-100, 0, 150):
+        line = {
+            "product_id": str(product.id),
+            "quantity": 1,
+            "unit_price": 100,
+            "total_amount": total_amount,
+        }
+        r = client.post(
+            url, headers=headers, json={"lines": [line], "payments": payments}
+        )
+        assert r.status_code == 422
+
+    db.refresh(product)
+    assert product.current_stock == 5
+
+
+def test_checkout_cart_on_credit_creates_line_debts(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    shift = open_till_shift(db, opened_by=user)
+    headers["X-Register"] = shift.register
+    products = [create_random_product(db, created_by=user) for _ in range(3)]
+    cash = get_payment_method(db)
+
+    r = client.post(
+        f"{settings.API_V1_STR}/sales/checkout",
+        headers=headers,
+        json={
+            "lines": [
+                {"product_id": str(product.id), "quantity": 1, "unit_price": 100}
+                for product in products
+            ],
+            "customer_name": "Basket Customer",
+            "payments": [{"payment_method_id": str(cash.id), "amount": 100}],
+        },
+    )
+    assert r.status_code == 200
+    receipt = r.json()
+    assert Decimal(receipt["debt_amount"]) == 200
+    debts = db.exec(
+        select(Debt).where(
+            col(Debt.sale_id).in_([line["id"] for line in receipt["lines"]])
+        )
+    ).all()
+    assert sum(debt.balance for debt in debts) == Decimal("200")
+
+
+def test_concurrent_sales_of_one_product_never_oversell(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    shift = open_till_shift(db, opened_by=user)
+    headers["X-Register"] = shift.register
+    product = create_random_product(db, created_by=user, current_stock=20)
+    cash = get_payment_method(db)
+    sale = {
+        "product_id": str(product.id),
+        "quantity": 1,
+        "unit_price": 100,
+        "total_amount": 100,
+        "payment_method_id": str(cash.id),
+    }
+
+    def sell(_: int) -> int:
+        r = client.post(f"{settings.API_V1_STR}/sales", headers=headers, json=sale)
+        return r.status_code
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        statuses = list(pool.map(sell, range(30)))
+
+    assert statuses.count(200) == 20
+    assert statuses.count(400) == 10
+    db.refresh(product)
+    assert product.current_stock == 0
+    sold = db.exec(select(func.count()).where(col(Sale.product_id) == product.id)).one()
+    assert sold == 20
+
+
+def test_sync_offline_checkouts_in_order_with_per_item_results(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    product = create_random_product(db, created_by=user, current_stock=3)
+    cash = get_payment_method(db)
+    recorded_at = datetime(2022, 7, 1, 9, 30, tzinfo=timezone.utc)
+
+    def offline_checkout(quantity: int) -> dict[str, Any]:
+        return {
+            "checkout_id": str(uuid.uuid4()),
+            "recorded_at": recorded_at.isoformat(),
+            "lines": [
+                {"product_id": str(product.id), "quantity": quantity, "unit_price": 100}
+            ],
+            "payments": [{"payment_method_id": str(cash.id), "amount": 100 * quantity}],
+        }
+
+    first, second, third = offline_checkout(2), offline_checkout(2), offline_checkout(1)
+    url = f"{settings.API_V1_STR}/sales/sync"
+
+    # Applied in order, so the second checkout no longer fits in stock
+    r = client.post(url, headers=headers, json={"checkouts": [first, second, third]})
+    assert r.status_code == 200
+    body = r.json()
+    assert [result["status"] for result in body["results"]] == [
+        "accepted",
+        "rejected",
+        "accepted",
+    ]
+    assert "Insufficient stock" in body["results"][1]["detail"]
+    assert (body["accepted"], body["duplicates"], body["rejected"]) == (2, 0, 1)
+
+    # Resending is idempotent
+    r = client.post(url, headers=headers, json={"checkouts": [first, third]})
+    assert [result["status"] for result in r.json()["results"]] == [
+        "duplicate",
+        "duplicate",
+    ]
+    assert (
+        r.json()["results"][0]["receipt_number"]
+        == (body["results"][0]["receipt_number"])
+    )
+
+    db.refresh(product)
+    assert product.current_stock == 0
+    sales = db.exec(select(Sale).where(col(Sale.product_id) == product.id)).all()
+    assert len(sales) == 2
+    assert {sale.sale_date.replace(tzinfo=timezone.utc) for sale in sales} == {
+        recorded_at
+    }
+
+
+def test_sync_rejects_shifts_the_sale_cannot_belong_to(
+    client: TestClient,
+    db: Session,
+    cashier: tuple[User, str],
+    make_cashier: Callable[..., tuple[User, str]],
+) -> None:
+    user, password = cashier
+    register = f"test-{random_lower_string()[:12]}"
+    headers = {
+        **user_authentication_headers(
+            client=client, email=user.email, password=password
+        ),
+        "X-Register": register,
+    }
+    other, _ = make_cashier()
+    product = create_random_product(db, created_by=user, current_stock=10)
+    cash = get_payment_method(db)
+
+    def past_shift(opened_by: User, status: str, on: str | None) -> TillShift:
+        shift = open_till_shift(db, opened_by=opened_by, register=on)
+        shift.status = status
+        db.add(shift)
+        db.commit()
+        return shift
+
+    own = past_shift(user, "closed", register)
+    other_register = past_shift(user, "closed", None)
+    others = past_shift(other, "closed", register)
+    reconciled = past_shift(user, "reconciled", register)
+
+    def offline_checkout(till_shift_id: uuid.UUID) -> dict[str, Any]:
+        return {
+            "checkout_id": str(uuid.uuid4()),
+            "recorded_at": "2022-07-02T09:30:00+00:00",
+            "till_shift_id": str(till_shift_id),
+            "lines": [
+                {"product_id": str(product.id), "quantity": 1, "unit_price": 100}
+            ],
+            "payments": [{"payment_method_id": str(cash.id), "amount": 100}],
+        }
+
+    shifts = [own, other_register, others, reconciled]
+    r = client.post(
+        f"{settings.API_V1_STR}/sales/sync",
+        headers=headers,
+        json={"checkouts": [offline_checkout(shift.id) for shift in shifts]},
+    )
+    assert r.status_code == 200
+    results = r.json()["results"]
+    # A closed, unreconciled shift of one's own still takes late sales
+    assert [result["status"] for result in results] == [
+        "accepted",
+        "rejected",
+        "rejected",
+        "rejected",
+    ]
+    assert [result.get("detail") for result in results[1:]] == [
+        "Till shift belongs to another register",
+        "Till shift belongs to another cashier",
+        "Till shift is already reconciled",
+    ]
+    db.refresh(reconciled)
+    assert reconciled.sale_count == 0
@@ -0,0 +1,183 @@
+from collections.abc import Callable
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.api.utils.response_cache import get_table_versions
+from app.api.utils.shift_totals import check_shift_totals, rebuild_shift_totals
+from app.core.config import settings
+from app.models import User
+from tests.utils.sale import (
+    create_random_product,
+    get_payment_method,
+    open_till_shift,
+)
+from tests.utils.user import user_authentication_headers
+from tests.utils.utils import random_lower_string
+
+
+@pytest.fixture(scope="module")
+def cashiers(
+    make_cashier: Callable[..., tuple[User, str]],
+) -> list[tuple[User, str]]:
+    return [make_cashier("Till Cashier A"), make_cashier("Till Cashier B")]
+
+
+def test_registers_hold_concurrent_shifts(
+    client: TestClient, db: Session, cashiers: list[tuple[User, str]]
+) -> None:
+    registers = [f"till-{random_lower_string()[:8]}" for _ in cashiers]
+    headers = [
+        {
+            **user_authentication_headers(
+                client=client, email=user.email, password=password
+            ),
+            "X-Register": register,
+        }
+        for (user, password), register in zip(cashiers, registers, strict=True)
+    ]
+    url = f"{settings.API_V1_STR}/till"
+
+    shift_ids = []
+    for register_headers in headers:
+        r = client.post(
+            f"{url}/open",
+            headers=register_headers,
+            json={"shift_type": "day", "opening_cash_float": 0},
+        )
+        assert r.status_code == 200
+        assert r.json()["register"] == register_headers["X-Register"]
+        shift_ids.append(r.json()["id"])
+
+    # A second shift on the same register is refused
+    r = client.post(
+        f"{url}/open",
+        headers=headers[0],
+        json={"shift_type": "day", "opening_cash_float": 0},
+    )
+    assert r.status_code == 400
+
+    # Sales are stamped with the shift of the register they were rung up on
+    user, _ = cashiers[0]
+    product = create_random_product(db, created_by=user)
+    cash = get_payment_method(db)
+    r = client.post(
+        f"{settings.API_V1_STR}/sales",
+        headers=headers[0],
+        json={
+            "product_id": str(product.id),
+            "quantity": 2,
+            "unit_price": 100,
+            "total_amount": 200,
+            "payment_method_id": str(cash.id),
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["till_shift_id"] == shift_ids[0]
+
+    totals = []
+    for register_headers in headers:
+        r = client.get(f"{url}/system-counts", headers=register_headers)
+        assert r.status_code == 200
+        counts = {
+            method["payment_method_name"]: Decimal(str(method["system_count"]))
+            for method in r.json()["payment_methods"]
+        }
+        totals.append(counts["POS Cash Acc"])
+    assert totals == [Decimal("200"), Decimal("0")]
+
+
+def test_shift_totals_follow_sales_and_voids(
+    client: TestClient, db: Session, cashiers: list[tuple[User, str]]
+) -> None:
+    user, password = cashiers[1]
+    shift = open_till_shift(db, opened_by=user)
+    headers = {
+        **user_authentication_headers(
+            client=client, email=user.email, password=password
+        ),
+        "X-Register": shift.register,
+    }
+    product = create_random_product(db, created_by=user)
+    cash = get_payment_method(db)
+    mpesa = get_payment_method(db, "POS Mpesa")
+    version = get_table_versions(db, ["till_shift"])["till_shift"]
+
+    r = client.post(
+        f"{settings.API_V1_STR}/sales/multi-payment",
+        headers=headers,
+        json={
+            "product_id": str(product.id),
+            "quantity": 2,
+            "unit_price": 100,
+            "total_amount": 200,
+            "payments": [
+                {"payment_method_id": str(cash.id), "amount": 120},
+                {"payment_method_id": str(mpesa.id), "amount": 80},
+            ],
+        },
+    )
+    assert r.status_code == 200
+    r = client.post(
+        f"{settings.API_V1_STR}/sales",
+        headers=headers,
+        json={
+            "product_id": str(product.id),
+            "quantity": 1,
+            "unit_price": 100,
+            "total_amount": 100,
+            "payment_method_id": str(cash.id),
+        },
+    )
+    assert r.status_code == 200
+    r = client.post(
+        f"{settings.API_V1_STR}/sales/{r.json()['id']}/void",
+        headers=headers,
+        params={"reason": "Rung up twice"},
+    )
+    assert r.status_code == 200
+
+    r = client.get(f"{settings.API_V1_STR}/till/system-counts", headers=headers)
+    assert r.status_code == 200
+    counts = {
+        method["payment_method_name"]: Decimal(str(method["system_count"]))
+        for method in r.json()["payment_methods"]
+    }
+    assert counts["POS Cash Acc"] == Decimal("120")
+    assert counts["POS Mpesa"] == Decimal("80")
+
+    db.refresh(shift)
+    assert (shift.sale_count, shift.item_count) == (1, 2)
+    assert shift.total_sales == Decimal("200")
+    # Sales don't cost /till/status its 304: nothing ETag'd reads the totals
+    assert get_table_versions(db, ["till_shift"])["till_shift"] == version
+
+    assert check_shift_totals(db, [shift.id]) == []
+    db.execute(
+        text("UPDATE till_shift SET sale_count = 5 WHERE id = :id"),
+        {"id": shift.id},
+    )
+    db.commit()
+    assert [m["field"] for m in check_shift_totals(db, [shift.id])] == ["sale_count"]
+    assert rebuild_shift_totals(db, [shift.id]) == 1
+    assert check_shift_totals(db, [shift.id]) == []
+    db.refresh(shift)
+    assert shift.sale_count == 1
+
+
+def test_open_shift_lookup_uses_partial_register_index(db: Session) -> None:
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(
+        row[0]
+        for row in db.execute(
+            text(
+                "EXPLAIN SELECT * FROM till_shift "
+                "WHERE register = 'main' AND status = 'open'"
+            )
+        ).all()
+    )
+    db.rollback()
+    assert "ix_till_shift_open_register" in plan
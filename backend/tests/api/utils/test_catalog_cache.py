@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlmodel import Session
+
+from app.api.utils.catalog_cache import catalog_cache
+from app.core.config import settings
+from app.core.db import engine
+from app.models import Product, User
+from tests.utils.sale import create_random_product
+from tests.utils.user import user_authentication_headers
+from tests.utils.utils import random_lower_string, wait_for
+
+
+@pytest.fixture(scope="module", autouse=True)
+def listening(client: TestClient) -> None:
+    # The client fixture runs the app lifespan, which starts the listener
+    assert wait_for(lambda: catalog_cache.listening)
+
+
+def test_commit_in_another_session_evicts_entry(
+    db: Session, cashier: tuple[User, str]
+) -> None:
+    user, _ = cashier
+    product = create_random_product(db, created_by=user)
+    hits = catalog_cache.hits
+
+    assert catalog_cache.get_many(db, [product.id])[product.id].name == product.name
+    assert catalog_cache.get_many(db, [product.id])[product.id].name == product.name
+    assert catalog_cache.hits == hits + 1
+
+    new_name = f"Renamed {random_lower_string()}"
+    with Session(engine) as other:
+        other_product = other.get(Product, product.id)
+        assert other_product
+        other_product.name = new_name
+        other.add(other_product)
+        other.commit()
+
+    assert wait_for(
+        lambda: catalog_cache.get_many(db, [product.id])[product.id].name == new_name
+    )
+
+
+def test_search_serves_live_stock_from_database(
+    client: TestClient, db: Session, cashier: tuple[User, str]
+) -> None:
+    user, password = cashier
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    product = create_random_product(
+        db, created_by=user, current_stock=10, name=f"Catalog {random_lower_string()}"
+    )
+    url = f"{settings.API_V1_STR}/sales/search-products"
+
+    r = client.get(url, headers=headers, params={"q": product.name})
+    assert [item["current_stock"] for item in r.json()] == [10]
+
+    # A core UPDATE bypasses the ORM hook, so the cached entry survives...
+    db.execute(
+        update(Product).where(Product.id == product.id).values(current_stock=3)  # type: ignore[arg-type]
+    )
+    db.commit()
+    invalidations = catalog_cache.invalidations
+    time.sleep(0.2)
+    assert catalog_cache.invalidations == invalidations
+
+    # ...but stock is still read from the database on every search
+    r = client.get(url, headers=headers, params={"q": product.name})
+    assert [item["current_stock"] for item in r.json()] == [3]
+    assert r.json()[0]["name"] == product.name
@@ -0,0 +1,101 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.api.routes.events import live_event_stream
+from app.api.utils.live_events import live_events
+from app.models import User
+from tests.utils.sale import create_random_product, create_sale
+from tests.utils.utils import wait_for
+
+
+@pytest.fixture(scope="module")
+def cashier(client: TestClient, make_cashier: Callable[..., tuple[User, str]]) -> User:
+    # The client fixture runs the app lifespan, which starts the listener
+    assert wait_for(lambda: live_events.listening)
+    user, _ = make_cashier("Live Events Cashier")
+    return user
+
+
+def parse(message: str) -> dict[str, Any]:
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return {
+        "id": int(fields["id"]) if "id" in fields else None,
+        "event": fields.get("event"),
+        "data": json.loads(fields["data"]) if "data" in fields else None,
+    }
+
+
+async def next_message(stream: AsyncIterator[str]) -> dict[str, Any]:
+    return parse(await asyncio.wait_for(stream.__anext__(), timeout=5))
+
+
+def test_stream_pushes_state_sales_and_notifications(
+    db: Session, cashier: User
+) -> None:
+    product = create_random_product(db, created_by=cashier)
+    request = Request({"type": "http", "headers": []})
+
+    async def scenario() -> None:
+        stream = live_event_stream(request, cashier.id, "main")
+        assert (await stream.__anext__()).startswith("retry:")
+        assert (await next_message(stream))["event"] == "till"
+        assert (await next_message(stream))["data"] == {"unread_count": 0}
+
+        await asyncio.to_thread(create_sale, db, product=product, cashier=cashier)
+        message = await next_message(stream)
+        assert message["event"] == "sales"
+        assert message["data"] == {"count": 1}
+
+        await asyncio.to_thread(
+            crud.create_notification,
+            session=db,
+            user_id=cashier.id,
+            notification_type="reorder_alert",
+            title="Low stock",
+            message="Restock soon",
+        )
+        message = await next_message(stream)
+        assert message["event"] == "notifications"
+        assert message["data"] == {"unread_count": 1}
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_stream_resumes_from_last_event_id(db: Session, cashier: User) -> None:
+    product = create_random_product(db, created_by=cashier)
+    request = Request({"type": "http", "headers": []})
+
+    async def scenario() -> None:
+        stream = live_event_stream(request, cashier.id, "main")
+        for _ in range(3):
+            await stream.__anext__()
+        ids = []
+        for _ in range(2):
+            await asyncio.to_thread(create_sale, db, product=product, cashier=cashier)
+            ids.append((await next_message(stream))["id"])
+        await stream.aclose()
+
+        # Reconnecting after the first sale replays the second one
+        resumed = live_event_stream(request, cashier.id, "main", ids[0])
+        assert (await resumed.__anext__()).startswith("retry:")
+        message = await next_message(resumed)
+        assert (message["event"], message["id"]) == ("sales", ids[1])
+        await resumed.aclose()
+
+        # An id the worker no longer holds gets a resync and the current state
+        stale = live_event_stream(request, cashier.id, "main", -1)
+        await stale.__anext__()
+        assert (await next_message(stale))["event"] == "resync"
+        assert (await next_message(stale))["event"] == "till"
+        await stale.aclose()
+
+    asyncio.run(scenario())
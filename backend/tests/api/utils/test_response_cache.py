@@ -0,0 +1,185 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, delete, func, select
+
+from app.api.deps import get_read_db
+from app.api.utils import response_cache
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+from app.models import (
+    PaymentMethod,
+    ProductCategory,
+    ResponseCacheEntry,
+    TableVersion,
+    User,
+)
+from tests.utils.utils import random_lower_string
+
+
+def test_unchanged_reference_list_answers_304(client: TestClient, db: Session) -> None:
+    url = f"{settings.API_V1_STR}/products/categories"
+    r = client.get(url)
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert r.headers["cache-control"] == "private, no-cache"
+
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert r.content == b""
+
+    # A different query is a different representation
+    r = client.get(url, params={"skip": 1}, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+    category = ProductCategory(name=f"Category {random_lower_string()[:20]}")
+    db.add(category)
+    db.commit()
+    try:
+        r = client.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+        assert category.name in {item["name"] for item in r.json()["data"]}
+    finally:
+        db.delete(category)
+        db.commit()
+
+
+def test_user_scoped_etags_differ_per_user(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    url = f"{settings.API_V1_STR}/notifications/unread-count"
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+
+    r = client.get(url, headers={**superuser_token_headers, "If-None-Match": etag})
+    assert r.status_code == 304
+
+    r = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+def test_versions_come_from_primary_while_replica_lags(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    url = f"{settings.API_V1_STR}/sales/payment-methods"
+    # A replica that stopped applying changes: one snapshot for every request
+    lagging = Session(engine.execution_options(isolation_level="REPEATABLE READ"))
+    lagging.exec(select(TableVersion)).all()
+
+    def get_lagging_db() -> Generator[Session, None, None]:
+        yield lagging
+
+    app.dependency_overrides[get_read_db] = get_lagging_db
+    method = PaymentMethod(name=f"Method {random_lower_string()[:20]}")
+    try:
+        r = client.get(url, headers=normal_user_token_headers)
+        assert r.status_code == 200
+        etag = r.headers["etag"]
+
+        db.add(method)
+        db.commit()
+        r = client.get(
+            url, headers={**normal_user_token_headers, "If-None-Match": etag}
+        )
+        assert r.status_code == 200
+        assert method.name in {item["name"] for item in r.json()["data"]}
+    finally:
+        app.dependency_overrides.pop(get_read_db)
+        lagging.close()
+        db.delete(method)
+        db.commit()
+
+
+def test_token_is_checked_before_answering_304(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/sales/payment-methods"
+    r = client.get(url, headers=normal_user_token_headers)
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 401
+    r = client.get(
+        url, headers={"Authorization": "Bearer invalid", "If-None-Match": etag}
+    )
+    assert r.status_code == 403
+
+
+def test_cache_hits_are_counted_without_writing(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user = db.exec(select(User).where(User.email == settings.FIRST_SUPERUSER)).one()
+    monkeypatch.setattr(response_cache._hits, "flush_seconds", 3600)
+    route = f"/test/{random_lower_string()}"
+
+    def cached() -> Any:
+        return response_cache.cached_response(
+            db,
+            user,
+            route=route,
+            params={},
+            tables=["product"],
+            compute=lambda: {"answer": 42},
+        )
+
+    assert cached() == {"answer": 42}
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert cached() == {"answer": 42}
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert not any(statement.startswith("UPDATE") for statement in statements)
+
+    stats = response_cache.get_cache_stats(db)
+    assert [(item.hits, item.misses) for item in stats.data if item.route == route] == [
+        (1, 1)
+    ]
+    db.execute(delete(ResponseCacheEntry).where(ResponseCacheEntry.route == route))
+    db.commit()
+
+
+def test_expired_entries_are_deleted(db: Session) -> None:
+    user = db.exec(select(User).where(User.email == settings.FIRST_SUPERUSER)).one()
+    route = f"/test/{random_lower_string()}"
+    for day in ("2024-01-01", "2024-01-02"):
+        response_cache.cached_response(
+            db,
+            user,
+            route=route,
+            params={"day": day},
+            tables=["product"],
+            compute=lambda: {"answer": 42},
+        )
+    # One of the two falls out of its TTL
+    expired = db.exec(
+        select(ResponseCacheEntry).where(ResponseCacheEntry.route == route)
+    ).first()
+    assert expired
+    expired.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.add(expired)
+    db.commit()
+
+    assert response_cache.delete_expired_entries(db) >= 1
+    remaining = db.exec(
+        select(func.count()).where(ResponseCacheEntry.route == route)
+    ).one()
+    assert remaining == 1
+    db.execute(delete(ResponseCacheEntry).where(ResponseCacheEntry.route == route))
+    db.commit()
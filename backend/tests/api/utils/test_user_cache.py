@@ -0,0 +1,72 @@
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app import crud
+from app.api.utils.user_cache import user_cache
+from app.core import security
+from app.core.config import settings
+from app.core.db import engine
+from app.models import User, UserUpdate
+from tests.utils.utils import wait_for
+
+
+@pytest.fixture
+def cached_user(
+    client: TestClient, make_cashier: Callable[..., tuple[User, str]]
+) -> User:
+    # The client fixture runs the app lifespan, which starts the listener
+    assert wait_for(lambda: user_cache.listening)
+    user, _ = make_cashier()
+    return user
+
+
+def auth_headers(user: User) -> dict[str, str]:
+    token = security.create_access_token(user.id, expires_delta=timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_cached_user_is_resolved_without_a_query(
+    client: TestClient, cached_user: User
+) -> None:
+    url = f"{settings.API_V1_STR}/users/me"
+    headers = auth_headers(cached_user)
+    queries: list[str] = []
+
+    def record(*args: Any) -> None:
+        queries.append(args[2])
+
+    assert client.get(url, headers=headers).status_code == 200
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = client.get(url, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert r.status_code == 200
+    assert r.json()["email"] == cached_user.email
+    assert not [query for query in queries if 'FROM "user"' in query]
+
+
+def test_user_changes_are_seen_on_the_next_request(
+    client: TestClient, db: Session, cached_user: User
+) -> None:
+    url = f"{settings.API_V1_STR}/users/me"
+    headers = auth_headers(cached_user)
+    assert client.get(url, headers=headers).status_code == 200
+
+    crud.update_user(
+        session=db, db_user=cached_user, user_in=UserUpdate(full_name="Renamed")
+    )
+    assert client.get(url, headers=headers).json()["full_name"] == "Renamed"
+
+    cached_user.is_active = False
+    db.add(cached_user)
+    db.commit()
+    r = client.get(url, headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Inactive user"
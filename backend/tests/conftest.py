@@ -1,15 +1,21 @@
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, delete
+from sqlmodel import Session, col, delete
 
+from app import crud
 from app.core.config import settings
 from app.core.db import engine, init_db
 from app.main import app
-from app.models import User
+from app.models import Notification, User, UserCreate
+from tests.utils.sale import delete_sales_data
 from tests.utils.user import authentication_token_from_email
-from tests.utils.utils import get_superuser_token_headers
+from tests.utils.utils import (
+    get_superuser_token_headers,
+    random_email,
+    random_lower_string,
+)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -38,3 +44,39 @@ def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture(scope="module")
+def make_cashier(
+    db: Session,
+) -> Generator[Callable[..., tuple[User, str]], None, None]:
+    """
+    Create (user, password) cashiers for the module.
+
+    They are removed with their sales, shifts, products and notifications when
+    the module is done.
+    """
+    users: list[User] = []
+
+    def make(full_name: str = "Test Cashier") -> tuple[User, str]:
+        password = random_lower_string()
+        user = crud.create_user(
+            session=db,
+            user_create=UserCreate(
+                email=random_email(), password=password, full_name=full_name
+            ),
+        )
+        users.append(user)
+        return user, password
+
+    yield make
+    user_ids = [user.id for user in users]
+    delete_sales_data(db, user_ids=user_ids)
+    db.execute(delete(Notification).where(col(Notification.user_id).in_(user_ids)))
+    db.execute(delete(User).where(col(User.id).in_(user_ids)))
+    db.commit()
+
+
+@pytest.fixture(scope="module")
+def cashier(make_cashier: Callable[..., tuple[User, str]]) -> tuple[User, str]:
+    return make_cashier()
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.core import admission
+from app.core.admission import BULK, CRUD, POS, REPORTS, Lane, classify
+from app.core.config import Settings, settings
+
+
+def test_requests_are_classified_by_route() -> None:
+    api = settings.API_V1_STR
+    assert classify("POST", f"{api}/sales") == POS
+    assert classify("GET", f"{api}/sales/recent") == POS
+    assert classify("GET", f"{api}/till/status") == POS
+    assert classify("POST", f"{api}/login/access-token") == POS
+    assert classify("GET", f"{api}/analytics/balance-sheet") == REPORTS
+    assert classify("GET", f"{api}/supplier-debts/aging-report") == REPORTS
+    assert classify("POST", f"{api}/products/bulk/upload") == BULK
+    assert classify("GET", f"{api}/products/") == CRUD
+    assert classify("GET", f"{api}/sales") == CRUD
+    assert classify("GET", f"{api}/salesforce") == CRUD
+    assert classify("GET", f"{api}/events/stream") is None
+    assert classify("OPTIONS", f"{api}/sales/") is None
+    assert classify("GET", "/docs") is None
+
+
+def test_non_pos_lanes_must_leave_pool_connections_for_pos() -> None:
+    with pytest.raises(ValidationError, match="reserved for POS"):
+        Settings(
+            DB_POOL_SIZE=5,
+            DB_MAX_OVERFLOW=10,
+            ADMISSION_POS_RESERVED_CONNECTIONS=4,
+            ADMISSION_CRUD_CONCURRENCY=16,
+        )
+    Settings(
+        DB_POOL_SIZE=20,
+        DB_MAX_OVERFLOW=0,
+        ADMISSION_POS_RESERVED_CONNECTIONS=4,
+        ADMISSION_CRUD_CONCURRENCY=16,
+        ADMISSION_REPORTS_CONCURRENCY=0,
+        ADMISSION_BULK_CONCURRENCY=0,
+    )
+
+
+def test_lane_queues_then_sheds() -> None:
+    async def scenario() -> None:
+        lane = Lane("reports", limit=1, queue_limit=1, queue_timeout=0.2)
+        assert await lane.acquire()
+        queued = asyncio.create_task(lane.acquire())
+        await asyncio.sleep(0)
+        assert lane.waiting == 1
+        # Queue full: shed at once
+        assert not await lane.acquire()
+
+        lane.release()
+        assert await queued
+        assert (lane.active, lane.waiting) == (1, 0)
+
+        # Nobody releases in time: the queued request times out
+        assert not await lane.acquire()
+        assert lane.stats()["rejected"] == 1
+        assert lane.stats()["timed_out"] == 1
+        lane.release()
+        assert lane.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_report_lane_sheds_without_touching_pos(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    closed = Lane(REPORTS, limit=0, queue_limit=0, queue_timeout=0)
+    monkeypatch.setitem(admission.lanes, REPORTS, closed)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/analytics/stock-summary",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == str(settings.ADMISSION_RETRY_AFTER_SECONDS)
+    assert closed.rejected == 1
+
+    r = client.get(
+        f"{settings.API_V1_STR}/till/status", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/admission-stats/",
+        headers=superuser_token_headers,
+    )
+    stats = r.json()
+    assert stats[REPORTS]["rejected"] == 1
+    assert stats[POS]["admitted"] > 0
@@ -0,0 +1,136 @@
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, create_engine, select, text
+
+from app.core import db
+from app.core.config import settings
+from app.core.db import Replica, engine, read_engine, release_connection
+from app.core.pool_metrics import async_pool_metrics, pool_metrics
+from app.models import User
+
+
+def test_release_connection_keeps_loaded_objects() -> None:
+    with Session(engine) as session:
+        checked_out = pool_metrics.checked_out
+        user = session.exec(
+            select(User).where(User.email == settings.FIRST_SUPERUSER)
+        ).one()
+        assert pool_metrics.checked_out == checked_out + 1
+
+        release_connection(session)
+        assert pool_metrics.checked_out == checked_out
+        # Still loaded, so reading it doesn't check a connection out again
+        assert user.email == settings.FIRST_SUPERUSER
+        assert pool_metrics.checked_out == checked_out
+
+        user.full_name = "Pending"
+        session.exec(select(User).limit(1)).first()
+        release_connection(session)
+        # Flushed but uncommitted changes keep the transaction (and connection) open
+        assert pool_metrics.checked_out == checked_out + 1
+        session.rollback()
+        assert user.full_name != "Pending"
+
+
+def test_pool_stats_report_hold_times(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/utils/pool-stats/"
+    client.get(url, headers=superuser_token_headers)
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["checkouts"] > 0
+    assert stats["pool_size"] == settings.DB_POOL_SIZE
+    assert stats["hold_ms_max"] >= stats["hold_ms_median"] > 0
+    assert stats["async_pool"]["pool_size"] == settings.DB_ASYNC_POOL_SIZE
+
+
+def test_async_pool_is_instrumented(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    checkouts = async_pool_metrics.checkouts
+    # An async report route
+    r = client.get(f"{settings.API_V1_STR}/customers/", headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert async_pool_metrics.checkouts > checkouts
+    assert async_pool_metrics.checked_out == 0
+
+
+def test_sessions_get_the_configured_limits() -> None:
+    with Session(engine) as session:
+        limits = dict(
+            session.exec(
+                text(
+                    "SELECT name, setting::int FROM pg_settings WHERE name IN "
+                    "('statement_timeout', 'idle_in_transaction_session_timeout')"
+                )
+            ).all()
+        )
+    assert limits == {
+        "statement_timeout": settings.DB_STATEMENT_TIMEOUT_MS,
+        "idle_in_transaction_session_timeout": settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS,
+    }
+
+
+def test_replica_is_used_while_fresh(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # The primary stands in for its own replica: never in recovery, so no lag
+    replica_engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    # Unpooled: async connections belong to the TestClient's event loop
+    replica_async_engine = create_async_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI), poolclass=NullPool
+    )
+    replica = Replica(
+        replica_engine,
+        max_lag_seconds=5,
+        check_seconds=60,
+        async_engine=replica_async_engine,
+    )
+    monkeypatch.setattr(db, "replica", replica)
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    engines = (replica_engine, replica_async_engine.sync_engine)
+    for replica_side in engines:
+        event.listen(replica_side, "before_cursor_execute", record)
+    try:
+        assert read_engine() is replica_engine
+        assert replica.lag_seconds == 0
+        # Sync list route, then async report routes
+        for url in ("/products/", "/analytics/stock-summary", "/customers/"):
+            r = client.get(
+                f"{settings.API_V1_STR}{url}", headers=superuser_token_headers
+            )
+            assert r.status_code == 200
+    finally:
+        for replica_side in engines:
+            event.remove(replica_side, "before_cursor_execute", record)
+        replica_engine.dispose()
+    assert any("FROM product" in statement for statement in statements)
+    assert any("FROM debt" in statement for statement in statements)
+    # The shared response cache is still written on the primary
+    assert not any("INSERT" in statement for statement in statements)
+
+
+def test_unreachable_replica_falls_back_to_primary(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    unreachable = create_engine(
+        "postgresql+psycopg://app@127.0.0.1:1/app", connect_args={"connect_timeout": 1}
+    )
+    replica = Replica(unreachable, max_lag_seconds=5, check_seconds=60)
+    monkeypatch.setattr(db, "replica", replica)
+    assert read_engine() is engine
+    assert replica.lag_seconds is None
+    unreachable.dispose()
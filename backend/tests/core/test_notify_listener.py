@@ -0,0 +1,59 @@
+from sqlmodel import Session, text
+
+from app.core.db import engine
+from app.core.notify_listener import Channel, NotifyListener
+from tests.utils.utils import wait_for
+
+
+def test_one_connection_listens_on_every_channel() -> None:
+    received: list[tuple[str, str]] = []
+    listening: dict[str, bool] = {}
+
+    def channel(name: str) -> Channel:
+        return Channel(
+            name,
+            on_notify=lambda payload: received.append((name, payload)),
+            on_listening=lambda state: listening.__setitem__(name, state),
+        )
+
+    def broken(_payload: str) -> None:
+        raise RuntimeError("boom")
+
+    listener = NotifyListener(
+        [
+            channel("test_notify_a"),
+            channel("test_notify_b"),
+            Channel("test_notify_broken", broken, lambda _state: None),
+        ],
+        poll_seconds=0.1,
+    )
+    listener.start()
+    try:
+        assert wait_for(
+            lambda: listening == {"test_notify_a": True, "test_notify_b": True}
+        )
+        with Session(engine) as session:
+            listeners = session.exec(
+                text(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE query LIKE 'LISTEN test_notify_%'"
+                )
+            ).one()
+            assert listeners[0] == 1
+            # A failing callback doesn't stop delivery on the other channels
+            for name, payload in [
+                ("test_notify_broken", "x"),
+                ("test_notify_a", "1"),
+                ("test_notify_b", "2"),
+            ]:
+                session.exec(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    params={"channel": name, "payload": payload},
+                )
+            session.commit()
+        assert wait_for(lambda: len(received) == 2)
+        assert received == [("test_notify_a", "1"), ("test_notify_b", "2")]
+    finally:
+        listener.stop()
+        listener.join(timeout=5)
+    assert listening == {"test_notify_a": False, "test_notify_b": False}
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.utils.spreadsheets import SpreadsheetError, parse_spreadsheet
+from app.core.config import settings
+from app.core.offload import LoopLagMonitor, run_cpu_bound
+from app.models import BulkImportSession
+
+
+def test_spreadsheet_parses_in_process_pool() -> None:
+    content = b"name,selling_price\nWidget,10\nGadget,12\n"
+    columns, rows = asyncio.run(
+        run_cpu_bound(parse_spreadsheet, content, "products.csv", "csv")
+    )
+    assert columns == ["name", "selling_price"]
+    assert [row["name"] for row in rows] == ["Widget", "Gadget"]
+
+    # Errors raised in the child come back as themselves
+    with pytest.raises(SpreadsheetError, match="no column headers"):
+        asyncio.run(run_cpu_bound(parse_spreadsheet, b"", "products.csv", "csv"))
+
+
+def test_bulk_upload_parses_off_the_event_loop(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # The upload is saved under the working directory
+    monkeypatch.chdir(tmp_path)
+    url = f"{settings.API_V1_STR}/products/bulk/upload"
+    content = b"name,selling_price\nWidget,10\n"
+    r = client.post(
+        url,
+        headers=superuser_token_headers,
+        files={"file": ("products.csv", content, "text/csv")},
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["total_rows"] == 1
+    assert data["columns"] == ["name", "selling_price"]
+    assert len(list((tmp_path / "uploads" / "bulk-imports").iterdir())) == 1
+
+    r = client.post(
+        url,
+        headers=superuser_token_headers,
+        files={"file": ("empty.csv", b"", "text/csv")},
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "CSV file has no column headers"
+
+    import_session = db.get(BulkImportSession, data["id"])
+    if import_session is not None:
+        db.delete(import_session)
+        db.commit()
+
+
+def test_loop_lag_monitor_counts_stalls() -> None:
+    async def scenario() -> LoopLagMonitor:
+        monitor = LoopLagMonitor(interval_seconds=0.01, warn_ms=50)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # Block the loop
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(scenario())
+    assert monitor.stalls == 1
+    assert monitor.max_lag_ms >= 150
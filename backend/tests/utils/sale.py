@@ -0,0 +1,137 @@
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlmodel import Session, delete, select
+
+from app.api.utils.sales_rollup import apply_sale_to_rollup
+from app.models import (
+    Debt,
+    PaymentMethod,
+    Product,
+    ProductCategory,
+    ProductStatus,
+    RefreshToken,
+    Sale,
+    SalePayment,
+    SalesDailyRollup,
+    TillShift,
+    TillShiftPaymentTotal,
+    User,
+)
+from tests.utils.utils import random_lower_string
+
+
+def get_payment_method(db: Session, name: str = "POS Cash Acc") -> PaymentMethod:
+    payment_method = db.exec(
+        select(PaymentMethod).where(PaymentMethod.name == name)
+    ).one()
+    return payment_method
+
+
+def create_random_product(
+    db: Session,
+    *,
+    created_by: User,
+    current_stock: int = 100,
+    selling_price: Decimal = Decimal("100.00"),
+    name: str | None = None,
+) -> Product:
+    category = db.exec(select(ProductCategory)).first()
+    status = db.exec(select(ProductStatus).where(ProductStatus.name == "Active")).one()
+    assert category
+    product = Product(
+        name=name or f"Product {random_lower_string()}",
+        buying_price=selling_price / 2,
+        selling_price=selling_price,
+        current_stock=current_stock,
+        category_id=category.id,
+        status_id=status.id,
+        created_by_id=created_by.id,
+    )
+    db.add(product)
+    db.commit()
+    db.refresh(product)
+    return product
+
+
+def create_sale(
+    db: Session,
+    *,
+    product: Product,
+    cashier: User,
+    quantity: int = 1,
+    sale_date: datetime | None = None,
+    payment_method: PaymentMethod | None = None,
+) -> Sale:
+    payment_method = payment_method or get_payment_method(db)
+    sale = Sale(
+        product_id=product.id,
+        quantity=quantity,
+        unit_price=product.selling_price,
+        total_amount=product.selling_price * quantity,
+        payment_method_id=payment_method.id,
+        created_by_id=cashier.id,
+        sale_date=sale_date or datetime.now(timezone.utc),
+    )
+    db.add(sale)
+    db.flush()
+    apply_sale_to_rollup(db, sale.id)
+    db.commit()
+    db.refresh(sale)
+    return sale
+
+
+def open_till_shift(
+    db: Session, *, opened_by: User, register: str | None = None
+) -> TillShift:
+    """Open a shift, on a register of its own unless one is given"""
+    shift = TillShift(
+        shift_type="day",
+        register=register or f"test-{random_lower_string()[:12]}",
+        opening_cash_float=Decimal("0"),
+        opened_by_id=opened_by.id,
+    )
+    db.add(shift)
+    db.commit()
+    db.refresh(shift)
+    return shift
+
+
+def create_unpaid_debt(db: Session, *, sale: Sale, cashier: User) -> Debt:
+    debt = Debt(
+        customer_name=f"Customer {random_lower_string()[:8]}",
+        sale_id=sale.id,
+        amount=sale.total_amount,
+        amount_paid=Decimal("0"),
+        balance=sale.total_amount,
+        status="pending",
+        created_by_id=cashier.id,
+    )
+    db.add(debt)
+    db.commit()
+    db.refresh(debt)
+    return debt
+
+
+def delete_sales_data(db: Session, *, user_ids: list[uuid.UUID]) -> None:
+    """Remove sales, debts, products, till shifts and refresh tokens owned by the given users."""
+    db.rollback()
+    sale_ids = select(Sale.id).where(Sale.created_by_id.in_(user_ids))  # type: ignore[attr-defined]
+    db.execute(delete(Debt).where(Debt.sale_id.in_(sale_ids)))  # type: ignore[attr-defined]
+    db.execute(delete(Debt).where(Debt.created_by_id.in_(user_ids)))  # type: ignore[attr-defined]
+    db.execute(delete(SalePayment).where(SalePayment.sale_id.in_(sale_ids)))  # type: ignore[attr-defined]
+    db.execute(
+        delete(SalesDailyRollup).where(SalesDailyRollup.cashier_id.in_(user_ids))
+    )  # type: ignore[attr-defined]
+    db.execute(delete(Sale).where(Sale.created_by_id.in_(user_ids)))  # type: ignore[attr-defined]
+    shift_ids = select(TillShift.id).where(TillShift.opened_by_id.in_(user_ids))  # type: ignore[attr-defined]
+    db.execute(
+        delete(TillShiftPaymentTotal).where(
+            TillShiftPaymentTotal.till_shift_id.in_(shift_ids)  # type: ignore[attr-defined]
+        )
+    )
+    db.execute(delete(TillShift).where(TillShift.opened_by_id.in_(user_ids)))  # type: ignore[attr-defined]
+    db.execute(delete(Product).where(Product.created_by_id.in_(user_ids)))  # type: ignore[attr-defined]
+    db.execute(delete(RefreshToken).where(RefreshToken.user_id.in_(user_ids)))  # type: ignore[attr-defined]
+    db.commit()
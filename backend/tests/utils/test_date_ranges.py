@@ -0,0 +1,52 @@
+import re
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlmodel import Session, func, select
+
+from app.models import Expense, Sale
+from app.utils.date_ranges import business_date_bounds, date_range_conditions
+
+
+def _plan(db: Session, statement: Any) -> str:
+    """EXPLAIN a statement with sequential scans disabled"""
+    connection = db.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    rows = connection.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).all()
+    db.rollback()
+    return "\n".join(row[0] for row in rows)
+
+
+def test_business_date_bounds_are_half_open_in_business_timezone() -> None:
+    lower, upper = business_date_bounds(date(2024, 1, 1), date(2024, 1, 31))
+    assert lower == datetime(2023, 12, 31, 21, 0, tzinfo=timezone.utc)
+    assert upper == datetime(2024, 1, 31, 21, 0, tzinfo=timezone.utc)
+    assert business_date_bounds(None, None) == (None, None)
+
+
+def test_sale_date_range_uses_sale_date_index(db: Session) -> None:
+    statement = select(func.count(Sale.id)).where(
+        *date_range_conditions(Sale.sale_date, date(2024, 1, 1), date(2024, 1, 31))
+    )
+    assert "ix_sale_sale_date" in _plan(db, statement)
+
+
+def test_cashier_date_range_is_an_index_condition(db: Session) -> None:
+    statement = select(Sale.id).where(
+        Sale.created_by_id == uuid.uuid4(),
+        *date_range_conditions(Sale.sale_date, date(2024, 1, 1), date(2024, 1, 1)),
+    )
+    plan = _plan(db, statement)
+    # Either ix_sale_user_date or ix_sale_sale_date, but the range must be
+    # resolved by the index rather than filtered row by row
+    assert "Seq Scan" not in plan
+    assert re.search(r"Index Cond: .*sale_date >=", plan)
+
+
+def test_expense_date_range_uses_expense_date_index(db: Session) -> None:
+    statement = select(func.sum(Expense.amount)).where(
+        *date_range_conditions(Expense.expense_date, date(2024, 1, 1), None)
+    )
+    assert "ix_expense_expense_date" in _plan(db, statement)